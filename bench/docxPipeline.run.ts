@@ -0,0 +1,149 @@
+import { readFileSync, writeFileSync } from "node:fs";
+import { basename } from "node:path";
+import { describe, it } from "vitest";
+import { paginateBlocks, A4_PAGE_METRICS } from "@/lib/render/paginationEngine";
+import type { BlockRecord } from "@/lib/types/editor";
+import { parseDocxToHtmlSnapshot } from "@/lib/word/docxHtml";
+import { applyWordRenderModel } from "@/lib/word/renderApply";
+import { parseDocxStyleProfile, type WordStyleProfile } from "@/lib/word/styleProfile";
+
+type StageName = "parseDocxToHtmlSnapshot" | "parseDocxStyleProfile" | "applyWordRenderModel" | "paginateBlocks";
+
+interface BenchRequest {
+  documents: string[];
+  repeat: number;
+  warmup: number;
+  resultPath: string;
+}
+
+interface RunSample {
+  stages: Record<StageName, number>;
+  peakHeapUsedBytes: number;
+}
+
+interface DocumentResult {
+  path: string;
+  blocks: number;
+  pages: number;
+  runs: RunSample[];
+  maxRssBytes: number;
+}
+
+const BLOCK_TAGS = new Set(["p", "h1", "h2", "h3", "h4", "h5", "h6", "table", "ul", "ol", "div", "img"]);
+
+function collectGarbage(): void {
+  (globalThis as { gc?: () => void }).gc?.();
+}
+
+function loadDocx(path: string): File {
+  const bytes = readFileSync(path);
+  const buffer = bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength);
+  return {
+    name: basename(path),
+    arrayBuffer: async () => buffer
+  } as unknown as File;
+}
+
+function textLines(text: string, charsPerLine: number): number {
+  return Math.max(1, Math.ceil(text.length / Math.max(1, charsPerLine)));
+}
+
+// jsdom has no layout engine, so block heights are estimated from text length
+// and the parsed profile's line metrics instead of getBoundingClientRect().
+function estimateBlockHeight(el: Element, profile: WordStyleProfile): number {
+  const lineHeightPx = profile.bodyLineHeightPx ?? profile.bodyFontPx * profile.bodyLineHeightRatio;
+  const charsPerLine = Math.floor(profile.contentWidthPx / profile.bodyFontPx);
+  const tagName = el.tagName.toLowerCase();
+
+  if (tagName === "table") {
+    return Array.from(el.querySelectorAll("tr")).reduce((sum, row) => {
+      const cells = Array.from(row.children);
+      const cellChars = Math.floor(charsPerLine / Math.max(1, cells.length));
+      const lines = cells.reduce((max, cell) => Math.max(max, textLines(cell.textContent ?? "", cellChars)), 1);
+      return sum + lines * lineHeightPx;
+    }, 0);
+  }
+
+  const image = tagName === "img" ? el : el.querySelector("img");
+  const imageHeight = image ? Number.parseFloat(image.getAttribute("height") ?? "0") : 0;
+  const text = el.textContent ?? "";
+  const textHeight = text.trim() ? textLines(text, charsPerLine) * lineHeightPx : 0;
+  return Math.max(1, imageHeight + textHeight + profile.paragraphAfterPx);
+}
+
+function buildEstimatedBlocks(doc: Document, profile: WordStyleProfile): BlockRecord[] {
+  const blocks: BlockRecord[] = [];
+  let top = 0;
+  Array.from(doc.body.children).forEach((el, idx) => {
+    const tagName = el.tagName.toLowerCase();
+    if (!BLOCK_TAGS.has(tagName)) return;
+    const height = estimateBlockHeight(el, profile);
+    blocks.push({
+      id: `block_${idx}`,
+      type: tagName === "table" ? "table" : tagName.startsWith("h") ? "heading" : "paragraph",
+      xpath: "",
+      tagName,
+      top,
+      left: 0,
+      width: profile.contentWidthPx,
+      height,
+      pageIndex: 0,
+      html: ""
+    });
+    top += height;
+  });
+  return blocks;
+}
+
+async function runOnce(path: string): Promise<{ sample: RunSample; blocks: number; pages: number }> {
+  const file = loadDocx(path);
+  const stages = {} as Record<StageName, number>;
+  let peakHeapUsedBytes = 0;
+
+  async function stage<T>(name: StageName, fn: () => T | Promise<T>): Promise<T> {
+    const startedAt = performance.now();
+    const value = await fn();
+    stages[name] = performance.now() - startedAt;
+    peakHeapUsedBytes = Math.max(peakHeapUsedBytes, process.memoryUsage().heapUsed);
+    return value;
+  }
+
+  const html = await stage("parseDocxToHtmlSnapshot", () => parseDocxToHtmlSnapshot(file));
+  const profile = await stage("parseDocxStyleProfile", () => parseDocxStyleProfile(file));
+  const doc = new DOMParser().parseFromString(html, "text/html");
+  await stage("applyWordRenderModel", () => applyWordRenderModel({ doc, styleProfile: profile, showFormattingMarks: false }));
+  const blocks = buildEstimatedBlocks(doc, profile);
+  const pagination = await stage("paginateBlocks", () => paginateBlocks(blocks, A4_PAGE_METRICS));
+
+  return { sample: { stages, peakHeapUsedBytes }, blocks: blocks.length, pages: pagination.pages.length };
+}
+
+describe("docx pipeline bench", () => {
+  it("runs every stage over the requested documents", async () => {
+    const requestPath = process.env.DOCX_BENCH_REQUEST;
+    if (!requestPath) {
+      throw new Error("DOCX_BENCH_REQUEST is not set; run scripts_bench_docx_pipeline.py instead");
+    }
+    const request = JSON.parse(readFileSync(requestPath, "utf8")) as BenchRequest;
+    const results: DocumentResult[] = [];
+
+    for (const path of request.documents) {
+      for (let i = 0; i < request.warmup; i += 1) {
+        await runOnce(path);
+      }
+      const runs: RunSample[] = [];
+      let blocks = 0;
+      let pages = 0;
+      for (let i = 0; i < request.repeat; i += 1) {
+        collectGarbage();
+        const outcome = await runOnce(path);
+        runs.push(outcome.sample);
+        blocks = outcome.blocks;
+        pages = outcome.pages;
+      }
+      results.push({ path, blocks, pages, runs, maxRssBytes: process.resourceUsage().maxRSS * 1024 });
+    }
+
+    writeFileSync(request.resultPath, JSON.stringify({ node: process.version, documents: results }));
+  });
+});
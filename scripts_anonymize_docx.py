@@ -0,0 +1,486 @@
+from itertools import zip_longest
+from pathlib import Path
+from zipfile import ZipFile
+import argparse
+import hashlib
+import re
+import sys
+import time
+import unicodedata
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the local environment
+    raise SystemExit('numpy is required for the DOCX anonymizer: pip install numpy')
+
+from scripts_docx_builder import zip_entry
+import scripts_docx_media as media
+
+# Turns a customer .docx into a shareable perf repro. Every part is streamed
+# from the source archive to the target in its original order and with its
+# original compression; XML parts are rewritten chunk by chunk and only text
+# content changes, so paragraph/run/style/numbering/section markup is copied
+# byte for byte. ElementTree's iterparse would re-serialize namespaces and
+# attribute order, so the rewriter works on the raw byte stream instead, cutting
+# chunks at tag boundaries the way iterparse yields events.
+#
+# Text is replaced character by character with a random character of the same
+# Unicode category from the same 128-code-point window (Latin stays Latin, kana
+# stays kana); BMP ideographs are drawn from GB2312 level 1 so the filler uses
+# glyphs every CJK font has. Whitespace, punctuation and symbols are kept, so
+# word lengths and line-break opportunities survive. Names that other markup
+# refers to (bookmarks, link anchors, REF/PAGEREF/NOTEREF arguments, document
+# variables) are mapped through a seeded hash instead, so a name always gets
+# the same replacement and every reference still resolves. PNG/JPEG media
+# become synthetic images of the same pixel size and a similar byte size; other
+# binary parts (EMF/WMF, embedded objects, macros) are zero-filled to the same
+# length.
+
+out_dir = Path('assets/test-docs')
+
+CHUNK = 1 << 22
+# Binary parts are only read far enough to find PNG/JPEG dimensions.
+HEADER_BYTES = 1 << 16
+HEADER_LIMIT = 1 << 24
+
+# Elements whose text content is replaced. Fields (w:instrText runs and
+# w:fldSimple's w:instr) keep their instruction keywords and switches; quoted
+# arguments (URLs, paths, captions) are replaced, and bookmark or variable
+# names go through the identifier map.
+TEXT_ELEMENTS = (
+    b'w:t', b'w:delText', b'a:t', b'c:v',
+    b'dc:title', b'dc:subject', b'dc:creator', b'dc:description', b'cp:keywords', b'cp:lastModifiedBy', b'cp:category',
+    b'Company', b'Manager', b'vt:lpstr', b'vt:lpwstr',
+)
+_names = b'|'.join(re.escape(name) for name in TEXT_ELEMENTS)
+TEXT_RE = re.compile(rb'(<(?:' + _names + rb')(?:\s[^>]*)?>)([^<]*)(</(?:' + _names + rb')>)')
+INSTR_RE = re.compile(rb'(<w:instrText(?:\s[^>]*)?>)([^<]*)(</w:instrText>)')
+# A complex field's instruction may span several instrText runs; its begin
+# marker resets the parse.
+FIELD_CODE_RE = re.compile(rb'<w:fldChar\s[^>]*?w:fldCharType="begin"[^>]*>|' + INSTR_RE.pattern)
+FIELD_TOKEN_RE = re.compile(r'"|\s+|[^\s"]+')
+# Fields whose first argument names a bookmark or document variable; HYPERLINK
+# names a bookmark with its \l switch.
+REFERENCE_FIELDS = frozenset(('REF', 'PAGEREF', 'NOTEREF', 'DOCVARIABLE'))
+# (inside quotes, field keyword, next argument is a name)
+FIELD_START = (False, None, False)
+OPEN_TEXT_RE = re.compile(rb'<(?:' + _names + rb'|w:instrText)(?:\s[^>]*[^/])?>')
+FIELD_RE = re.compile(rb'(\sw:instr=")([^"]*)(")')
+ATTRIBUTE_RE = re.compile(rb'(\s(?:w:author|w:initials|w15:author|w15:userId|descr|title|o:title|tooltip|w:tooltip)=")([^"]*)(")')
+ATTRIBUTE_NEEDLES = (b'author="', b'initials="', b'userId="', b'descr="', b'title="', b'tooltip="')
+ANCHOR_RE = re.compile(rb'(\sw:anchor=")([^"]*)(")')
+NAME_RE = re.compile(rb'(<(?:wp:docPr|pic:cNvPr|wps:cNvPr|wpg:cNvPr)\s[^>]*?\sname=")([^"]*)(")')
+# Bookmark names, document variables, content-control alias/tag values and
+# list items; w:name values are identifiers.
+NAMED_TAG_RE = re.compile(rb'<(?:w:bookmarkStart|w:docVar|w:alias|w:tag|w:listItem)\s[^>]*>')
+NAMED_VALUE_RE = re.compile(rb'(\sw:(name|val|displayText|value)=")([^"]*)(")')
+NAMED_NEEDLES = (b'<w:bookmarkStart', b'<w:docVar', b'<w:alias', b'<w:tag', b'<w:listItem')
+# Legacy form fields. w:name and w:default also occur outside w:ffData (style
+# names, check box states), so the rewriter tracks the enclosing elements. The
+# field name doubles as a bookmark name.
+FORM_RE = re.compile(rb'<(/?)w:(ffData|textInput)>|<w:(name|default|listEntry|helpText|statusText)\s[^>]*>')
+VAL_RE = re.compile(rb'(\sw:val=")([^"]*)(")')
+# Custom document properties (docProps/custom.xml).
+PROPERTY_RE = re.compile(rb'(<property\s[^>]*?\sname=")([^"]*)(")')
+RELATIONSHIP_RE = re.compile(rb'<Relationship\s[^>]*>')
+TARGET_RE = re.compile(rb'(\sTarget=")([^"]*)(")')
+ALL_TEXT_RE = re.compile(rb'>([^<]+)')
+ENTITY_RE = re.compile(r'&(#x[0-9A-Fa-f]+|#[0-9]+|amp|lt|gt|quot|apos);')
+ENTITIES = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'"}
+
+# Data-bound content controls keep their values in customXml items; every text
+# node there is replaced.
+CUSTOM_XML_RE = re.compile(r'customXml/item\d+\.xml$')
+XML_SUFFIXES = ('.xml', '.rels', '.vml')
+
+# Planes 0-2 cover every script plus the CJK extensions.
+CODE_POINTS = 0x32400
+HAN_RANGES = ((0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF))
+WINDOW = 7
+
+def _common_han():
+    chars = []
+    for high in range(0xB0, 0xD8):
+        for low in range(0xA1, 0xFF):
+            try:
+                chars.append(ord(bytes((high, low)).decode('gb2312')))
+            except UnicodeDecodeError:
+                pass
+    return chars
+
+def build_classes():
+    # Returns (class per code point, candidate offset and count per class,
+    # flat candidate array). Class 0 means "keep the character".
+    window_classes = {}
+    candidates = [[]]
+    classes = np.zeros(CODE_POINTS, np.int32)
+    han = len(candidates)
+    candidates.append(_common_han())
+    for cp in range(CODE_POINTS):
+        category = unicodedata.category(chr(cp))
+        if category[0] != 'L' and category != 'Nd':
+            continue
+        if cp <= 0xFFFF and any(low <= cp <= high for low, high in HAN_RANGES):
+            classes[cp] = han
+            continue
+        key = (cp >> WINDOW, category)
+        if key not in window_classes:
+            window_classes[key] = len(candidates)
+            candidates.append([])
+        classes[cp] = window_classes[key]
+        candidates[window_classes[key]].append(cp)
+    counts = np.array([len(c) for c in candidates], np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    flat = np.array([cp for c in candidates for cp in c], np.uint32)
+    return classes, offsets, counts, flat
+
+class Filler:
+    def __init__(self, seed: int):
+        self.classes, self.offsets, self.counts, self.flat = build_classes()
+        self.rng = np.random.RandomState(seed)
+        self.key = str(seed).encode('ascii') + b'\0'
+        self.characters = 0
+
+    def fill(self, text: str):
+        if not text:
+            return text
+        cps = np.frombuffer(text.encode('utf-32-le'), np.uint32)
+        return self.substitute(cps, self.rng.randint(0, 1 << 30, len(cps)))
+
+    def identifier(self, text: str):
+        # Same name in, same name out: the picks come from a hash of the seed
+        # and the name rather than from the random stream.
+        if not text:
+            return text
+        data = text.encode('utf-32-le')
+        picks = np.frombuffer(hashlib.shake_128(self.key + data).digest(len(data)), np.uint32) >> 2
+        return self.substitute(np.frombuffer(data, np.uint32), picks.astype(np.int64))
+
+    def substitute(self, cps, picks):
+        # `picks` holds one random integer per code point.
+        cls = self.classes[np.minimum(cps, CODE_POINTS - 1)]
+        cls[cps >= CODE_POINTS] = 0
+        replace = cls > 0
+        picks = picks[replace]
+        out = cps.copy()
+        chosen = cls[replace]
+        counts = self.counts[chosen]
+        index = self.offsets[chosen] + picks % counts
+        # A character never maps to itself when its class offers another one,
+        # so verify() can treat an unchanged value as a leak.
+        same = (self.flat[index] == cps[replace]) & (counts > 1)
+        index[same] = self.offsets[chosen[same]] + (picks[same] + 1) % counts[same]
+        out[replace] = self.flat[index]
+        self.characters += int(replace.sum())
+        return out.tobytes().decode('utf-32-le')
+
+def unescape(text: str):
+    def entity(match):
+        name = match.group(1)
+        if name[0] == '#':
+            return chr(int(name[2:], 16) if name[1] in 'xX' else int(name[1:]))
+        return ENTITIES[name]
+    return ENTITY_RE.sub(entity, text) if '&' in text else text
+
+def escape(text: str, quote=False):
+    text = text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+    return text.replace('"', '&quot;') if quote else text
+
+def iter_tag_aligned(reader, chunk: int):
+    # Yields the part in pieces that end right before a tag. When the last tag
+    # is a text element's closing tag, or the piece would end inside a text
+    # node, the cut steps back to the opening tag so a text node never
+    # straddles two pieces.
+    carry = b''
+    while data := reader.read(chunk):
+        data = carry + data
+        cut = data.rfind(b'<')
+        previous = data.rfind(b'<', 0, cut) if cut > 0 else -1
+        if previous >= 0 and OPEN_TEXT_RE.match(data, previous, cut):
+            cut = previous
+        if cut <= 0:
+            carry = data
+            continue
+        carry = data[cut:]
+        yield data[:cut]
+    if carry:
+        yield carry
+
+class PartRewriter:
+    def __init__(self, name: str, filler: Filler):
+        self.filler = filler
+        self.all_text = bool(CUSTOM_XML_RE.search(name))
+        self.relationships = name.endswith('.rels')
+        self.field_state = FIELD_START
+        # Innermost of w:ffData/w:textInput, or None outside a form field.
+        self.form = None
+        self.text_nodes = 0
+
+    def fill_many(self, texts, quote=False):
+        # One decode/fill/encode for the whole chunk: NUL cannot occur in XML,
+        # so it separates the values.
+        if not texts:
+            return texts
+        joined = b'\0'.join(texts).decode('utf-8')
+        filled = escape(self.filler.fill(unescape(joined)), quote)
+        return filled.encode('utf-8').split(b'\0')
+
+    def fill_groups(self, pattern, buf: bytes, quote=False):
+        # `pattern` captures (before, value, after).
+        pieces = pattern.split(buf)
+        pieces[2::4] = self.fill_many(pieces[2::4], quote)
+        return b''.join(pieces), len(pieces) // 4
+
+    def rewrite(self, buf: bytes):
+        if self.all_text:
+            pieces = ALL_TEXT_RE.split(buf)
+            self.text_nodes += len(pieces) // 2
+            pieces[1::2] = [b'>' + text for text in self.fill_many(pieces[1::2])]
+            return b''.join(pieces)
+        buf, nodes = self.fill_groups(TEXT_RE, buf)
+        self.text_nodes += nodes
+        if b'<w:instrText' in buf or b'w:fldCharType="begin"' in buf:
+            buf = FIELD_CODE_RE.sub(self.instruction, buf)
+        if b'w:instr="' in buf:
+            buf = FIELD_RE.sub(self.field, buf)
+        if any(needle in buf for needle in ATTRIBUTE_NEEDLES):
+            buf = self.fill_groups(ATTRIBUTE_RE, buf, quote=True)[0]
+        if b'w:anchor="' in buf:
+            buf = ANCHOR_RE.sub(self.reference, buf)
+        buf = self.fill_groups(NAME_RE, buf, quote=True)[0]
+        if any(needle in buf for needle in NAMED_NEEDLES):
+            buf = NAMED_TAG_RE.sub(self.named, buf)
+        if self.form or b'<w:ffData>' in buf:
+            buf = FORM_RE.sub(self.form_field, buf)
+        if b'<property ' in buf:
+            buf = self.fill_groups(PROPERTY_RE, buf, quote=True)[0]
+        if self.relationships:
+            buf = RELATIONSHIP_RE.sub(self.relationship, buf)
+        return buf
+
+    def fill_value(self, value: bytes):
+        return escape(self.filler.fill(unescape(value.decode('utf-8'))), quote=True).encode('utf-8')
+
+    def identifier_value(self, value: bytes):
+        return escape(self.filler.identifier(unescape(value.decode('utf-8'))), quote=True).encode('utf-8')
+
+    def fill_instruction(self, text: str, state):
+        # Replaces the arguments of a field instruction; `state` carries the
+        # parse across instrText runs and is returned with the new text.
+        quoted, keyword, naming = state
+        tokens = FIELD_TOKEN_RE.findall(text)
+        for index, token in enumerate(tokens):
+            if token == '"':
+                naming = naming and not quoted
+                quoted = not quoted
+            elif token.isspace():
+                continue
+            elif quoted:
+                tokens[index] = self.filler.identifier(token) if naming else self.filler.fill(token)
+            elif keyword is None:
+                keyword = token.upper()
+                naming = keyword in REFERENCE_FIELDS
+            elif naming and not token.startswith('\\'):
+                tokens[index] = self.filler.identifier(token)
+                naming = False
+            elif token.lower() == '\\l' and keyword == 'HYPERLINK':
+                naming = True
+        return ''.join(tokens), (quoted, keyword, naming)
+
+    def instruction(self, match):
+        if match.group(1) is None:
+            self.field_state = FIELD_START
+            return match.group(0)
+        text, self.field_state = self.fill_instruction(unescape(match.group(2).decode('utf-8')), self.field_state)
+        self.text_nodes += 1
+        return match.group(1) + escape(text).encode('utf-8') + match.group(3)
+
+    def field(self, match):
+        text, _ = self.fill_instruction(unescape(match.group(2).decode('utf-8')), FIELD_START)
+        return match.group(1) + escape(text, quote=True).encode('utf-8') + match.group(3)
+
+    def reference(self, match):
+        return match.group(1) + self.identifier_value(match.group(2)) + match.group(3)
+
+    def named(self, match):
+        def value(found):
+            fill = self.identifier_value if found.group(2) == b'name' else self.fill_value
+            return found.group(1) + fill(found.group(3)) + found.group(4)
+        return NAMED_VALUE_RE.sub(value, match.group(0))
+
+    def form_field(self, match):
+        closing, element, tag = match.groups()
+        if element:
+            if element == b'ffData':
+                self.form = None if closing else b'ffData'
+            elif self.form:
+                self.form = b'ffData' if closing else b'textInput'
+            return match.group(0)
+        # Check boxes keep their w:default state; only text inputs hold text.
+        if not self.form or (tag == b'default' and self.form != b'textInput'):
+            return match.group(0)
+        fill = self.identifier_value if tag == b'name' else self.fill_value
+        return VAL_RE.sub(lambda found: found.group(1) + fill(found.group(2)) + found.group(3), match.group(0))
+
+    def relationship(self, match):
+        tag = match.group(0)
+        if b'TargetMode="External"' not in tag:
+            return tag
+        def target(found):
+            value = found.group(2)
+            scheme = re.match(rb'[A-Za-z][\w+.-]*:/*', value)
+            keep = scheme.end() if scheme else 0
+            return found.group(1) + value[:keep] + self.fill_value(value[keep:]) + found.group(3)
+        return TARGET_RE.sub(target, tag)
+
+def read_dimensions(reader):
+    # PNG dimensions sit in the first 24 bytes; a JPEG's frame header follows
+    # its metadata segments, so the prefix grows until it is found.
+    data = reader.read(HEADER_BYTES)
+    found = media.image_dimensions(data)
+    while found is None and data[:2] == b'\xff\xd8' and len(data) < HEADER_LIMIT:
+        more = reader.read(len(data))
+        if not more:
+            break
+        data += more
+        found = media.image_dimensions(data)
+    return found
+
+def synthetic_media(found, size: int, seed: int):
+    # Same pixel size; PNG texture and JPEG density chosen to land near the
+    # original byte size.
+    kind, width, height = found
+    if kind == 'png':
+        return media.png_image(width, height, seed, 'noise' if size >= width * height * 1.5 else 'gradient')
+    # Inverse of jpeg_bytes_per_pixel.
+    coefficients = (size / (width * height) * 512 - 6) * 3 / 14
+    return media.jpeg_image(width, height, seed, max(0.0, min(1.0, coefficients / 63)))
+
+def is_xml(name: str):
+    return name == '[Content_Types].xml' or name.endswith(XML_SUFFIXES)
+
+def anonymize_docx(source: Path, target: Path, seed=0, chunk=CHUNK):
+    filler = Filler(seed)
+    summary = {'xml_parts': 0, 'text_nodes': 0, 'characters': 0, 'images': 0, 'blanked': []}
+    with ZipFile(source) as src, ZipFile(target, 'w') as dst:
+        for index, info in enumerate(src.infolist()):
+            entry = zip_entry(info.filename, info.compress_type)
+            with src.open(info) as reader, dst.open(entry, 'w', force_zip64=info.file_size > 0x7FFFFFFF) as writer:
+                if is_xml(info.filename):
+                    rewriter = PartRewriter(info.filename, filler)
+                    for buf in iter_tag_aligned(reader, chunk):
+                        writer.write(rewriter.rewrite(buf))
+                    summary['xml_parts'] += 1
+                    summary['text_nodes'] += rewriter.text_nodes
+                    continue
+                # Binary parts are never read whole: images only up to their
+                # dimensions, and other parts not past their first bytes.
+                found = read_dimensions(reader)
+                if found:
+                    writer.write(synthetic_media(found, info.file_size, seed + index))
+                    summary['images'] += 1
+                    continue
+                zeros = bytes(min(chunk, info.file_size))
+                for offset in range(0, info.file_size, chunk):
+                    writer.write(zeros[:info.file_size - offset])
+                summary['blanked'].append(info.filename)
+    summary['characters'] = filler.characters
+    return summary
+
+class Recorder:
+    # Stands in for Filler in verify(): records every value the rewriter would
+    # replace, in document order, and removes it, so the rewriter's output is
+    # the markup alone.
+
+    def __init__(self):
+        self.values = []
+
+    def fill(self, text: str):
+        self.values.extend(text.split('\0'))
+        return '\0' * text.count('\0')
+
+    identifier = fill
+
+def strip_values(name: str, xml: bytes):
+    # A whole part with every value the rewriter replaces removed.
+    return PartRewriter(name, Recorder()).rewrite(xml)
+
+def iter_part_values(archive: ZipFile, name: str, digest, chunk=CHUNK):
+    # Yields the values the rewriter replaces in `name` and feeds the stripped
+    # markup into `digest`, in one streaming pass.
+    recorder = Recorder()
+    rewriter = PartRewriter(name, recorder)
+    with archive.open(name) as reader:
+        for buf in iter_tag_aligned(reader, chunk):
+            digest.update(rewriter.rewrite(buf))
+            yield from recorder.values
+            recorder.values.clear()
+
+def verify(source: Path, target: Path):
+    # Returns None if every XML part has identical markup with every replaced
+    # value changed, and every binary part kept its pixel size (images) or byte
+    # length (zero-filled parts). Values are compared pairwise: the filler
+    # never maps a character to itself when it has a choice, so a value that
+    # still matches the source and holds such a character leaked.
+    classes, _, counts, _ = build_classes()
+
+    def replaceable(value: str):
+        return any(counts[classes[cp]] > 1 for cp in map(ord, value) if cp < CODE_POINTS)
+
+    with ZipFile(source) as a, ZipFile(target) as b:
+        if a.namelist() != b.namelist():
+            return 'part list differs'
+        for name in a.namelist():
+            if is_xml(name):
+                before, after = hashlib.sha1(), hashlib.sha1()
+                leaked = sum(
+                    1 for old, new in zip_longest(iter_part_values(a, name, before), iter_part_values(b, name, after))
+                    if old == new and replaceable(old)
+                )
+                if before.digest() != after.digest():
+                    return f'{name}: markup differs'
+                if leaked:
+                    return f'{name}: {leaked} values unchanged from the source'
+                continue
+            with a.open(name) as reader:
+                original = read_dimensions(reader)
+            if original:
+                with b.open(name) as reader:
+                    if original != read_dimensions(reader):
+                        return f'{name}: image size differs'
+            elif a.getinfo(name).file_size != b.getinfo(name).file_size:
+                return f'{name}: length differs'
+    return None
+
+def default_name(source: Path):
+    # Customer file names are often identifying; the repro is named by a hash.
+    return f'repro-{hashlib.sha1(source.name.encode()).hexdigest()[:10]}.docx'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Anonymize a .docx into a structure-preserving perf repro fixture.')
+    parser.add_argument('source', type=Path)
+    parser.add_argument('--out', type=Path, help=f'target path (default: {out_dir}/repro-<hash>.docx)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verify', action='store_true', help='re-read both archives, compare the markup of every XML part and check that no replaced value survived')
+    args = parser.parse_args(argv)
+
+    target = args.out or out_dir / default_name(args.source)
+    if target.resolve() == args.source.resolve():
+        raise SystemExit('refusing to overwrite the source document')
+    target.parent.mkdir(parents=True, exist_ok=True)
+    started = time.perf_counter()
+    summary = anonymize_docx(args.source, target, args.seed)
+    elapsed = time.perf_counter() - started
+    print(str(target))
+    print(f"{summary['xml_parts']} XML parts, {summary['text_nodes']} text nodes, {summary['characters']} characters, "
+          f"{summary['images']} images replaced, {len(summary['blanked'])} parts zero-filled, {elapsed:.2f}s", file=sys.stderr)
+    for name in summary['blanked']:
+        print(f'zero-filled {name}', file=sys.stderr)
+    if args.verify:
+        problem = verify(args.source, target)
+        if problem:
+            raise SystemExit(f'verification failed: {problem}')
+        print('markup identical, no source values left', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,558 @@
+from base64 import b64encode
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+from scripts_bench_docx_pipeline import summarize_runs
+from scripts_docx_oracle import load_oracle
+from scripts_generate_edit_traces import PROFILES, generate_trace
+import scripts_generate_stress_docx as stress
+
+# Load driver for the collaborative path (lib/collab/yjsProvider.ts): N clients
+# per document against a local y-websocket server, each publishing edit-trace
+# operations the way YjsOperationChannel.publishOperation does, i.e. setting
+# `latest` on the root map `ops`. Clients speak the y-websocket sync protocol
+# directly (stdlib websocket client, hand-encoded Yjs v1 updates), so nothing
+# but Node and `npm install` is needed. Every update's (client, clock) id is
+# timestamped on send and looked up on delivery at every other client.
+
+results_path = Path('bench/results/collab-latest.json')
+SERVER_BINS = ('node_modules/y-websocket/bin/server.cjs', 'node_modules/y-websocket/bin/server.js')
+
+# y-websocket message types and y-protocols sync steps.
+MESSAGE_SYNC = 0
+MESSAGE_AWARENESS = 1
+SYNC_STEP1 = 0
+SYNC_STEP2 = 1
+SYNC_UPDATE = 2
+
+# Yjs struct info bits and content refs (UpdateEncoderV1).
+BIT6, BIT7, BIT8 = 0x20, 0x40, 0x80
+CONTENT_GC, CONTENT_DELETED, CONTENT_JSON, CONTENT_BINARY, CONTENT_STRING = 0, 1, 2, 3, 4
+CONTENT_EMBED, CONTENT_FORMAT, CONTENT_TYPE, CONTENT_ANY, CONTENT_DOC, CONTENT_SKIP = 5, 6, 7, 8, 9, 10
+ANY_STRING = 119
+
+# lib0 encoding --------------------------------------------------------------
+
+def var_uint(value: int):
+    out = bytearray()
+    while value > 0x7F:
+        out.append(0x80 | (value & 0x7F))
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+def var_bytes(data: bytes):
+    return var_uint(len(data)) + data
+
+def var_string(text: str):
+    return var_bytes(text.encode('utf-8'))
+
+class Decoder:
+    __slots__ = ('data', 'pos')
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def uint8(self):
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def var_uint(self):
+        value = 0
+        shift = 0
+        while True:
+            byte = self.data[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def var_int(self):
+        byte = self.uint8()
+        negative = byte & 0x40
+        value = byte & 0x3F
+        shift = 6
+        while byte & 0x80:
+            byte = self.uint8()
+            value |= (byte & 0x7F) << shift
+            shift += 7
+        return -value if negative else value
+
+    def var_bytes(self):
+        length = self.var_uint()
+        self.pos += length
+        return self.data[self.pos - length:self.pos]
+
+    def var_string(self):
+        return self.var_bytes().decode('utf-8')
+
+    def skip_any(self):
+        tag = self.uint8()
+        if tag in (127, 126, 121, 120):
+            return
+        if tag == 125:
+            self.var_int()
+        elif tag == 124:
+            self.pos += 4
+        elif tag in (123, 122):
+            self.pos += 8
+        elif tag == ANY_STRING:
+            self.var_bytes()
+        elif tag == 118:
+            for _ in range(self.var_uint()):
+                self.var_bytes()
+                self.skip_any()
+        elif tag == 117:
+            for _ in range(self.var_uint()):
+                self.skip_any()
+        elif tag == 116:
+            self.var_bytes()
+        else:
+            raise ValueError(f'unknown lib0 any tag {tag}')
+
+# Yjs v1 updates -------------------------------------------------------------
+
+def encode_map_set(client: int, clock: int, origin, root: str, key: str, value: str):
+    # One Item with ContentAny([value]) appended to `root[key]`. With an origin
+    # the parent and key are implied by it; the origin item (the value being
+    # overwritten) goes into the delete set, as Yjs' typeMapSet does.
+    if origin is None:
+        item = bytes((CONTENT_ANY | BIT6,)) + var_uint(1) + var_string(root) + var_string(key)
+        delete_set = var_uint(0)
+    else:
+        item = bytes((CONTENT_ANY | BIT8 | BIT6,)) + var_uint(origin[0]) + var_uint(origin[1])
+        delete_set = var_uint(1) + var_uint(origin[0]) + var_uint(1) + var_uint(origin[1]) + var_uint(1)
+    item += var_uint(1) + bytes((ANY_STRING,)) + var_string(value)
+    return var_uint(1) + var_uint(1) + var_uint(client) + var_uint(clock) + item + delete_set
+
+def decode_update_items(update: bytes):
+    # Yields (client, clock) for every ContentAny item in a v1 update; other
+    # structs are skipped. Only the shapes y-websocket relays for map sets
+    # (plus GC/deleted/string content in server state) need to be understood.
+    decoder = Decoder(update)
+    for _ in range(decoder.var_uint()):
+        count = decoder.var_uint()
+        client = decoder.var_uint()
+        clock = decoder.var_uint()
+        for _ in range(count):
+            info = decoder.uint8()
+            ref = info & 0x1F
+            if ref == CONTENT_GC:
+                clock += decoder.var_uint()
+                continue
+            if ref == CONTENT_SKIP:
+                clock += decoder.var_uint()
+                continue
+            if info & BIT8:
+                decoder.var_uint()
+                decoder.var_uint()
+            if info & BIT7:
+                decoder.var_uint()
+                decoder.var_uint()
+            if not info & (BIT7 | BIT8):
+                if decoder.var_uint():
+                    decoder.var_string()
+                else:
+                    decoder.var_uint()
+                    decoder.var_uint()
+                if info & BIT6:
+                    decoder.var_string()
+            if ref == CONTENT_ANY:
+                length = decoder.var_uint()
+                for _ in range(length):
+                    decoder.skip_any()
+                yield client, clock
+            elif ref == CONTENT_DELETED:
+                length = decoder.var_uint()
+            elif ref == CONTENT_STRING:
+                # Item length counts UTF-16 code units, as JS string length does.
+                length = len(decoder.var_string().encode('utf-16-le')) // 2
+            elif ref == CONTENT_JSON:
+                length = decoder.var_uint()
+                for _ in range(length):
+                    decoder.var_bytes()
+            elif ref in (CONTENT_BINARY, CONTENT_EMBED):
+                decoder.var_bytes()
+                length = 1
+            elif ref == CONTENT_FORMAT:
+                decoder.var_bytes()
+                decoder.var_bytes()
+                length = 1
+            elif ref == CONTENT_TYPE:
+                if decoder.var_uint() in (3, 5):
+                    decoder.var_bytes()
+                length = 1
+            elif ref == CONTENT_DOC:
+                decoder.var_bytes()
+                decoder.skip_any()
+                length = 1
+            else:
+                raise ValueError(f'unknown Yjs content ref {ref}')
+            clock += length
+
+def sync_message(step: int, payload: bytes):
+    return var_uint(MESSAGE_SYNC) + var_uint(step) + var_bytes(payload)
+
+EMPTY_STATE_VECTOR = var_uint(0)
+EMPTY_UPDATE = var_uint(0) + var_uint(0)
+
+# Minimal RFC 6455 client ------------------------------------------------------
+
+class WebSocket:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @classmethod
+    async def connect(cls, host: str, port: int, path: str):
+        reader, writer = await asyncio.open_connection(host, port)
+        key = b64encode(os.urandom(16)).decode('ascii')
+        writer.write((
+            f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+            f'Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n'
+        ).encode('ascii'))
+        head = await reader.readuntil(b'\r\n\r\n')
+        if not head.startswith(b'HTTP/1.1 101'):
+            raise ConnectionError(head.split(b'\r\n', 1)[0].decode('latin-1'))
+        return cls(reader, writer)
+
+    def send(self, payload: bytes, opcode=0x2):
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = bytes((0x80 | opcode, 0x80 | length))
+        elif length < 1 << 16:
+            header = bytes((0x80 | opcode, 0x80 | 126)) + length.to_bytes(2, 'big')
+        else:
+            header = bytes((0x80 | opcode, 0x80 | 127)) + length.to_bytes(8, 'big')
+        key = int.from_bytes((mask * (length // 4 + 1))[:length], 'big')
+        masked = (int.from_bytes(payload, 'big') ^ key).to_bytes(length, 'big') if length else b''
+        self.writer.write(header + mask + masked)
+        self.bytes_out += len(header) + 4 + length
+
+    async def recv(self):
+        # Returns the next binary/text message, or None once the peer closes.
+        message = []
+        while True:
+            head = await self.reader.readexactly(2)
+            opcode = head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = int.from_bytes(await self.reader.readexactly(2), 'big')
+            elif length == 127:
+                length = int.from_bytes(await self.reader.readexactly(8), 'big')
+            payload = await self.reader.readexactly(length) if length else b''
+            self.bytes_in += 2 + length
+            if opcode == 0x8:
+                return None
+            if opcode == 0x9:
+                self.send(payload, 0xA)
+                continue
+            if opcode == 0xA:
+                continue
+            message.append(payload)
+            if head[0] & 0x80:
+                return b''.join(message)
+
+    async def close(self):
+        try:
+            self.send(b'', 0x8)
+            self.writer.close()
+            await self.writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+# Server -----------------------------------------------------------------------
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+async def start_server(port: int):
+    node = shutil.which('node')
+    if node is None:
+        raise SystemExit('node not found; install Node.js 20+ to run the collab benchmark')
+    server = next((path for path in SERVER_BINS if Path(path).exists()), None)
+    if server is None:
+        raise SystemExit('node_modules/y-websocket is missing; run `npm install` first')
+    # Started as `node <bin>` rather than through npx so the pid is the server's.
+    process = subprocess.Popen([node, server], env=dict(os.environ, HOST='127.0.0.1', PORT=str(port)), stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit(f'y-websocket server exited with status {process.returncode}')
+            await asyncio.sleep(0.05)
+    process.kill()
+    raise SystemExit('y-websocket server did not start listening within 5s')
+
+def rss_bytes(pid: int):
+    try:
+        with open(f'/proc/{pid}/status', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    return None
+
+async def sample_rss(pid: int, samples: list, stop: asyncio.Event, interval=0.25):
+    while not stop.is_set():
+        value = rss_bytes(pid)
+        if value is not None:
+            samples.append(value)
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+# Operations -----------------------------------------------------------------
+
+def editor_operation(record: dict):
+    # Trace records carry the EditorOperation type in `timeline`; the HTML is a
+    # placeholder of typical block size since only the payload size matters here.
+    block_id = record.get('id') or f"group-{record.get('group', 0)}"
+    html = f'<p data-block-id="{block_id}">' + '编辑负载' * 24 + '</p>'
+    timestamp = int(time.time() * 1000)
+    if record['timeline'] == 'insert_text':
+        return {'type': 'insert_text', 'blockId': block_id, 'text': record.get('text', ''), 'offset': record.get('offset', 0), 'timestamp': timestamp}
+    if record['timeline'] == 'delete_block':
+        return {'type': 'delete_block', 'blockId': block_id, 'removedHtml': html, 'timestamp': timestamp}
+    return {'type': 'replace_block', 'blockId': block_id, 'beforeHtml': html, 'afterHtml': html, 'timestamp': timestamp}
+
+def load_trace(path, document: Path, profile: str, edits: int):
+    if path:
+        with open(path, encoding='utf-8') as f:
+            return [record for record in map(json.loads, f) if record['op'] != 'meta']
+    records, _ = generate_trace(load_oracle(document)['blocks'], profile, edits, 0)
+    return records
+
+# Clients --------------------------------------------------------------------
+
+class Run:
+    # State shared by every client of one (documents, clients) combination.
+    def __init__(self):
+        self.sent = {}
+        self.latencies = []
+        self.delivered = 0
+        self.updates_sent = 0
+        self.messages_in = 0
+        self.lag = []
+
+class Client:
+    def __init__(self, run: Run, room: str, client_id: int, trace, offset: int):
+        self.run = run
+        self.room = room
+        self.client_id = client_id
+        self.trace = trace
+        self.cursor = offset
+        self.clock = 0
+        self.origin = None
+        self.synced = asyncio.Event()
+        self.socket = None
+
+    async def connect(self, host: str, port: int):
+        self.socket = await WebSocket.connect(host, port, '/' + self.room)
+        self.socket.send(sync_message(SYNC_STEP1, EMPTY_STATE_VECTOR))
+
+    async def receive(self):
+        run = self.run
+        while True:
+            try:
+                message = await self.socket.recv()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                return
+            if message is None:
+                return
+            now = time.perf_counter()
+            run.messages_in += 1
+            decoder = Decoder(message)
+            if decoder.var_uint() != MESSAGE_SYNC:
+                continue
+            step = decoder.var_uint()
+            payload = decoder.var_bytes()
+            if step == SYNC_STEP1:
+                # The server asks for our state; a client that has only just connected has none.
+                self.socket.send(sync_message(SYNC_STEP2, EMPTY_UPDATE))
+                continue
+            for item in decode_update_items(payload):
+                self.origin = item
+                if item[0] == self.client_id:
+                    continue
+                sent = run.sent.get(item)
+                if sent is not None:
+                    run.latencies.append((now - sent) * 1000)
+                    run.delivered += 1
+            if step == SYNC_STEP2:
+                self.synced.set()
+
+    def publish(self):
+        record = self.trace[self.cursor % len(self.trace)]
+        self.cursor += 1
+        value = json.dumps(editor_operation(record), ensure_ascii=False)
+        item = (self.client_id, self.clock)
+        self.socket.send(sync_message(SYNC_UPDATE, encode_map_set(self.client_id, self.clock, self.origin, 'ops', 'latest', value)))
+        self.run.sent[item] = time.perf_counter()
+        self.run.updates_sent += 1
+        self.origin = item
+        self.clock += 1
+
+    async def drive(self, rate: float, duration: float, rng: random.Random):
+        # Fixed-rate publishing with a random phase; `lag` records how late the
+        # driver itself wakes up, so a saturated event loop shows in the report.
+        interval = 1 / rate
+        started = time.perf_counter()
+        due = started + rng.random() * interval
+        while due < started + duration:
+            await asyncio.sleep(max(0.0, due - time.perf_counter()))
+            self.run.lag.append((time.perf_counter() - due) * 1000)
+            self.publish()
+            due += interval
+
+async def run_combination(host, port, documents: int, clients: int, rate: float, duration: float, trace, drain: float, seed: int, pid=None):
+    run = Run()
+    rng = random.Random(f'{seed}:{documents}:{clients}')
+    rooms = [f'collab-bench-{seed}-{documents}x{clients}-{d}' for d in range(documents)]
+    members = []
+    ids = set()
+    for room in rooms:
+        for index in range(clients):
+            client_id = rng.getrandbits(32)
+            while client_id in ids:
+                client_id = rng.getrandbits(32)
+            ids.add(client_id)
+            members.append(Client(run, room, client_id, trace, rng.randrange(len(trace))))
+
+    rss = []
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_rss(pid, rss, stop)) if pid else None
+    rss_idle = rss_bytes(pid) if pid else None
+
+    await asyncio.gather(*(member.connect(host, port) for member in members))
+    receivers = [asyncio.create_task(member.receive()) for member in members]
+    await asyncio.wait_for(asyncio.gather(*(member.synced.wait() for member in members)), 30)
+    rss_connected = rss_bytes(pid) if pid else None
+    if rss_connected is not None:
+        rss.append(rss_connected)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(member.drive(rate, duration, rng) for member in members))
+    sending = time.perf_counter() - started
+
+    # Wait for fan-out to finish (or give up after `drain` seconds).
+    expected = run.updates_sent * (clients - 1)
+    deadline = time.perf_counter() + drain
+    while run.delivered < expected and time.perf_counter() < deadline:
+        await asyncio.sleep(0.05)
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    if sampler:
+        await sampler
+    for member in members:
+        await member.socket.close()
+    for task in receivers:
+        task.cancel()
+    await asyncio.gather(*receivers, return_exceptions=True)
+
+    bytes_out = sum(member.socket.bytes_out for member in members)
+    bytes_in = sum(member.socket.bytes_in for member in members)
+    return {
+        'documents': documents,
+        'clients_per_document': clients,
+        'connections': len(members),
+        'rate_per_client': rate,
+        'duration_seconds': round(sending, 3),
+        'updates_sent': run.updates_sent,
+        'deliveries_expected': expected,
+        'deliveries': run.delivered,
+        'delivery_ratio': round(run.delivered / expected, 4) if expected else 1.0,
+        'latency_ms': summarize_runs(run.latencies) if run.latencies else None,
+        'driver_lag_ms': summarize_runs(run.lag) if run.lag else None,
+        'throughput': {
+            'updates_in_per_second': round(run.updates_sent / sending, 1) if sending else 0.0,
+            'messages_out_per_second': round(run.messages_in / elapsed, 1) if elapsed else 0.0,
+            'bytes_in_per_second': round(bytes_out / elapsed, 1) if elapsed else 0.0,
+            'bytes_out_per_second': round(bytes_in / elapsed, 1) if elapsed else 0.0,
+        },
+        'server_rss_bytes': {
+            'idle': rss_idle,
+            'connected': rss_connected,
+            'peak': max(rss) if rss else None,
+            'end': rss[-1] if rss else None,
+        } if pid else None,
+    }
+
+async def bench(args, trace):
+    results = []
+    for documents in args.documents:
+        for clients in args.clients:
+            # A fresh server per combination keeps the memory figures comparable.
+            process = None
+            if args.endpoint:
+                host, _, port = args.endpoint.removeprefix('ws://').partition(':')
+                port = int(port or 80)
+                pid = args.server_pid
+            else:
+                host, port = '127.0.0.1', free_port()
+                process = await start_server(port)
+                pid = process.pid
+            try:
+                result = await run_combination(host, port, documents, clients, args.rate, args.duration, trace, args.drain, args.seed, pid)
+            finally:
+                if process:
+                    process.terminate()
+                    process.wait()
+            results.append(result)
+            latency = result['latency_ms'] or {}
+            rss = (result['server_rss_bytes'] or {}).get('peak')
+            print(f"{documents} docs x {clients} clients: {result['updates_sent']} updates, delivery {result['delivery_ratio']:.2%}, "
+                  f"p50 {latency.get('p50', 0):.1f}ms p99 {latency.get('p99', 0):.1f}ms, "
+                  f"{result['throughput']['messages_out_per_second']:.0f} msg/s out" + (f', peak rss {rss / 1_048_576:.1f} MiB' if rss else ''), file=sys.stderr)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Drive a local y-websocket server with simulated collaborators and report fan-out latency.')
+    parser.add_argument('--documents', default='1', help='comma-separated documents (rooms) per run (default: 1)')
+    parser.add_argument('--clients', default='2,4,8,16', help='comma-separated clients per document (default: 2,4,8,16)')
+    parser.add_argument('--rate', type=float, default=5.0, help='updates per second per client (default: 5)')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds of publishing per run (default: 10)')
+    parser.add_argument('--drain', type=float, default=5.0, help='seconds to wait for outstanding deliveries (default: 5)')
+    parser.add_argument('--trace', type=Path, help='edit trace JSONL from scripts_generate_edit_traces.py (default: generate one)')
+    parser.add_argument('--document', type=Path, default=stress.out_file, help='oracle source when generating a trace')
+    parser.add_argument('--profile', choices=list(PROFILES), default='mixed')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--endpoint', help='use a running server, e.g. ws://127.0.0.1:1234, instead of starting one')
+    parser.add_argument('--server-pid', type=int, help='pid of the --endpoint server, for memory sampling')
+    parser.add_argument('--out', type=Path, default=results_path)
+    args = parser.parse_args(argv)
+
+    args.documents = [int(value) for value in args.documents.split(',') if value.strip()]
+    args.clients = [int(value) for value in args.clients.split(',') if value.strip()]
+    trace = load_trace(args.trace, args.document, args.profile, 2000)
+    results = asyncio.run(bench(args, trace))
+
+    report = {'trace': str(args.trace) if args.trace else f'{args.document.name}:{args.profile}', 'runs': results}
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    print(str(args.out))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+from pathlib import Path
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+import scripts_generate_stress_docx as stress
+
+STAGES = ('parseDocxToHtmlSnapshot', 'parseDocxStyleProfile', 'applyWordRenderModel', 'paginateBlocks')
+RUNNER_CONFIG = 'vitest.bench.config.ts'
+results_path = Path('bench/results/latest.json')
+
+def percentile(values, q: float):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * q
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize_runs(samples):
+    return {
+        'min': round(min(samples), 3),
+        'p50': round(percentile(samples, 0.5), 3),
+        'p90': round(percentile(samples, 0.9), 3),
+        'p99': round(percentile(samples, 0.99), 3),
+        'max': round(max(samples), 3),
+        'mean': round(statistics.fmean(samples), 3),
+    }
+
+def run_node(documents, repeat: int, warmup: int):
+    npx = shutil.which('npx')
+    if npx is None:
+        raise SystemExit('npx not found; install Node.js 20+ to run the pipeline benchmark')
+    if not Path('node_modules/vitest').exists():
+        raise SystemExit('node_modules/vitest is missing; run `npm install` first')
+
+    with tempfile.TemporaryDirectory(prefix='docx-bench-') as tmp:
+        request_path = Path(tmp) / 'request.json'
+        result_path = Path(tmp) / 'result.json'
+        request_path.write_text(json.dumps({
+            'documents': [str(Path(doc).resolve()) for doc in documents],
+            'repeat': repeat,
+            'warmup': warmup,
+            'resultPath': str(result_path),
+        }), encoding='utf-8')
+        env = dict(os.environ, DOCX_BENCH_REQUEST=str(request_path))
+        subprocess.run([npx, '--no-install', 'vitest', 'run', '--config', RUNNER_CONFIG, '--reporter', 'dot'], env=env, check=True)
+        return json.loads(result_path.read_text(encoding='utf-8'))
+
+def build_report(raw, ladder_documents):
+    sizes = {str((stress_dir / doc['file']).resolve()): doc for stress_dir, doc in ladder_documents}
+    report = {'node': raw['node'], 'documents': []}
+    for doc in raw['documents']:
+        entry = {
+            'file': Path(doc['path']).name,
+            'blocks': doc['blocks'],
+            'pages': doc['pages'],
+            'runs': len(doc['runs']),
+            'stages_ms': {stage: summarize_runs([run['stages'][stage] for run in doc['runs']]) for stage in STAGES},
+            'peak_heap_used_bytes': max(run['peakHeapUsedBytes'] for run in doc['runs']),
+            'max_rss_bytes': doc['maxRssBytes'],
+        }
+        manifest_entry = sizes.get(doc['path'])
+        if manifest_entry:
+            entry['document_xml_bytes'] = manifest_entry['document_xml_bytes']
+            entry['archive_bytes'] = manifest_entry['archive_bytes']
+        report['documents'].append(entry)
+    return report
+
+def compare_to_baseline(report, baseline, tolerance: float):
+    # A stage regresses when its p50 exceeds the baseline p50 by more than `tolerance`.
+    regressions = []
+    previous = {doc['file']: doc for doc in baseline['documents']}
+    for doc in report['documents']:
+        base = previous.get(doc['file'])
+        if not base:
+            continue
+        for stage in STAGES:
+            current = doc['stages_ms'][stage]['p50']
+            reference = base['stages_ms'][stage]['p50']
+            if reference > 0 and current > reference * (1 + tolerance):
+                regressions.append(f"{doc['file']} {stage}: p50 {current:.1f}ms vs baseline {reference:.1f}ms")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the TypeScript DOCX pipeline over generated fixtures.')
+    parser.add_argument('--ladder', default='1,10,100', help='stress ladder factors to build or reuse (empty to skip)')
+    parser.add_argument('--ladder-dir', type=Path, default=stress.out_dir / 'ladder')
+    parser.add_argument('--docs', nargs='*', default=[], type=Path, help='additional .docx files to benchmark')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--out', type=Path, default=results_path)
+    parser.add_argument('--baseline', type=Path, help='fail when a stage p50 regresses past this stored report')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p50 slowdown ratio against the baseline (default: 0.2)')
+    parser.add_argument('--write-baseline', action='store_true', help='also store this report as the baseline')
+    args = parser.parse_args(argv)
+
+    ladder_documents = []
+    if args.ladder:
+        factors = [int(value) for value in args.ladder.split(',') if value.strip()]
+        ladder_documents = [(args.ladder_dir, doc) for doc in stress.build_ladder(args.ladder_dir, factors)]
+    documents = [args.ladder_dir / doc['file'] for _, doc in ladder_documents] + list(args.docs)
+    if not documents:
+        raise SystemExit('nothing to benchmark')
+
+    report = build_report(run_node(documents, args.repeat, args.warmup), ladder_documents)
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    print(str(args.out))
+
+    if args.baseline and args.write_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    elif args.baseline:
+        regressions = compare_to_baseline(report, json.loads(args.baseline.read_text(encoding='utf-8')), args.tolerance)
+        for line in regressions:
+            print(f'REGRESSION {line}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+from timeit import Timer
+import argparse
+import json
+
+import scripts_docx_builder as builder
+import scripts_generate_stress_docx as stress
+
+# Reference copies of the per-call f-string helpers the generators used before
+# the shared builder module, kept here as the "before" side of the benchmark.
+
+def legacy_p(text: str, keep_next=False, keep_lines=False, page_break=False):
+    ppr = []
+    if keep_next:
+        ppr.append('<w:keepNext/>')
+    if keep_lines:
+        ppr.append('<w:keepLines/>')
+    if page_break:
+        ppr.append('<w:pageBreakBefore/>')
+    ppr_xml = f"<w:pPr>{''.join(ppr)}</w:pPr>" if ppr else ''
+    return f'<w:p>{ppr_xml}<w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+def legacy_list_p(num_id: int, ilvl: int, text: str):
+    return f'<w:p><w:pPr><w:numPr><w:ilvl w:val="{ilvl}"/><w:numId w:val="{num_id}"/></w:numPr></w:pPr><w:r><w:t xml:space="preserve">{text}</w:t></w:r></w:p>'
+
+def legacy_image_paragraph(rid: str, docpr_id: int, cx: int, cy: int):
+    return f'''<w:p><w:r><w:drawing>
+      <wp:inline xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">
+        <wp:extent cx="{cx}" cy="{cy}"/>
+        <wp:docPr id="{docpr_id}" name="img-{docpr_id}"/>
+        <wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>
+        <a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture"><pic:pic>
+          <pic:nvPicPr><pic:cNvPr id="{docpr_id}" name="img-{docpr_id}"/><pic:cNvPicPr/></pic:nvPicPr>
+          <pic:blipFill><a:blip xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>
+          <pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>
+        </pic:pic></a:graphicData></a:graphic>
+      </wp:inline>
+    </w:drawing></w:r></w:p>'''
+
+def legacy_table_block(rows=8, cols=4):
+    trs = []
+    for r in range(rows):
+        tcs = []
+        for c in range(cols):
+            content = f'R{r+1}C{c+1} 表格单元格测试：长文本用于验证换行与padding。'
+            tcs.append(f'<w:tc><w:tcPr><w:tcW w:w="2400" w:type="dxa"/></w:tcPr><w:p><w:r><w:t>{content}</w:t></w:r></w:p></w:tc>')
+        trs.append('<w:tr>' + ''.join(tcs) + '</w:tr>')
+    return '<w:tbl><w:tblPr><w:tblW w:w="0" w:type="auto"/><w:tblBorders><w:top w:val="single" w:sz="8"/><w:left w:val="single" w:sz="8"/><w:bottom w:val="single" w:sz="8"/><w:right w:val="single" w:sz="8"/><w:insideH w:val="single" w:sz="6"/><w:insideV w:val="single" w:sz="6"/></w:tblBorders></w:tblPr><w:tblGrid>' + ''.join(['<w:gridCol w:w="2400"/>' for _ in range(cols)]) + '</w:tblGrid>' + ''.join(trs) + '</w:tbl>'
+
+TEXT = '章节 3 - 段落 7: 这是一段较长文本，用于测试行高、段间距、换行、标点与中英混排。'
+
+CASES = [
+    ('p', lambda: legacy_p(TEXT, keep_lines=True), lambda: builder.p(TEXT, keep_lines=True)),
+    ('list_p', lambda: legacy_list_p(1, 2, TEXT), lambda: builder.list_p(1, 2, TEXT)),
+    ('image_paragraph', lambda: legacy_image_paragraph('rId4', 2032, 2743200, 2057400), lambda: builder.image_paragraph('rId4', 2032, 2743200, 2057400)),
+    ('table_block', lambda: legacy_table_block(6, 4), lambda: builder.table_block(6, 4)),
+]
+
+def fragments_per_second(fn, seconds: float):
+    timer = Timer(fn)
+    number, elapsed = timer.autorange()
+    best = elapsed
+    total = elapsed
+    while total < seconds:
+        elapsed = timer.timeit(number)
+        best = min(best, elapsed)
+        total += elapsed
+    return number / best
+
+def run(seconds: float):
+    results = {}
+    for name, before, after in CASES:
+        assert before() == after(), name
+        before_rate = fragments_per_second(before, seconds)
+        after_rate = fragments_per_second(after, seconds)
+        results[name] = {
+            'before_per_second': round(before_rate),
+            'after_per_second': round(after_rate),
+            'speedup': round(after_rate / before_rate, 2),
+        }
+
+    section_rate = fragments_per_second(lambda: sum(1 for _ in stress.iter_section_parts(6)), seconds)
+    results['stress_section'] = {
+        'fragments_per_second': round(section_rate * sum(1 for _ in stress.iter_section_parts(6))),
+    }
+    results['cache_info'] = builder.fragment_cache_info()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmark the OOXML fragment helpers before and after template precompilation.')
+    parser.add_argument('--seconds', type=float, default=1.0, help='minimum measuring time per case')
+    args = parser.parse_args(argv)
+    print(json.dumps(run(args.seconds), indent=2))
+
+if __name__ == '__main__':
+    main()
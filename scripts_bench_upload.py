@@ -0,0 +1,413 @@
+from base64 import b64encode
+from hashlib import sha256
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import time
+
+from scripts_bench_collab import free_port
+from scripts_bench_docx_pipeline import summarize_runs
+import scripts_docx_media as media
+
+# Load tool for app/api/assets/upload/route.ts. A local HTTP stand-in plays
+# Upyun's REST API (`PUT /<bucket>/<path>` with Basic auth) with configurable
+# latency, bandwidth and error injection; the route is started against it (or
+# an already running app is used) and fed multipart uploads shaped like
+# lib/assets/imagePipeline.ts's uploadAssetToUpyun at increasing concurrency.
+# The stand-in counts the upstream connections the route opens, and the app's
+# process-tree RSS is sampled to estimate how much each in-flight request holds.
+
+results_path = Path('bench/results/upload-latest.json')
+NEXT_BIN = 'node_modules/next/dist/bin/next'
+ROUTE = '/api/assets/upload'
+BUCKET = 'bench'
+OPERATOR = 'bench'
+PASSWORD = 'bench'
+
+# Upyun stand-in -------------------------------------------------------------
+
+class Upstream:
+    def __init__(self, latency_ms: float, jitter_ms: float, mbit: float, error_rate: float, error_status: int, reset_rate: float, seed: int):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.mbit = mbit
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.reset_rate = reset_rate
+        self.rng = random.Random(seed)
+        self.server = None
+        self.port = None
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.connections = 0
+        self.open_connections = 0
+        self.max_open_connections = 0
+        self.requests = 0
+        self.bytes_received = 0
+        self.errors_injected = 0
+        self.resets_injected = 0
+        self.unauthorized = 0
+
+    def counters(self):
+        return {
+            'connections_opened': self.connections,
+            'max_open_connections': self.max_open_connections,
+            'requests': self.requests,
+            'requests_per_connection': round(self.requests / self.connections, 2) if self.connections else 0.0,
+            'bytes_received': self.bytes_received,
+            'errors_injected': self.errors_injected,
+            'resets_injected': self.resets_injected,
+            'unauthorized': self.unauthorized,
+        }
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, '127.0.0.1', 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        self.open_connections += 1
+        self.max_open_connections = max(self.max_open_connections, self.open_connections)
+        try:
+            while True:
+                request = await read_http_message(reader)
+                if request is None:
+                    return
+                start_line, headers, body = request
+                self.requests += 1
+                self.bytes_received += len(body)
+                method, path, _ = start_line.split(' ', 2)
+                delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+                if self.mbit:
+                    delay += len(body) * 8 / (self.mbit * 1_000_000)
+                await asyncio.sleep(delay)
+                roll = self.rng.random()
+                if roll < self.reset_rate:
+                    # Drop the connection without answering, as a flaky upstream would.
+                    self.resets_injected += 1
+                    writer.transport.abort()
+                    return
+                if headers.get('authorization') != basic_auth(OPERATOR, PASSWORD):
+                    self.unauthorized += 1
+                    status, payload = 401, {'msg': 'need authorization', 'code': 40100001}
+                elif method != 'PUT' or not path.startswith(f'/{BUCKET}/'):
+                    status, payload = 404, {'msg': 'file or directory not found', 'code': 40400001}
+                elif roll < self.reset_rate + self.error_rate:
+                    self.errors_injected += 1
+                    status, payload = self.error_status, {'msg': 'injected upstream error', 'code': self.error_status * 100000 + 1}
+                else:
+                    status, payload = 200, None
+                answer = json.dumps(payload).encode('utf-8') if payload else b''
+                extra = '' if payload else f'x-upyun-content-length: {len(body)}\r\n'
+                writer.write(f'HTTP/1.1 {status} {"OK" if status == 200 else "Error"}\r\ncontent-type: application/json\r\ncontent-length: {len(answer)}\r\n{extra}x-request-id: {self.requests:016x}\r\n\r\n'.encode('ascii') + answer)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+
+def basic_auth(operator: str, password: str):
+    return 'Basic ' + b64encode(f'{operator}:{password}'.encode('utf-8')).decode('ascii')
+
+# HTTP/1.1 ---------------------------------------------------------------------
+
+async def read_http_message(reader):
+    # Returns (start line, lower-cased headers, body) or None on a clean close.
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError as error:
+        if not error.partial:
+            return None
+        raise
+    lines = head[:-4].decode('latin-1').split('\r\n')
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';', 1)[0], 16)
+            if size == 0:
+                await reader.readuntil(b'\r\n')
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b''.join(chunks)
+    else:
+        length = int(headers.get('content-length', 0))
+        body = await reader.readexactly(length) if length else b''
+    return lines[0], headers, body
+
+def multipart_upload(payload: bytes, digest: str, kind: str, boundary: str):
+    # Same fields as uploadAssetToUpyun: file, hash, extension.
+    extension = 'png' if kind == 'png' else 'jpg'
+    parts = [
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{digest}.{extension}"\r\nContent-Type: image/{kind}\r\n\r\n'.encode('ascii'),
+        payload,
+        f'\r\n--{boundary}\r\nContent-Disposition: form-data; name="hash"\r\n\r\n{digest}'
+        f'\r\n--{boundary}\r\nContent-Disposition: form-data; name="extension"\r\n\r\n{extension}'
+        f'\r\n--{boundary}--\r\n'.encode('ascii'),
+    ]
+    return b''.join(parts)
+
+class Payload:
+    def __init__(self, kind: str, data: bytes):
+        self.kind = kind
+        self.size = len(data)
+        self.digest = sha256(data).hexdigest()
+        self.boundary = f'----WebKitFormBoundary{self.digest[:16]}'
+        self.body = multipart_upload(data, self.digest, kind, self.boundary)
+
+def build_payloads(sizes_kb, kind: str, distinct: int, seed: int):
+    payloads = []
+    for kb in sizes_kb:
+        width, height = media.dimensions_for_bytes(kind, int(kb * 1000))
+        for index in range(distinct):
+            payloads.append(Payload(kind, media.synthetic_image(kind, width, height, seed=seed + len(payloads))))
+    return payloads
+
+class Connection:
+    # One keep-alive connection per worker, reopened after errors or `close`.
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def post(self, path: str, payload: Payload):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write((
+            f'POST {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\nContent-Type: multipart/form-data; boundary={payload.boundary}\r\n'
+            f'Content-Length: {len(payload.body)}\r\nAccept: */*\r\n\r\n'
+        ).encode('ascii') + payload.body)
+        await self.writer.drain()
+        response = await read_http_message(self.reader)
+        if response is None:
+            raise ConnectionError('connection closed before response')
+        start_line, headers, body = response
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return int(start_line.split(' ', 2)[1]), body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+# App process -----------------------------------------------------------------
+
+def tree_rss(pid: int):
+    # RSS of `pid` plus its descendants (next dev/start fork worker processes).
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', encoding='ascii', errors='replace') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+        except (FileNotFoundError, ProcessLookupError, IndexError):
+            continue
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        try:
+            with open(f'/proc/{current}/statm', encoding='ascii') as f:
+                total += int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except FileNotFoundError:
+            continue
+        stack.extend(children.get(current, ()))
+    return total
+
+async def start_app(mode: str, port: int, upstream_port: int):
+    node = shutil.which('node')
+    if node is None:
+        raise SystemExit('node not found; install Node.js 20+ to run the upload benchmark')
+    if not Path(NEXT_BIN).exists():
+        raise SystemExit('node_modules/next is missing; run `npm install` first')
+    if mode == 'start' and not Path('.next/BUILD_ID').exists():
+        raise SystemExit('no production build found; run `npm run build` first or pass --mode dev')
+    env = dict(
+        os.environ,
+        UPYUN_BUCKET=BUCKET,
+        UPYUN_OPERATOR=OPERATOR,
+        UPYUN_PASSWORD=PASSWORD,
+        UPYUN_DOMAIN=f'http://127.0.0.1:{upstream_port}',
+        UPYUN_CDN_DOMAIN='http://cdn.bench.invalid',
+        NEXT_TELEMETRY_DISABLED='1',
+    )
+    process = subprocess.Popen([node, NEXT_BIN, mode, '-H', '127.0.0.1', '-p', str(port)], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(600):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit(f'next {mode} exited with status {process.returncode}')
+            await asyncio.sleep(0.1)
+    process.kill()
+    raise SystemExit(f'next {mode} did not start listening within 60s')
+
+# Driver -----------------------------------------------------------------------
+
+async def sample_tree_rss(pid: int, samples: list, stop: asyncio.Event, interval=0.05):
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        samples.append(await loop.run_in_executor(None, tree_rss, pid))
+        try:
+            await asyncio.wait_for(stop.wait(), interval)
+        except asyncio.TimeoutError:
+            pass
+
+async def run_level(host: str, port: int, concurrency: int, duration: float, payloads, upstream: Upstream, pid, seed: int):
+    upstream.reset_counters()
+    rng = random.Random(f'{seed}:{concurrency}')
+    latencies = []
+    statuses = {}
+    failures = 0
+    sent_bytes = 0
+
+    rss = []
+    stop = asyncio.Event()
+    baseline = tree_rss(pid) if pid else None
+    sampler = asyncio.create_task(sample_tree_rss(pid, rss, stop)) if pid else None
+
+    async def worker():
+        nonlocal failures, sent_bytes
+        connection = Connection(host, port)
+        while time.perf_counter() < deadline:
+            payload = rng.choice(payloads)
+            started = time.perf_counter()
+            try:
+                status, _ = await connection.post(ROUTE, payload)
+            except (ConnectionError, asyncio.IncompleteReadError, OSError):
+                failures += 1
+                connection.close()
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+            statuses[status] = statuses.get(status, 0) + 1
+            sent_bytes += payload.size
+        connection.close()
+
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    if sampler:
+        await sampler
+
+    completed = len(latencies)
+    memory = None
+    if pid and rss:
+        peak = max(rss)
+        # Growth over the pre-level baseline spread over the requests in flight;
+        # compare with payload_bytes to see how many copies the route holds.
+        per_request = max(0, peak - baseline) / concurrency
+        memory = {
+            'baseline_rss_bytes': baseline,
+            'peak_rss_bytes': peak,
+            'buffered_bytes_per_request': round(per_request),
+            'buffered_to_payload_ratio': round(per_request / (sent_bytes / completed), 2) if completed and sent_bytes else None,
+        }
+    return {
+        'concurrency': concurrency,
+        'duration_seconds': round(elapsed, 3),
+        'requests': completed,
+        'requests_per_second': round(completed / elapsed, 1) if elapsed else 0.0,
+        'payload_bytes_per_second': round(sent_bytes / elapsed, 1) if elapsed else 0.0,
+        'mean_payload_bytes': round(sent_bytes / completed) if completed else 0,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'connection_failures': failures,
+        'latency_ms': summarize_runs(latencies) if latencies else None,
+        'upstream': upstream.counters(),
+        'memory': memory,
+    }
+
+async def bench(args, payloads):
+    upstream = Upstream(args.upstream_latency_ms, args.upstream_jitter_ms, args.upstream_mbit, args.error_rate, args.error_status, args.reset_rate, args.seed)
+    await upstream.start()
+    process = None
+    try:
+        if args.app_url:
+            host, _, port = args.app_url.removeprefix('http://').rstrip('/').partition(':')
+            port = int(port or 80)
+            pid = args.app_pid
+            print(f'upstream stand-in on http://127.0.0.1:{upstream.port}; the app must run with UPYUN_DOMAIN pointing there and UPYUN_BUCKET/OPERATOR/PASSWORD={BUCKET}', file=sys.stderr)
+        else:
+            host, port = '127.0.0.1', free_port()
+            process = await start_app(args.mode, port, upstream.port)
+            pid = process.pid
+        # Warm-up compiles the route in dev mode and primes upstream pools.
+        await run_level(host, port, 1, args.warmup, payloads[:1], upstream, None, args.seed)
+        levels = []
+        for concurrency in args.concurrency:
+            result = await run_level(host, port, concurrency, args.duration, payloads, upstream, pid, args.seed)
+            levels.append(result)
+            latency = result['latency_ms'] or {}
+            memory = result['memory'] or {}
+            print(f"c={concurrency}: {result['requests_per_second']:.1f} req/s, p50 {latency.get('p50', 0):.1f}ms p99 {latency.get('p99', 0):.1f}ms, "
+                  f"upstream {result['upstream']['connections_opened']} connections / {result['upstream']['requests']} requests"
+                  + (f", {memory['buffered_bytes_per_request'] / 1_048_576:.1f} MiB buffered per request" if memory else ''), file=sys.stderr)
+        return levels
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+        await upstream.stop()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the asset upload route against a local Upyun stand-in.')
+    parser.add_argument('--concurrency', default='1,4,16,64', help='comma-separated concurrent uploaders per level (default: 1,4,16,64)')
+    parser.add_argument('--duration', type=float, default=10.0, help='seconds per level (default: 10)')
+    parser.add_argument('--warmup', type=float, default=3.0, help='seconds of single-client warm-up (default: 3)')
+    parser.add_argument('--sizes', default='60,300,1500', help='comma-separated payload sizes in KB (default: 60,300,1500)')
+    parser.add_argument('--format', dest='kind', choices=('png', 'jpeg'), default='jpeg')
+    parser.add_argument('--distinct', type=int, default=4, help='distinct payloads per size (default: 4)')
+    parser.add_argument('--upstream-latency-ms', type=float, default=80.0)
+    parser.add_argument('--upstream-jitter-ms', type=float, default=40.0)
+    parser.add_argument('--upstream-mbit', type=float, default=0.0, help='upstream ingest bandwidth per request in Mbit/s (default: unlimited)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of uploads answered with --error-status')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--reset-rate', type=float, default=0.0, help='fraction of uploads whose upstream connection is dropped unanswered')
+    parser.add_argument('--mode', choices=('start', 'dev'), default='start', help='next command used to serve the route (default: start, needs `npm run build`)')
+    parser.add_argument('--app-url', help='use a running app, e.g. http://127.0.0.1:3000, instead of starting one')
+    parser.add_argument('--app-pid', type=int, help='pid of the --app-url server, for memory sampling')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', type=Path, default=results_path)
+    args = parser.parse_args(argv)
+
+    args.concurrency = [int(value) for value in args.concurrency.split(',') if value.strip()]
+    sizes = [float(value) for value in args.sizes.split(',') if value.strip()]
+    payloads = build_payloads(sizes, args.kind, args.distinct, args.seed)
+    levels = asyncio.run(bench(args, payloads))
+
+    report = {
+        'upstream': {key: getattr(args, key) for key in ('upstream_latency_ms', 'upstream_jitter_ms', 'upstream_mbit', 'error_rate', 'error_status', 'reset_rate')},
+        'payloads': {'kind': args.kind, 'sizes_kb': sizes, 'distinct': args.distinct},
+        'levels': levels,
+    }
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+    print(str(args.out))
+
+if __name__ == '__main__':
+    main()
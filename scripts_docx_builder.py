@@ -0,0 +1,520 @@
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+from types import SimpleNamespace
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+import base64
+import json
+import os
+
+BUILDER_SOURCE = Path(__file__)
+
+# 1x1 PNGs (red/green/blue)
+PNG_RED = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAwMCAO7Z6wAAAABJRU5ErkJggg==')
+PNG_GREEN = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8z8AARQMBgAq8rVQAAAAASUVORK5CYII=')
+PNG_BLUE = base64.b64decode('iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8zwAAAgMBgN5n0WkAAAAASUVORK5CYII=')
+
+CONTENT_TYPES = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+  <Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+  <Default Extension="xml" ContentType="application/xml"/>
+  <Default Extension="png" ContentType="image/png"/>
+  <Override PartName="/word/document.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>
+  <Override PartName="/word/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>
+  <Override PartName="/word/numbering.xml" ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.numbering+xml"/>
+</Types>
+'''
+
+RELS = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>
+</Relationships>
+'''
+
+DOC_RELS = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+  <Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+  <Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/numbering" Target="numbering.xml"/>
+  <Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="media/image-small.png"/>
+  <Relationship Id="rId4" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="media/image-medium.png"/>
+  <Relationship Id="rId5" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="media/image-large.png"/>
+</Relationships>
+'''
+
+# Compact styles/numbering used by the stress document (three list levels).
+STRESS_STYLES = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:docDefaults>
+    <w:rPrDefault>
+      <w:rPr>
+        <w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman" w:eastAsia="等线"/>
+        <w:sz w:val="28"/>
+      </w:rPr>
+    </w:rPrDefault>
+    <w:pPrDefault>
+      <w:pPr><w:spacing w:line="360" w:lineRule="auto" w:after="120"/></w:pPr>
+    </w:pPrDefault>
+  </w:docDefaults>
+  <w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/></w:style>
+  <w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:rPr><w:b/><w:sz w:val="40"/><w:color w:val="0F4761"/></w:rPr></w:style>
+  <w:style w:type="paragraph" w:styleId="Heading2"><w:name w:val="heading 2"/><w:rPr><w:b/><w:sz w:val="34"/><w:color w:val="1F4E79"/></w:rPr></w:style>
+  <w:style w:type="paragraph" w:styleId="Heading3"><w:name w:val="heading 3"/><w:rPr><w:b/><w:sz w:val="30"/><w:color w:val="2F6D9B"/></w:rPr></w:style>
+</w:styles>
+'''
+
+STRESS_NUMBERING = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:numbering xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:abstractNum w:abstractNumId="0">
+    <w:multiLevelType w:val="hybridMultilevel"/>
+    <w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="decimal"/><w:lvlText w:val="%1."/><w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:lvl>
+    <w:lvl w:ilvl="1"><w:start w:val="1"/><w:numFmt w:val="lowerLetter"/><w:lvlText w:val="%1.%2."/><w:pPr><w:ind w:left="1440" w:hanging="360"/></w:pPr></w:lvl>
+    <w:lvl w:ilvl="2"><w:start w:val="1"/><w:numFmt w:val="lowerRoman"/><w:lvlText w:val="%1.%2.%3."/><w:pPr><w:ind w:left="2160" w:hanging="360"/></w:pPr></w:lvl>
+  </w:abstractNum>
+  <w:abstractNum w:abstractNumId="1">
+    <w:multiLevelType w:val="multilevel"/>
+    <w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="bullet"/><w:lvlText w:val="•"/><w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr></w:lvl>
+    <w:lvl w:ilvl="1"><w:start w:val="1"/><w:numFmt w:val="bullet"/><w:lvlText w:val="◦"/><w:pPr><w:ind w:left="1440" w:hanging="360"/></w:pPr></w:lvl>
+    <w:lvl w:ilvl="2"><w:start w:val="1"/><w:numFmt w:val="bullet"/><w:lvlText w:val="▪"/><w:pPr><w:ind w:left="2160" w:hanging="360"/></w:pPr></w:lvl>
+  </w:abstractNum>
+  <w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>
+  <w:num w:numId="2"><w:abstractNumId w:val="1"/></w:num>
+</w:numbering>
+'''
+
+# Fully spelled-out styles/numbering used by the full coverage document.
+COVERAGE_STYLES = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:docDefaults>
+    <w:rPrDefault>
+      <w:rPr>
+        <w:rFonts w:ascii="Times New Roman" w:hAnsi="Times New Roman" w:eastAsia="等线"/>
+        <w:sz w:val="28"/>
+        <w:szCs w:val="28"/>
+      </w:rPr>
+    </w:rPrDefault>
+    <w:pPrDefault>
+      <w:pPr>
+        <w:spacing w:line="360" w:lineRule="auto" w:after="120"/>
+      </w:pPr>
+    </w:pPrDefault>
+  </w:docDefaults>
+
+  <w:style w:type="paragraph" w:default="1" w:styleId="Normal">
+    <w:name w:val="Normal"/>
+    <w:qFormat/>
+  </w:style>
+
+  <w:style w:type="paragraph" w:styleId="Heading1">
+    <w:name w:val="heading 1"/>
+    <w:basedOn w:val="Normal"/>
+    <w:qFormat/>
+    <w:pPr><w:spacing w:before="120" w:after="120"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="40"/><w:color w:val="0F4761"/></w:rPr>
+  </w:style>
+
+  <w:style w:type="paragraph" w:styleId="Heading2">
+    <w:name w:val="heading 2"/>
+    <w:basedOn w:val="Normal"/>
+    <w:qFormat/>
+    <w:pPr><w:spacing w:before="80" w:after="80"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="34"/><w:color w:val="1F4E79"/></w:rPr>
+  </w:style>
+
+  <w:style w:type="paragraph" w:styleId="Heading3">
+    <w:name w:val="heading 3"/>
+    <w:basedOn w:val="Normal"/>
+    <w:qFormat/>
+    <w:pPr><w:spacing w:before="60" w:after="60"/></w:pPr>
+    <w:rPr><w:b/><w:sz w:val="30"/><w:color w:val="2F6D9B"/></w:rPr>
+  </w:style>
+</w:styles>
+'''
+
+COVERAGE_NUMBERING = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:numbering xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">
+  <w:abstractNum w:abstractNumId="0">
+    <w:multiLevelType w:val="hybridMultilevel"/>
+    <w:lvl w:ilvl="0">
+      <w:start w:val="1"/>
+      <w:numFmt w:val="decimal"/>
+      <w:lvlText w:val="%1."/>
+      <w:lvlJc w:val="left"/>
+      <w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr>
+    </w:lvl>
+    <w:lvl w:ilvl="1">
+      <w:start w:val="1"/>
+      <w:numFmt w:val="lowerLetter"/>
+      <w:lvlText w:val="%1.%2."/>
+      <w:lvlJc w:val="left"/>
+      <w:pPr><w:ind w:left="1440" w:hanging="360"/></w:pPr>
+    </w:lvl>
+  </w:abstractNum>
+
+  <w:abstractNum w:abstractNumId="1">
+    <w:multiLevelType w:val="multilevel"/>
+    <w:lvl w:ilvl="0">
+      <w:start w:val="1"/>
+      <w:numFmt w:val="bullet"/>
+      <w:lvlText w:val="•"/>
+      <w:lvlJc w:val="left"/>
+      <w:pPr><w:ind w:left="720" w:hanging="360"/></w:pPr>
+    </w:lvl>
+    <w:lvl w:ilvl="1">
+      <w:start w:val="1"/>
+      <w:numFmt w:val="bullet"/>
+      <w:lvlText w:val="◦"/>
+      <w:lvlJc w:val="left"/>
+      <w:pPr><w:ind w:left="1440" w:hanging="360"/></w:pPr>
+    </w:lvl>
+  </w:abstractNum>
+
+  <w:num w:numId="1"><w:abstractNumId w:val="0"/></w:num>
+  <w:num w:numId="2"><w:abstractNumId w:val="1"/></w:num>
+</w:numbering>
+'''
+
+DOCUMENT_HEAD = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">
+  <w:body>
+    '''
+
+DOCUMENT_TAIL = '''
+    <w:sectPr>
+      <w:pgSz w:w="11906" w:h="16838"/>
+      <w:pgMar w:top="1440" w:right="1800" w:bottom="1440" w:left="1800" w:header="851" w:footer="992" w:gutter="0"/>
+      <w:cols w:space="425"/>
+      <w:docGrid w:type="lines" w:linePitch="312"/>
+    </w:sectPr>
+  </w:body>
+</w:document>
+'''
+
+# Filler alphabets for generated text: common Han characters and Latin letters.
+CJK = '的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严'
+LATIN = 'abcdefghijklmnopqrstuvwxyz'
+
+EMU_PER_PX = 9525
+# Content width of DOCUMENT_TAIL's A4 sectPr: 11906 - 1800 - 1800 twips.
+MAX_EXTENT_CX = (11906 - 1800 - 1800) * 635
+
+def extent_for(width: int, height: int):
+    # Inline extent for an image of `width` x `height` pixels, scaled down to
+    # the content width.
+    cx = width * EMU_PER_PX
+    cy = height * EMU_PER_PX
+    if cx > MAX_EXTENT_CX:
+        cy = cy * MAX_EXTENT_CX // cx
+        cx = MAX_EXTENT_CX
+    return cx, cy
+
+IMAGE_CONTENT_TYPES = {'png': 'image/png', 'jpeg': 'image/jpeg', 'jpg': 'image/jpeg', 'gif': 'image/gif'}
+
+def content_types_xml(image_extensions=('png',)):
+    defaults = ''.join(f'\n  <Default Extension="{ext}" ContentType="{IMAGE_CONTENT_TYPES[ext]}"/>' for ext in image_extensions)
+    return CONTENT_TYPES.replace('\n  <Default Extension="png" ContentType="image/png"/>', defaults)
+
+def doc_rels_xml(image_targets):
+    # image_targets: iterable of (rId, target) pairs; rId1/rId2 are reserved for styles/numbering.
+    head, tail = DOC_RELS.split('\n  <Relationship Id="rId3"', 1)
+    images = ''.join(f'\n  <Relationship Id="{rid}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/image" Target="{target}"/>' for rid, target in image_targets)
+    return head + images + '\n</Relationships>\n'
+
+DEFAULT_MEDIA = (
+    ('word/media/image-small.png', PNG_RED),
+    ('word/media/image-medium.png', PNG_GREEN),
+    ('word/media/image-large.png', PNG_BLUE),
+)
+
+# Fragment helpers. The constant parts of each fragment are built once (either
+# at import or per distinct shape behind a bounded lru_cache) and only the
+# variable text is concatenated per call.
+
+_TEXT_CLOSE = '</w:t></w:r></w:p>'
+
+@lru_cache(maxsize=8)
+def _paragraph_open(keep_next: bool, keep_lines: bool, page_break: bool):
+    ppr = []
+    if keep_next:
+        ppr.append('<w:keepNext/>')
+    if keep_lines:
+        ppr.append('<w:keepLines/>')
+    if page_break:
+        ppr.append('<w:pageBreakBefore/>')
+    ppr_xml = f"<w:pPr>{''.join(ppr)}</w:pPr>" if ppr else ''
+    return f'<w:p>{ppr_xml}<w:r><w:t xml:space="preserve">'
+
+def p(text: str, keep_next=False, keep_lines=False, page_break=False):
+    return _paragraph_open(bool(keep_next), bool(keep_lines), bool(page_break)) + text + _TEXT_CLOSE
+
+@lru_cache(maxsize=16)
+def _heading_open(level: int):
+    return f'<w:p><w:pPr><w:pStyle w:val="Heading{level}"/></w:pPr><w:r><w:t>'
+
+def heading(level: int, text: str):
+    return _heading_open(level) + text + _TEXT_CLOSE
+
+def p_aligned(text: str, jc='right'):
+    return f'<w:p><w:pPr><w:jc w:val="{jc}"/></w:pPr><w:r><w:t>' + text + _TEXT_CLOSE
+
+@lru_cache(maxsize=256)
+def _list_open(num_id: int, ilvl: int):
+    return f'<w:p><w:pPr><w:numPr><w:ilvl w:val="{ilvl}"/><w:numId w:val="{num_id}"/></w:numPr></w:pPr><w:r><w:t xml:space="preserve">'
+
+def list_p(num_id: int, ilvl: int, text: str):
+    return _list_open(num_id, ilvl) + text + _TEXT_CLOSE
+
+_RUN_MIX_HEAD = '''
+      <w:r><w:t>混合样式段 '''
+
+_RUN_MIX_TAIL = ''': </w:t></w:r>
+      <w:r><w:rPr><w:color w:val="EE0000"/><w:b/></w:rPr><w:t>红色加粗</w:t></w:r>
+      <w:r><w:t> / </w:t></w:r>
+      <w:r><w:rPr><w:color w:val="0070C0"/><w:i/></w:rPr><w:t>蓝色斜体</w:t></w:r>
+      <w:r><w:t> / </w:t></w:r>
+      <w:r><w:rPr><w:u w:val="single"/><w:color w:val="00B050"/></w:rPr><w:t>绿色下划线</w:t></w:r>
+      <w:r><w:t> / </w:t></w:r>
+      <w:r><w:rPr><w:highlight w:val="yellow"/></w:rPr><w:t>高亮</w:t></w:r>
+      <w:r><w:t> / </w:t></w:r>
+      <w:r><w:rPr><w:strike/></w:rPr><w:t>删除线</w:t></w:r>
+      <w:r><w:t> / 上标x</w:t></w:r>
+      <w:r><w:rPr><w:vertAlign w:val="superscript"/></w:rPr><w:t>2</w:t></w:r>
+      <w:r><w:t> 下标H</w:t></w:r>
+      <w:r><w:rPr><w:vertAlign w:val="subscript"/></w:rPr><w:t>2</w:t></w:r>
+      <w:r><w:t>O</w:t></w:r>'''
+
+def run_mix_runs(seed: int):
+    return _RUN_MIX_HEAD + str(seed) + _RUN_MIX_TAIL
+
+def run_mix(seed: int):
+    return '<w:p>' + run_mix_runs(seed) + '\n    </w:p>'
+
+def run_mix_paragraph(seeds):
+    # One paragraph holding run_mix's runs once per seed.
+    return '<w:p>' + ''.join(run_mix_runs(seed) for seed in seeds) + '\n    </w:p>'
+
+@lru_cache(maxsize=64)
+def _image_template(rid: str, cx: int, cy: int):
+    # Split around the two docPr id/name slots, which change on every call.
+    head = f'''<w:p><w:r><w:drawing>
+      <wp:inline xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing" xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main" xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">
+        <wp:extent cx="{cx}" cy="{cy}"/>
+        <wp:docPr id="'''
+    middle = '''"/>
+        <wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>
+        <a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture"><pic:pic>
+          <pic:nvPicPr><pic:cNvPr id="'''
+    tail = f'''"/><pic:cNvPicPr/></pic:nvPicPr>
+          <pic:blipFill><a:blip xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships" r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>
+          <pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{cx}" cy="{cy}"/></a:xfrm><a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr>
+        </pic:pic></a:graphicData></a:graphic>
+      </wp:inline>
+    </w:drawing></w:r></w:p>'''
+    return head, middle, tail
+
+def image_paragraph(rid: str, docpr_id: int, cx: int, cy: int, name=None):
+    head, middle, tail = _image_template(rid, cx, cy)
+    label = f'{docpr_id}" name="{name or f"img-{docpr_id}"}'
+    return head + label + middle + label + tail
+
+@lru_cache(maxsize=32)
+def table_block(rows=8, cols=4):
+    trs = []
+    for r in range(rows):
+        tcs = []
+        for c in range(cols):
+            content = f'R{r+1}C{c+1} 表格单元格测试：长文本用于验证换行与padding。'
+            tcs.append(f'<w:tc><w:tcPr><w:tcW w:w="2400" w:type="dxa"/></w:tcPr><w:p><w:r><w:t>{content}</w:t></w:r></w:p></w:tc>')
+        trs.append('<w:tr>' + ''.join(tcs) + '</w:tr>')
+    return _table_head(cols) + ''.join(trs) + '</w:tbl>'
+
+@lru_cache(maxsize=32)
+def _table_head(cols: int):
+    return '<w:tbl><w:tblPr><w:tblW w:w="0" w:type="auto"/><w:tblBorders><w:top w:val="single" w:sz="8"/><w:left w:val="single" w:sz="8"/><w:bottom w:val="single" w:sz="8"/><w:right w:val="single" w:sz="8"/><w:insideH w:val="single" w:sz="6"/><w:insideV w:val="single" w:sz="6"/></w:tblBorders></w:tblPr><w:tblGrid>' + '<w:gridCol w:w="2400"/>' * cols + '</w:tblGrid>'
+
+def table_cell(content_xml: str):
+    return '<w:tc><w:tcPr><w:tcW w:w="2400" w:type="dxa"/></w:tcPr>' + content_xml + '</w:tc>'
+
+def nested_table(depth: int, rows=2, cols=2):
+    # Each level nests the previous table in its first cell; the other cells
+    # stay plain so size grows linearly with depth.
+    table = table_block(rows, cols)
+    for level in range(1, depth):
+        cells = [table_cell(table + f'<w:p><w:r><w:t>L{level}</w:t></w:r></w:p>')]
+        cells += [table_cell(f'<w:p><w:r><w:t>L{level} R{i // cols + 1}C{i % cols + 1}</w:t></w:r></w:p>') for i in range(1, rows * cols)]
+        trs = ['<w:tr>' + ''.join(cells[r * cols:(r + 1) * cols]) + '</w:tr>' for r in range(rows)]
+        table = _table_head(cols) + ''.join(trs) + '</w:tbl>'
+    return table
+
+_NUM_FORMATS = (('decimal', '%{n}.'), ('lowerLetter', '%{n}.'), ('lowerRoman', '%{n}.'), ('bullet', '•'))
+
+def numbering_xml(abstract_count: int, levels=3):
+    # abstractNum i is referenced by numId i + 1.
+    parts = ['<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<w:numbering xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">\n']
+    for index in range(abstract_count):
+        num_fmt, text = _NUM_FORMATS[index % len(_NUM_FORMATS)]
+        parts.append(f'  <w:abstractNum w:abstractNumId="{index}">\n    <w:multiLevelType w:val="multilevel"/>\n')
+        for ilvl in range(levels):
+            parts.append(f'    <w:lvl w:ilvl="{ilvl}"><w:start w:val="1"/><w:numFmt w:val="{num_fmt}"/><w:lvlText w:val="{text.format(n=ilvl + 1)}"/><w:pPr><w:ind w:left="{720 * (ilvl + 1)}" w:hanging="360"/></w:pPr></w:lvl>\n')
+        parts.append('  </w:abstractNum>\n')
+    for index in range(abstract_count):
+        parts.append(f'  <w:num w:numId="{index + 1}"><w:abstractNumId w:val="{index}"/></w:num>\n')
+    parts.append('</w:numbering>\n')
+    return ''.join(parts)
+
+FRAGMENT_CACHES = (_paragraph_open, _heading_open, _list_open, _image_template, table_block, _table_head)
+
+def fragment_cache_info():
+    return {cache.__name__: cache.cache_info()._asdict() for cache in FRAGMENT_CACHES}
+
+def clear_fragment_caches():
+    for cache in FRAGMENT_CACHES:
+        cache.cache_clear()
+
+# Generators call helpers through a namespace like this one so a recording
+# variant (see scripts_docx_oracle.OracleFragments) can be swapped in.
+FRAGMENTS = SimpleNamespace(
+    p=p,
+    heading=heading,
+    p_aligned=p_aligned,
+    list_p=list_p,
+    run_mix=run_mix,
+    run_mix_paragraph=run_mix_paragraph,
+    image_paragraph=image_paragraph,
+    table_block=table_block,
+    nested_table=nested_table,
+    styled=lambda xml: xml,
+)
+
+class FragmentStats:
+    def __init__(self):
+        self.blocks = 0
+        self.paragraphs = 0
+        self.runs = 0
+        self.list_items = 0
+        self.tables = 0
+        self.table_rows = 0
+        self.table_cells = 0
+        self.images = 0
+
+    def add(self, fragment: str):
+        self.blocks += 1
+        self.paragraphs += fragment.count('<w:p>')
+        self.runs += fragment.count('<w:r>')
+        self.list_items += fragment.count('<w:numPr>')
+        self.tables += fragment.count('<w:tbl>')
+        self.table_rows += fragment.count('<w:tr>')
+        self.table_cells += fragment.count('<w:tc>')
+        self.images += fragment.count('<w:drawing>')
+
+    def merge(self, counts):
+        for key, value in counts.items():
+            setattr(self, key, getattr(self, key) + value)
+
+    def as_dict(self):
+        return dict(vars(self))
+
+# Fixed entry timestamps keep archives byte-identical across runs and worker counts.
+ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+def zip_entry(name: str, compress_type=ZIP_DEFLATED):
+    info = ZipInfo(name, ZIP_DATE_TIME)
+    info.compress_type = compress_type
+    info.external_attr = 0o600 << 16
+    return info
+
+def iter_encoded_chunks(chunks, flush_bytes=1 << 20):
+    pending = []
+    pending_bytes = 0
+    for chunk in chunks:
+        data = chunk.encode('utf-8')
+        pending.append(data)
+        pending_bytes += len(data)
+        if pending_bytes >= flush_bytes:
+            yield b''.join(pending)
+            pending = []
+            pending_bytes = 0
+    if pending:
+        yield b''.join(pending)
+
+def write_docx(out_file, document, styles, numbering, doc_rels=DOC_RELS, media=DEFAULT_MEDIA, content_types=CONTENT_TYPES):
+    # `document` is either the full document.xml text or an iterable of encoded
+    # chunks, which are compressed into the entry as they arrive so only the
+    # current chunk is held in memory. Returns the uncompressed document.xml size.
+    written = 0
+    with ZipFile(out_file, 'w', ZIP_DEFLATED) as z:
+        z.writestr(zip_entry('[Content_Types].xml'), content_types)
+        z.writestr(zip_entry('_rels/.rels'), RELS)
+        if isinstance(document, str):
+            data = document.encode('utf-8')
+            z.writestr(zip_entry('word/document.xml'), data)
+            written = len(data)
+        else:
+            with z.open(zip_entry('word/document.xml'), 'w', force_zip64=True) as f:
+                for data in document:
+                    f.write(data)
+                    written += len(data)
+        z.writestr(zip_entry('word/styles.xml'), styles)
+        z.writestr(zip_entry('word/numbering.xml'), numbering)
+        z.writestr(zip_entry('word/_rels/document.xml.rels'), doc_rels)
+        for name, payload in media:
+            z.writestr(zip_entry(name), payload)
+    return written
+
+def input_fingerprint(generator: str, params: dict, sources=(), payloads=()):
+    # Hashes everything a build depends on: its parameters, the generator and
+    # template source text, and any embedded binary payloads.
+    digest = sha256()
+    digest.update(json.dumps({'generator': generator, 'params': params}, sort_keys=True).encode('utf-8'))
+    for source in sources:
+        digest.update(b'\0source\0')
+        digest.update(Path(source).read_bytes())
+    for payload in payloads:
+        digest.update(b'\0payload\0')
+        digest.update(payload)
+    return digest.hexdigest()
+
+class BuildCache:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.dirty = False
+        try:
+            self.entries = json.loads(self.path.read_text(encoding='utf-8'))
+        except (FileNotFoundError, ValueError):
+            self.entries = {}
+
+    def key(self, target: Path):
+        return Path(os.path.relpath(target, self.path.parent)).as_posix()
+
+    def lookup(self, target: Path, fingerprint: str, companions=()):
+        # `companions` are sidecar files written with the target; a missing one
+        # forces a rebuild.
+        entry = self.entries.get(self.key(target))
+        if not entry or entry['fingerprint'] != fingerprint:
+            return None
+        if not all(Path(path).exists() for path in companions):
+            return None
+        try:
+            stat = Path(target).stat()
+        except FileNotFoundError:
+            return None
+        if stat.st_size != entry['size'] or stat.st_mtime_ns != entry['mtime_ns']:
+            return None
+        return entry
+
+    def store(self, target: Path, fingerprint: str, summary=None):
+        stat = Path(target).stat()
+        entry = {'fingerprint': fingerprint, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        if summary is not None:
+            entry['summary'] = summary
+        self.entries[self.key(target)] = entry
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(self.entries, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+        self.dirty = False
+
+def build_cache_for(target_dir: Path):
+    return BuildCache(Path(target_dir) / '.build-cache.json')
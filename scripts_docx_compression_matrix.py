@@ -0,0 +1,124 @@
+from pathlib import Path
+from zipfile import ZipFile, ZIP_DEFLATED, ZIP_STORED
+import argparse
+import json
+import time
+
+from scripts_docx_oracle import oracle_path
+
+out_dir = Path('assets/test-docs/compression')
+
+MEDIA_SUFFIXES = ('.png', '.jpeg', '.jpg', '.gif', '.bmp', '.tif', '.tiff', '.emf', '.wmf', '.svg')
+
+def is_media(name: str):
+    return name.startswith('word/media/') or name.lower().endswith(MEDIA_SUFFIXES)
+
+# Each variant maps an entry name to (compress_type, compresslevel).
+VARIANTS = {
+    'stored': lambda name: (ZIP_STORED, None),
+    'deflate-1': lambda name: (ZIP_DEFLATED, 1),
+    'deflate-6': lambda name: (ZIP_DEFLATED, 6),
+    'deflate-9': lambda name: (ZIP_DEFLATED, 9),
+    'stored-media-deflate-6': lambda name: (ZIP_STORED, None) if is_media(name) else (ZIP_DEFLATED, 6),
+    'stored-media-deflate-9': lambda name: (ZIP_STORED, None) if is_media(name) else (ZIP_DEFLATED, 9),
+}
+
+COPY_CHUNK = 1 << 20
+
+def repack(source: Path, target: Path, policy):
+    # Entries are copied in their original order through streaming readers and
+    # writers, so multi-GB archives never sit in memory.
+    with ZipFile(source) as src, ZipFile(target, 'w') as dst:
+        for info in src.infolist():
+            # ZipInfo has no public per-entry level before Python 3.13, so the
+            # level goes through the archive-wide settings, which apply to
+            # entries opened by name (dated 1980-01-01 like builder entries).
+            dst.compression, dst.compresslevel = policy(info.filename)
+            with src.open(info) as reader, dst.open(info.filename, 'w', force_zip64=info.file_size > 0x7FFFFFFF) as writer:
+                while True:
+                    chunk = reader.read(COPY_CHUNK)
+                    if not chunk:
+                        break
+                    writer.write(chunk)
+
+def inflate_seconds(archive: Path, rounds=3):
+    # Best-of-N time to read back every entry, including CRC checks; a proxy for
+    # the client-side unzip cost of the variant.
+    best = float('inf')
+    for _ in range(rounds):
+        started = time.perf_counter()
+        with ZipFile(archive) as z:
+            for info in z.infolist():
+                with z.open(info) as reader:
+                    while reader.read(COPY_CHUNK):
+                        pass
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def describe(archive: Path, inflate: float, bandwidths_mbit):
+    with ZipFile(archive) as z:
+        entries = [{
+            'name': info.filename,
+            'method': 'stored' if info.compress_type == ZIP_STORED else 'deflated',
+            'uncompressed_bytes': info.file_size,
+            'compressed_bytes': info.compress_size,
+        } for info in z.infolist()]
+    archive_bytes = archive.stat().st_size
+    uncompressed = sum(entry['uncompressed_bytes'] for entry in entries)
+    transfer = {f'{mbit:g}mbit': round(archive_bytes * 8 / (mbit * 1_000_000), 4) for mbit in bandwidths_mbit}
+    return {
+        'file': archive.name,
+        'archive_bytes': archive_bytes,
+        'uncompressed_bytes': uncompressed,
+        'ratio': round(archive_bytes / uncompressed, 4) if uncompressed else 1.0,
+        'inflate_seconds': round(inflate, 4),
+        'transfer_seconds': transfer,
+        'transfer_plus_inflate_seconds': {key: round(value + inflate, 4) for key, value in transfer.items()},
+        'entries': entries,
+    }
+
+def copy_oracle(source: Path, target: Path):
+    # A text substitution keeps the sidecar's one-line-per-column layout.
+    text = oracle_path(source).read_text(encoding='utf-8')
+    field = '"document": '
+    text = text.replace(field + json.dumps(source.name, ensure_ascii=False), field + json.dumps(target.name, ensure_ascii=False), 1)
+    oracle_path(target).write_text(text, encoding='utf-8')
+
+def build_matrix(source: Path, target_dir: Path, variants, bandwidths_mbit):
+    target_dir.mkdir(parents=True, exist_ok=True)
+    results = []
+    for name in variants:
+        target = target_dir / f'{source.stem}.{name}.docx'
+        started = time.perf_counter()
+        repack(source, target, VARIANTS[name])
+        pack_seconds = time.perf_counter() - started
+        results.append({'variant': name, 'pack_seconds': round(pack_seconds, 4), **describe(target, inflate_seconds(target), bandwidths_mbit)})
+        # Repacking never changes document structure, so the source oracle
+        # applies with only its `document` field renamed.
+        if oracle_path(source).exists():
+            copy_oracle(source, target)
+        print(str(target))
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Repack DOCX files under several ZIP compression profiles and record the trade-offs.')
+    parser.add_argument('sources', nargs='+', type=Path)
+    parser.add_argument('--variant', dest='variants', action='append', choices=list(VARIANTS), help='variant to emit; repeatable (default: all)')
+    parser.add_argument('--bandwidth', default='10,50,100', help='comma-separated link speeds in Mbit/s for transfer estimates')
+    parser.add_argument('--out-dir', type=Path, default=out_dir)
+    args = parser.parse_args(argv)
+
+    bandwidths = [float(value) for value in args.bandwidth.split(',') if value.strip()]
+    documents = []
+    for source in args.sources:
+        documents.append({
+            'source': source.name,
+            'variants': build_matrix(source, args.out_dir / source.stem, args.variants or list(VARIANTS), bandwidths),
+        })
+
+    manifest = args.out_dir / 'manifest.json'
+    manifest.write_text(json.dumps({'documents': documents}, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    print(str(manifest))
+
+if __name__ == '__main__':
+    main()
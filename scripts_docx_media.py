@@ -0,0 +1,140 @@
+from math import isqrt
+import random
+import struct
+import zlib
+
+# Synthetic image payloads built with the standard library only. PNGs are RGB
+# with either incompressible noise (archive size ~ width * height * 3) or a
+# smooth gradient; JPEGs are valid baseline grayscale files whose AC
+# coefficients are random, so their entropy-coded size tracks the pixel count.
+
+def _png_chunk(kind: bytes, data: bytes):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def png_image(width: int, height: int, seed=0, texture='noise'):
+    stride = width * 3
+    if texture == 'noise':
+        pixels = random.Random(seed).randbytes(stride * height)
+    else:
+        row_cache = {}
+        rows = []
+        for y in range(height):
+            shade = (y * 255 // max(1, height - 1) + seed) & 0xFF
+            if shade not in row_cache:
+                row_cache[shade] = bytes((x * 255 // max(1, width - 1)) & 0xFF if c == 0 else shade for x in range(width) for c in range(3))
+            rows.append(row_cache[shade])
+        pixels = b''.join(rows)
+    # Filter type 0 on every scanline.
+    raw = b''.join(b'\x00' + pixels[y * stride:(y + 1) * stride] for y in range(height))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', header) + _png_chunk(b'IDAT', zlib.compress(raw, 6)) + _png_chunk(b'IEND', b'')
+
+# Minimal canonical Huffman tables. DC: every category 0..11 gets a 4-bit code.
+# AC: EOB and (run 0, size 1..3) -- the only symbols the encoder emits.
+_DC_BITS = (0, 0, 0, 12) + (0,) * 12
+_DC_VALUES = tuple(range(12))
+_AC_BITS = (0, 2, 2) + (0,) * 13
+_AC_VALUES = (0x00, 0x01, 0x02, 0x03)
+
+def _huffman_codes(bits, values):
+    codes = {}
+    code = 0
+    index = 0
+    for length, count in enumerate(bits, start=1):
+        for _ in range(count):
+            codes[values[index]] = format(code, f'0{length}b')
+            code += 1
+            index += 1
+        code <<= 1
+    return codes
+
+_DC_CODES = _huffman_codes(_DC_BITS, _DC_VALUES)
+_AC_CODES = _huffman_codes(_AC_BITS, _AC_VALUES)
+
+def _segment(marker: int, payload: bytes):
+    return struct.pack('>HH', marker, len(payload) + 2) + payload
+
+def _encoded_block(rng, density: float):
+    bits = [_DC_CODES[0]]
+    coefficients = max(0, min(63, round(63 * density)))
+    for _ in range(coefficients):
+        size = rng.randint(1, 3)
+        magnitude = rng.randint(1 << (size - 1), (1 << size) - 1)
+        # Negative values use the one's-complement bit pattern.
+        value = magnitude if rng.random() < 0.5 else (~magnitude) & ((1 << size) - 1)
+        bits.append(_AC_CODES[size])
+        bits.append(format(value, f'0{size}b'))
+    if coefficients < 63:
+        bits.append(_AC_CODES[0x00])
+    return ''.join(bits)
+
+def jpeg_image(width: int, height: int, seed=0, density=0.5):
+    rng = random.Random(seed)
+    # Blocks are drawn from a pool of pre-encoded random blocks to keep large
+    # images fast; the pool is large enough that repeats rarely land inside one
+    # deflate window, so the payload stays as incompressible as a real photo.
+    pool_size = min(4096, ((width + 7) // 8) * ((height + 7) // 8))
+    pool = [_encoded_block(rng, density) for _ in range(max(1, pool_size))]
+    block_count = ((width + 7) // 8) * ((height + 7) // 8)
+    bitstream = ''.join(pool[rng.randrange(len(pool))] for _ in range(block_count))
+    bitstream += '1' * (-len(bitstream) % 8)
+    scan = int(bitstream, 2).to_bytes(len(bitstream) // 8, 'big').replace(b'\xff', b'\xff\x00') if bitstream else b''
+
+    return b''.join([
+        b'\xff\xd8',
+        _segment(0xFFE0, b'JFIF\x00\x01\x01\x00\x00\x01\x00\x01\x00\x00'),
+        _segment(0xFFDB, b'\x00' + bytes([8] * 64)),
+        _segment(0xFFC0, struct.pack('>BHHB', 8, height, width, 1) + b'\x01\x11\x00'),
+        _segment(0xFFC4, b'\x00' + bytes(_DC_BITS) + bytes(_DC_VALUES)),
+        _segment(0xFFC4, b'\x10' + bytes(_AC_BITS) + bytes(_AC_VALUES)),
+        _segment(0xFFDA, b'\x01\x01\x00\x00\x3f\x00'),
+        scan,
+        b'\xff\xd9',
+    ])
+
+# Approximate payload bytes per pixel, used to pick dimensions for a byte budget.
+_BYTES_PER_PIXEL = {'png': 3.0, 'jpeg': None}
+
+def jpeg_bytes_per_pixel(density: float):
+    coefficients = max(0, min(63, round(63 * density)))
+    # 4-bit DC code; each AC coefficient averages 8/3 code bits plus 2 value bits; 2-bit EOB.
+    return (4 + coefficients * 14 / 3 + (2 if coefficients < 63 else 0)) / 8 / 64
+
+def dimensions_for_bytes(kind: str, target_bytes: int, density=0.5, aspect=4 / 3):
+    per_pixel = _BYTES_PER_PIXEL[kind] or jpeg_bytes_per_pixel(density)
+    pixels = max(64, int(target_bytes / per_pixel))
+    height = max(8, isqrt(int(pixels / aspect)))
+    width = max(8, int(height * aspect))
+    return width, height
+
+def synthetic_image(kind: str, width: int, height: int, seed=0, density=0.5):
+    if kind == 'png':
+        return png_image(width, height, seed)
+    if kind == 'jpeg':
+        return jpeg_image(width, height, seed, density)
+    raise ValueError(f'unsupported image kind {kind!r}')
+
+def image_dimensions(data: bytes):
+    # Returns (kind, width, height) for PNG/JPEG payloads, or None. `data` may
+    # be a prefix of the payload.
+    if data[:8] == b'\x89PNG\r\n\x1a\n' and len(data) >= 24:
+        width, height = struct.unpack('>II', data[16:24])
+        return 'png', width, height
+    if data[:2] == b'\xff\xd8':
+        offset = 2
+        while offset + 4 <= len(data):
+            if data[offset] != 0xFF:
+                offset += 1
+                continue
+            marker = data[offset + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                offset += 1 if marker == 0xFF else 2
+                continue
+            length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+            if marker in (0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF):
+                if offset + 9 > len(data):
+                    return None  # a prefix that stops inside the frame header
+                height, width = struct.unpack('>HH', data[offset + 5:offset + 9])
+                return 'jpeg', width, height
+            offset += 2 + length
+    return None
@@ -0,0 +1,212 @@
+from array import array
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+import json
+import re
+
+import scripts_docx_builder as builder
+
+# Structural oracle written next to each generated DOCX as `<name>.oracle.json`.
+# The generator records what it emits while it emits it, so tests can compare
+# pipeline output against the sidecar in one pass instead of re-parsing the
+# archive and hand-coding expectations.
+#
+# Layout: aggregate counters (headings per level, list items per numId/ilvl,
+# keep/page-break flags, run style counts, image extents) plus one column per
+# body-level block attribute, index-aligned with the `<w:body>` children.
+# `level` is the heading level for headings and the nesting depth for tables.
+
+ORACLE_SOURCE = Path(__file__)
+ORACLE_VERSION = 1
+
+# Block kinds, stored in the `kind` column as their index.
+KINDS = ('paragraph', 'heading', 'list', 'mixed', 'aligned', 'table', 'image')
+PARAGRAPH, HEADING, LIST, MIXED, ALIGNED, TABLE, IMAGE = range(len(KINDS))
+
+# Bits of the `flags` column.
+KEEP_NEXT = 1
+KEEP_LINES = 2
+PAGE_BREAK_BEFORE = 4
+FLAG_NAMES = {'keep_next': KEEP_NEXT, 'keep_lines': KEEP_LINES, 'page_break_before': PAGE_BREAK_BEFORE}
+
+# Per-block columns, in record order. Blocks are stored interleaved in one
+# unsigned 32-bit array (one extend per block) and split into columns on output.
+COLUMNS = ('kind', 'level', 'num_id', 'ilvl', 'flags', 'runs', 'text_chars', 'rows', 'cols', 'cells', 'cx', 'cy')
+_WIDTH = len(COLUMNS)
+
+# Run style names follow the boolean fields of the parsed run profile
+# (lib/word/styleProfile.ts); `plain` counts runs without rPr.
+RUN_STYLE_MARKERS = (
+    ('bold', '<w:b/>'),
+    ('italic', '<w:i/>'),
+    ('underline', '<w:u '),
+    ('strike', '<w:strike/>'),
+    ('superscript', 'w:val="superscript"'),
+    ('subscript', 'w:val="subscript"'),
+    ('color', '<w:color '),
+    ('highlight', '<w:highlight '),
+)
+
+_RUN = re.compile(r'<w:r>(?:<w:rPr>(.*?)</w:rPr>)?(.*?)</w:r>', re.S)
+_TEXT = re.compile(r'<w:t(?: [^>]*)?>([^<]*)</w:t>')
+
+@lru_cache(maxsize=64)
+def describe_runs(xml: str):
+    # Returns (run count, style counts, text characters) for a template
+    # fragment. Only used on cached shapes, never per emitted block.
+    styles = Counter()
+    runs = 0
+    chars = 0
+    for rpr, body in _RUN.findall(xml):
+        runs += 1
+        matched = [name for name, marker in RUN_STYLE_MARKERS if marker in (rpr or '')]
+        styles.update(matched or ('plain',))
+        chars += sum(len(text) for text in _TEXT.findall(body))
+    return runs, styles, chars
+
+# run_mix differs only in the seed digits inside its first run.
+_RUN_MIX_RUNS, _RUN_MIX_STYLES, _RUN_MIX_CHARS = describe_runs(builder.run_mix_runs(0))
+_RUN_MIX_CHARS -= 1
+
+@lru_cache(maxsize=32)
+def _table_shape(rows: int, cols: int, depth: int):
+    xml = builder.table_block(rows, cols) if depth == 1 else builder.nested_table(depth, rows, cols)
+    runs, styles, chars = describe_runs(xml)
+    return runs, styles, chars, xml.count('<w:tc>')
+
+class Oracle:
+    def __init__(self):
+        self.records = array('I')
+        # Runs of blocks added without explicit styles are plain.
+        self.run_styles = Counter()
+
+    def add(self, record, styles=None):
+        # `record` holds one value per COLUMNS entry.
+        self.records.extend(record)
+        if styles is not None:
+            self.run_styles.update(styles)
+        else:
+            self.run_styles['plain'] += record[5]
+
+    def merge(self, other):
+        # Appends another oracle's blocks after this one's (sharded rendering).
+        self.records.extend(other.records)
+        self.run_styles.update(other.run_styles)
+
+    def __len__(self):
+        return len(self.records) // _WIDTH
+
+    def column(self, name: str):
+        return self.records[COLUMNS.index(name)::_WIDTH]
+
+    def totals(self):
+        kinds = Counter(self.column('kind'))
+        return {
+            'blocks': len(self),
+            'runs': sum(self.column('runs')),
+            'text_chars': sum(self.column('text_chars')),
+            'table_cells': sum(self.column('cells')),
+            **{f'{name}_blocks': kinds[index] for index, name in enumerate(KINDS)},
+        }
+
+    def as_dict(self, document: str):
+        kind = self.column('kind')
+        level = self.column('level')
+        headings = Counter(lvl for k, lvl in zip(kind, level) if k == HEADING)
+        lists = {}
+        list_items = Counter((n, i) for k, n, i in zip(kind, self.column('num_id'), self.column('ilvl')) if k == LIST)
+        for (num_id, ilvl), count in sorted(list_items.items()):
+            lists.setdefault(str(num_id), {})[str(ilvl)] = count
+        flags = Counter(self.column('flags'))
+        images = Counter((x, y) for k, x, y in zip(kind, self.column('cx'), self.column('cy')) if k == IMAGE)
+        return {
+            'version': ORACLE_VERSION,
+            'document': document,
+            'kinds': list(KINDS),
+            'flag_bits': FLAG_NAMES,
+            'totals': self.totals(),
+            'headings': {str(lvl): count for lvl, count in sorted(headings.items())},
+            'lists': lists,
+            'flags': {name: sum(count for value, count in flags.items() if value & bit) for name, bit in FLAG_NAMES.items()},
+            'run_styles': {name: self.run_styles[name] for name in ('plain', *(name for name, _ in RUN_STYLE_MARKERS))},
+            'image_extents': [{'cx': cx, 'cy': cy, 'count': count} for (cx, cy), count in sorted(images.items())],
+            'blocks': {name: self.column(name).tolist() for name in COLUMNS},
+        }
+
+    def write(self, target: Path):
+        path = oracle_path(target)
+        with open(path, 'w', encoding='utf-8') as f:
+            # Aggregates are indented for review; columns stay one line each.
+            data = self.as_dict(Path(target).name)
+            blocks = data.pop('blocks')
+            text = json.dumps(data, ensure_ascii=False, indent=2)
+            columns = ',\n'.join(f'    "{name}": ' + json.dumps(values, separators=(',', ':')) for name, values in blocks.items())
+            f.write(text[:-2] + ',\n  "blocks": {\n' + columns + '\n  }\n}\n')
+        return path
+
+def oracle_path(target: Path):
+    return Path(target).with_suffix('.oracle.json')
+
+def load_oracle(target: Path):
+    return json.loads(oracle_path(target).read_text(encoding='utf-8'))
+
+class OracleFragments:
+    # Drop-in for scripts_docx_builder.FRAGMENTS that records every body-level
+    # block into `oracle` from the helper arguments before returning its XML.
+
+    def __init__(self, oracle: Oracle):
+        self.oracle = oracle
+
+    # Records: (kind, level, num_id, ilvl, flags, runs, text_chars, rows, cols, cells, cx, cy).
+
+    def p(self, text: str, keep_next=False, keep_lines=False, page_break=False):
+        flags = (KEEP_NEXT if keep_next else 0) | (KEEP_LINES if keep_lines else 0) | (PAGE_BREAK_BEFORE if page_break else 0)
+        self.oracle.add((PARAGRAPH, 0, 0, 0, flags, 1, len(text), 0, 0, 0, 0, 0))
+        return builder.p(text, keep_next, keep_lines, page_break)
+
+    def heading(self, level: int, text: str):
+        self.oracle.add((HEADING, level, 0, 0, 0, 1, len(text), 0, 0, 0, 0, 0))
+        return builder.heading(level, text)
+
+    def p_aligned(self, text: str, jc='right'):
+        self.oracle.add((ALIGNED, 0, 0, 0, 0, 1, len(text), 0, 0, 0, 0, 0))
+        return builder.p_aligned(text, jc)
+
+    def list_p(self, num_id: int, ilvl: int, text: str):
+        self.oracle.add((LIST, 0, num_id, ilvl, 0, 1, len(text), 0, 0, 0, 0, 0))
+        return builder.list_p(num_id, ilvl, text)
+
+    def run_mix(self, seed: int):
+        self.oracle.add((MIXED, 0, 0, 0, 0, _RUN_MIX_RUNS, _RUN_MIX_CHARS + len(str(seed)), 0, 0, 0, 0, 0), _RUN_MIX_STYLES)
+        return builder.run_mix(seed)
+
+    def run_mix_paragraph(self, seeds):
+        seeds = list(seeds)
+        styles = Counter({name: count * len(seeds) for name, count in _RUN_MIX_STYLES.items()})
+        chars = _RUN_MIX_CHARS * len(seeds) + sum(len(str(seed)) for seed in seeds)
+        self.oracle.add((MIXED, 0, 0, 0, 0, _RUN_MIX_RUNS * len(seeds), chars, 0, 0, 0, 0, 0), styles)
+        return builder.run_mix_paragraph(seeds)
+
+    def image_paragraph(self, rid: str, docpr_id: int, cx: int, cy: int, name=None):
+        self.oracle.add((IMAGE, 0, 0, 0, 0, 1, 0, 0, 0, 0, cx, cy))
+        return builder.image_paragraph(rid, docpr_id, cx, cy, name)
+
+    def table_block(self, rows=8, cols=4):
+        runs, styles, chars, cells = _table_shape(rows, cols, 1)
+        self.oracle.add((TABLE, 1, 0, 0, 0, runs, chars, rows, cols, cells, 0, 0), styles)
+        return builder.table_block(rows, cols)
+
+    def nested_table(self, depth: int, rows=2, cols=2):
+        runs, styles, chars, cells = _table_shape(rows, cols, depth)
+        self.oracle.add((TABLE, depth, 0, 0, 0, runs, chars, rows, cols, cells, 0, 0), styles)
+        return builder.nested_table(depth, rows, cols)
+
+    def styled(self, xml: str):
+        # Hand-written single paragraphs with their own run styling.
+        runs, styles, chars = describe_runs(xml)
+        self.oracle.add((MIXED, 0, 0, 0, 0, runs, chars, 0, 0, 0, 0, 0), styles)
+        return xml
+
+def fragments_for(oracle):
+    return builder.FRAGMENTS if oracle is None else OracleFragments(oracle)
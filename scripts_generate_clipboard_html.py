@@ -0,0 +1,1064 @@
+from base64 import b64encode
+from functools import lru_cache
+from html import escape
+from pathlib import Path
+import argparse
+import re
+import sys
+import time
+
+from scripts_docx_builder import BUILDER_SOURCE, EMU_PER_PX, build_cache_for, input_fingerprint
+import scripts_docx_media as media
+import scripts_generate_stress_docx as stress
+
+# Clipboard HTML as Word, WPS and Google Docs put it on the clipboard, for
+# paste throughput tests of lib/word/pastePipeline.ts and htmlCompat.ts. The
+# dialects are drop-ins for scripts_docx_builder.FRAGMENTS, so the stress
+# generator's body renders the same logical content (headings, run_mix runs,
+# multi-level lists, tables, images) in every dialect. Each paste is written as
+# `<name>.html` plus the matching text/plain flavour as `<name>.txt`.
+
+out_dir = Path('assets/test-docs/clipboard')
+
+CJK_OR_OTHER = re.compile(r'[\u3000-\u303f\u3400-\u9fff\uff00-\uffef]+|[^\u3000-\u303f\u3400-\u9fff\uff00-\uffef]+')
+
+# List markers follow STRESS_NUMBERING: numId 1 is decimal/lowerLetter/lowerRoman
+# with %1.%2.%3. style text, numId 2 is a three-glyph bullet list.
+BULLETS = ('•', '◦', '▪')
+
+def _letter(n: int):
+    out = ''
+    while n:
+        n, rem = divmod(n - 1, 26)
+        out = chr(97 + rem) + out
+    return out
+
+def _roman(n: int):
+    out = ''
+    for value, digits in ((1000, 'm'), (900, 'cm'), (500, 'd'), (400, 'cd'), (100, 'c'), (90, 'xc'), (50, 'l'), (40, 'xl'), (10, 'x'), (9, 'ix'), (5, 'v'), (4, 'iv'), (1, 'i')):
+        count, n = divmod(n, value)
+        out += digits * count
+    return out
+
+_LEVEL_FORMATS = (str, _letter, _roman)
+
+class ImageSource:
+    # Synthetic payload per distinct (rid, size), encoded once. `inline` gives
+    # data: URIs; `file` writes the payload next to the paste and returns the
+    # vendor's local/remote URL, which pastePipeline swaps for clipboard files.
+
+    def __init__(self, mode: str, kind: str, files_dir: Path):
+        self.mode = mode
+        self.kind = kind
+        self.ext = 'png' if kind == 'png' else 'jpg'
+        self.files_dir = files_dir
+        self.payloads = {}
+        self.uris = {}
+        self.files = {}
+        self.bytes = 0
+
+    def src(self, rid: str, width: int, height: int, url_for):
+        key = (rid, width, height)
+        if key not in self.payloads:
+            self.payloads[key] = media.synthetic_image(self.kind, width, height, seed=int(rid.lstrip('rId') or 0))
+        data = self.payloads[key]
+        self.bytes += len(data)
+        if self.mode == 'inline':
+            if key not in self.uris:
+                self.uris[key] = f'data:image/{self.kind};base64,' + b64encode(data).decode('ascii')
+            return self.uris[key]
+        if key not in self.files:
+            self.files[key] = len(self.files) + 1
+            self.files_dir.mkdir(parents=True, exist_ok=True)
+            (self.files_dir / f'image{self.files[key]:03d}.{self.ext}').write_bytes(data)
+        return url_for(self.files[key], self.ext)
+
+class ClipboardFragments:
+    # Shared state for the dialects: list counters, the open list (dialects
+    # with real list markup must close it before the next non-list block), the
+    # text/plain flavour and per-helper block counts.
+    name = None
+    newline = '\n'
+
+    def __init__(self, images: ImageSource):
+        self.images = images
+        self.plain = []
+        self.blocks = {}
+        self.counters = {}
+        self.list_open = None
+        self.size = 0
+        self.sections = 0
+
+    def take_plain(self):
+        text = ''.join(self.plain)
+        self.plain.clear()
+        return text
+
+    def count(self, helper: str):
+        self.blocks[helper] = self.blocks.get(helper, 0) + 1
+
+    def marker(self, num_id: int, ilvl: int):
+        counts = self.counters.setdefault(num_id, [0, 0, 0])
+        counts[ilvl] += 1
+        for deeper in range(ilvl + 1, len(counts)):
+            counts[deeper] = 0
+        if num_id == 2:
+            return BULLETS[ilvl % len(BULLETS)]
+        return '.'.join(_LEVEL_FORMATS[level](counts[level]) for level in range(ilvl + 1)) + '.'
+
+    def leave_list(self):
+        self.list_open = None
+        return ''
+
+    def block(self, helper: str, html: str, text: str):
+        self.count(helper)
+        self.plain.append(text + self.newline)
+        return self.leave_list() + html
+
+    # FRAGMENTS interface ------------------------------------------------
+
+    def p(self, text: str, keep_next=False, keep_lines=False, page_break=False):
+        return self.block('p', self.paragraph(text, keep_next, keep_lines, page_break), text)
+
+    def heading(self, level: int, text: str):
+        return self.block('heading', self.heading_html(level, text), text)
+
+    def p_aligned(self, text: str, jc='right'):
+        return self.block('p_aligned', self.aligned(text, jc), text)
+
+    def list_p(self, num_id: int, ilvl: int, text: str):
+        self.count('list_p')
+        marker = self.marker(num_id, ilvl)
+        self.plain.append(self.plain_list_item(marker, ilvl, text) + self.newline)
+        return self.list_item(num_id, ilvl, marker, text)
+
+    def run_mix(self, seed: int):
+        return self.block('run_mix', self.run_mix_html((seed,)), self.run_mix_text(seed))
+
+    def run_mix_paragraph(self, seeds):
+        seeds = list(seeds)
+        return self.block('run_mix', self.run_mix_html(seeds), ''.join(self.run_mix_text(seed) for seed in seeds))
+
+    def image_paragraph(self, rid: str, docpr_id: int, cx: int, cy: int, name=None):
+        width, height = max(1, cx // EMU_PER_PX), max(1, cy // EMU_PER_PX)
+        return self.block('image_paragraph', self.image(docpr_id, width, height, self.images.src(rid, width, height, self.image_url)), '')
+
+    def table_block(self, rows=8, cols=4):
+        return self.block('table_block', self.table(rows, cols, 1), self.table_text(rows, cols))
+
+    def nested_table(self, depth: int, rows=2, cols=2):
+        return self.block('nested_table', self.table(rows, cols, depth), self.table_text(rows, cols))
+
+    # Text/plain --------------------------------------------------------
+
+    @staticmethod
+    def run_mix_text(seed: int):
+        return f'混合样式段 {seed}: 红色加粗 / 蓝色斜体 / 绿色下划线 / 高亮 / 删除线 / 上标x2 下标H2O'
+
+    def plain_list_item(self, marker: str, ilvl: int, text: str):
+        return '\t' * ilvl + marker + '\t' + text
+
+    def table_text(self, rows: int, cols: int):
+        return self.newline.join('\t'.join(cell_text(r, c) for c in range(cols)) for r in range(rows))
+
+    def finish(self):
+        return self.leave_list()
+
+def cell_text(r: int, c: int):
+    # Same cell text as scripts_docx_builder.table_block.
+    return f'R{r+1}C{c+1} 表格单元格测试：长文本用于验证换行与padding。'
+
+def nested_cell_text(level: int, index: int, cols: int):
+    return f'L{level}' if index == 0 else f'L{level} R{index // cols + 1}C{index % cols + 1}'
+
+# Word for Windows ----------------------------------------------------------
+
+WORD_HEAD = '''<html xmlns:v="urn:schemas-microsoft-com:vml"
+xmlns:o="urn:schemas-microsoft-com:office:office"
+xmlns:w="urn:schemas-microsoft-com:office:word"
+xmlns:m="http://schemas.microsoft.com/office/2004/12/omml"
+xmlns="http://www.w3.org/TR/REC-html40">
+
+<head>
+<meta http-equiv=Content-Type content="text/html; charset=utf-8">
+<meta name=ProgId content=Word.Document>
+<meta name=Generator content="Microsoft Word 15">
+<meta name=Originator content="Microsoft Word 15">
+<link rel=File-List
+href="file:///C:/Users/user/AppData/Local/Temp/msohtmlclip1/01/clip_filelist.xml">
+<link rel=themeData
+href="file:///C:/Users/user/AppData/Local/Temp/msohtmlclip1/01/clip_themedata.thmx">
+<!--[if gte mso 9]><xml>
+ <o:OfficeDocumentSettings>
+  <o:AllowPNG/>
+ </o:OfficeDocumentSettings>
+</xml><![endif]--><!--[if gte mso 9]><xml>
+ <w:WordDocument>
+  <w:View>Normal</w:View>
+  <w:Zoom>0</w:Zoom>
+  <w:TrackMoves/>
+  <w:TrackFormatting/>
+  <w:PunctuationKerning/>
+  <w:DrawingGridVerticalSpacing>7.8 磅</w:DrawingGridVerticalSpacing>
+  <w:DisplayHorizontalDrawingGridEvery>0</w:DisplayHorizontalDrawingGridEvery>
+  <w:DisplayVerticalDrawingGridEvery>2</w:DisplayVerticalDrawingGridEvery>
+  <w:ValidateAgainstSchemas/>
+  <w:SaveIfXMLInvalid>false</w:SaveIfXMLInvalid>
+  <w:IgnoreMixedContent>false</w:IgnoreMixedContent>
+  <w:AlwaysShowPlaceholderText>false</w:AlwaysShowPlaceholderText>
+  <w:Compatibility>
+   <w:SpaceForUL/>
+   <w:BalanceSingleByteDoubleByteWidth/>
+   <w:DoNotLeaveBackslashAlone/>
+   <w:ULTrailSpace/>
+   <w:DoNotExpandShiftReturn/>
+   <w:AdjustLineHeightInTable/>
+   <w:BreakWrappedTables/>
+   <w:SnapToGridInCell/>
+   <w:WrapTextWithPunct/>
+   <w:UseAsianBreakRules/>
+   <w:DontGrowAutofit/>
+   <w:SplitPgBreakAndParaMark/>
+   <w:UseFELayout/>
+  </w:Compatibility>
+  <m:mathPr>
+   <m:mathFont m:val="Cambria Math"/>
+   <m:brkBin m:val="before"/>
+   <m:dispDef/>
+   <m:wrapIndent m:val="1440"/>
+  </m:mathPr></w:WordDocument>
+</xml><![endif]--><!--[if gte mso 9]><xml>
+ <w:LatentStyles DefLockedState="false" DefUnhideWhenUsed="false"
+  DefSemiHidden="false" DefQFormat="false" DefPriority="99"
+  LatentStyleCount="376">
+  <w:LsdException Locked="false" Priority="0" QFormat="true" Name="Normal"/>
+  <w:LsdException Locked="false" Priority="9" QFormat="true" Name="heading 1"/>
+  <w:LsdException Locked="false" Priority="9" SemiHidden="true"
+   UnhideWhenUsed="true" QFormat="true" Name="heading 2"/>
+  <w:LsdException Locked="false" Priority="9" SemiHidden="true"
+   UnhideWhenUsed="true" QFormat="true" Name="heading 3"/>
+  <w:LsdException Locked="false" Priority="34" QFormat="true"
+   Name="List Paragraph"/>
+ </w:LatentStyles>
+</xml><![endif]-->
+<style>
+<!--
+ /* Font Definitions */
+ @font-face
+	{font-family:"Cambria Math";
+	panose-1:2 4 5 3 5 4 6 3 2 4;
+	mso-font-charset:0;
+	mso-generic-font-family:roman;
+	mso-font-pitch:variable;
+	mso-font-signature:-536870145 1107305727 0 0 415 0;}
+@font-face
+	{font-family:等线;
+	panose-1:2 1 6 0 3 1 1 1 1 1;
+	mso-font-alt:DengXian;
+	mso-font-charset:134;
+	mso-generic-font-family:auto;
+	mso-font-pitch:variable;
+	mso-font-signature:-1610612033 953122042 22 0 262159 0;}
+ /* Style Definitions */
+ p.MsoNormal, li.MsoNormal, div.MsoNormal
+	{mso-style-unhide:no;
+	mso-style-qformat:yes;
+	mso-style-parent:"";
+	margin-top:0cm;
+	margin-right:0cm;
+	margin-bottom:6.0pt;
+	margin-left:0cm;
+	line-height:150%;
+	mso-pagination:none;
+	font-size:14.0pt;
+	mso-bidi-font-size:11.0pt;
+	font-family:"Times New Roman",serif;
+	mso-fareast-font-family:等线;
+	mso-fareast-theme-font:minor-fareast;
+	mso-font-kerning:1.0pt;}
+h1
+	{mso-style-priority:9;
+	mso-style-qformat:yes;
+	mso-style-link:"标题 1 字符";
+	mso-style-next:正文;
+	margin-top:17.0pt;
+	margin-right:0cm;
+	margin-bottom:16.5pt;
+	margin-left:0cm;
+	line-height:240%;
+	mso-line-height-rule:exactly;
+	page-break-after:avoid;
+	mso-outline-level:1;
+	font-size:20.0pt;
+	color:#0F4761;
+	mso-font-kerning:22.0pt;
+	font-weight:bold;}
+h2
+	{mso-style-priority:9;
+	mso-style-qformat:yes;
+	mso-style-next:正文;
+	margin-top:13.0pt;
+	margin-bottom:13.0pt;
+	line-height:173%;
+	page-break-after:avoid;
+	mso-outline-level:2;
+	font-size:17.0pt;
+	color:#1F4E79;
+	font-weight:bold;}
+h3
+	{mso-style-priority:9;
+	mso-style-qformat:yes;
+	mso-style-next:正文;
+	margin-top:13.0pt;
+	margin-bottom:13.0pt;
+	line-height:173%;
+	page-break-after:avoid;
+	mso-outline-level:3;
+	font-size:15.0pt;
+	color:#2F6D9B;
+	font-weight:bold;}
+p.MsoListParagraph, li.MsoListParagraph, div.MsoListParagraph
+	{mso-style-priority:34;
+	mso-style-unhide:no;
+	mso-style-qformat:yes;
+	margin-top:0cm;
+	margin-right:0cm;
+	margin-bottom:6.0pt;
+	margin-left:36.0pt;
+	mso-para-margin-left:2.0gd;
+	line-height:150%;
+	font-size:14.0pt;
+	font-family:"Times New Roman",serif;
+	mso-fareast-font-family:等线;}
+p.MsoListParagraphCxSpFirst, li.MsoListParagraphCxSpFirst, div.MsoListParagraphCxSpFirst
+	{mso-style-priority:34;
+	mso-style-type:export-only;
+	margin-left:36.0pt;
+	mso-add-space:auto;}
+p.MsoListParagraphCxSpMiddle, li.MsoListParagraphCxSpMiddle, div.MsoListParagraphCxSpMiddle
+	{mso-style-priority:34;
+	mso-style-type:export-only;
+	margin-left:36.0pt;
+	mso-add-space:auto;}
+p.MsoListParagraphCxSpLast, li.MsoListParagraphCxSpLast, div.MsoListParagraphCxSpLast
+	{mso-style-priority:34;
+	mso-style-type:export-only;
+	margin-bottom:6.0pt;
+	margin-left:36.0pt;
+	mso-add-space:auto;}
+.MsoChpDefault
+	{mso-style-type:export-only;
+	mso-default-props:yes;
+	font-family:"Times New Roman",serif;
+	mso-fareast-font-family:等线;}
+ /* Page Definitions */
+ @page WordSection1
+	{size:595.3pt 841.9pt;
+	margin:72.0pt 90.0pt 72.0pt 90.0pt;
+	mso-header-margin:42.55pt;
+	mso-footer-margin:49.6pt;
+	mso-paper-source:0;
+	layout-grid:15.6pt;}
+div.WordSection1
+	{page:WordSection1;}
+ /* List Definitions */
+ @list l0
+	{mso-list-id:1021858592;
+	mso-list-type:hybrid;
+	mso-list-template-ids:-1590578476 67698703 67698713 67698715 67698703 67698713 67698715 67698703 67698713 67698715;}
+@list l0:level1
+	{mso-level-text:"%1\\.";
+	mso-level-tab-stop:none;
+	mso-level-number-position:left;
+	margin-left:36.0pt;
+	text-indent:-18.0pt;}
+@list l0:level2
+	{mso-level-number-format:alpha-lower;
+	mso-level-text:"%1\\.%2\\.";
+	mso-level-tab-stop:none;
+	mso-level-number-position:left;
+	margin-left:72.0pt;
+	text-indent:-18.0pt;}
+@list l0:level3
+	{mso-level-number-format:roman-lower;
+	mso-level-text:"%1\\.%2\\.%3\\.";
+	mso-level-tab-stop:none;
+	mso-level-number-position:right;
+	margin-left:108.0pt;
+	text-indent:-18.0pt;}
+@list l1
+	{mso-list-id:1446466125;
+	mso-list-type:hybrid;
+	mso-list-template-ids:2006416798 67698689 67698691 67698693 67698689 67698691 67698693 67698689 67698691 67698693;}
+@list l1:level1
+	{mso-level-number-format:bullet;
+	mso-level-text:•;
+	mso-level-tab-stop:none;
+	mso-level-number-position:left;
+	margin-left:36.0pt;
+	text-indent:-18.0pt;
+	font-family:Symbol;}
+@list l1:level2
+	{mso-level-number-format:bullet;
+	mso-level-text:◦;
+	mso-level-tab-stop:none;
+	mso-level-number-position:left;
+	margin-left:72.0pt;
+	text-indent:-18.0pt;
+	font-family:"Courier New";}
+@list l1:level3
+	{mso-level-number-format:bullet;
+	mso-level-text:▪;
+	mso-level-tab-stop:none;
+	mso-level-number-position:left;
+	margin-left:108.0pt;
+	text-indent:-18.0pt;
+	font-family:Wingdings;}
+ol
+	{margin-bottom:0cm;}
+ul
+	{margin-bottom:0cm;}
+-->
+</style>
+<!--[if gte mso 10]>
+<style>
+ /* Style Definitions */
+ table.MsoNormalTable
+	{mso-style-name:普通表格;
+	mso-tstyle-rowband-size:0;
+	mso-tstyle-colband-size:0;
+	mso-style-noshow:yes;
+	mso-style-priority:99;
+	mso-style-parent:"";
+	mso-padding-alt:0cm 5.4pt 0cm 5.4pt;
+	mso-para-margin:0cm;
+	text-align:justify;
+	text-justify:inter-ideograph;
+	font-size:10.5pt;
+	font-family:等线;}
+table.MsoTableGrid
+	{mso-style-name:网格型;
+	mso-tstyle-rowband-size:0;
+	mso-tstyle-colband-size:0;
+	mso-style-priority:39;
+	mso-style-unhide:no;
+	border:solid windowtext 1.0pt;
+	mso-border-alt:solid windowtext .5pt;
+	mso-padding-alt:0cm 5.4pt 0cm 5.4pt;
+	mso-border-insideh:.5pt solid windowtext;
+	mso-border-insidev:.5pt solid windowtext;
+	mso-para-margin:0cm;
+	font-size:10.5pt;
+	font-family:等线;}
+</style>
+<![endif]-->
+</head>
+
+<body lang=ZH-CN style='tab-interval:21.0pt;word-wrap:break-word;text-justify-trim:punctuation'>
+<!--StartFragment-->
+'''
+
+WORD_TAIL = '''
+<!--EndFragment-->
+</body>
+
+</html>
+'''
+
+WORD_CJK_SPAN = "<span style='font-family:等线;mso-ascii-font-family:\"Times New Roman\";mso-hansi-font-family:\"Times New Roman\"'>"
+WORD_LATIN_SPAN = "<span lang=EN-US>"
+
+def word_spans(text: str):
+    # Word splits runs at every script change and gives each its own span.
+    return ''.join((WORD_CJK_SPAN if '\u3000' <= chunk[0] else WORD_LATIN_SPAN) + escape(chunk, False) + '</span>' for chunk in CJK_OR_OTHER.findall(text))
+
+WORD_LIST_LEVELS = {1: 'l0', 2: 'l1'}
+
+# Word classes a list paragraph by its place in the run of list paragraphs,
+# keyed here by (first in run, last in run).
+WORD_LIST_CLASSES = {
+    (True, True): 'MsoListParagraph',
+    (True, False): 'MsoListParagraphCxSpFirst',
+    (False, False): 'MsoListParagraphCxSpMiddle',
+    (False, True): 'MsoListParagraphCxSpLast',
+}
+
+class WordFragments(ClipboardFragments):
+    name = 'word'
+    newline = '\r\n'
+    head = WORD_HEAD
+    tail = WORD_TAIL
+
+    def __init__(self, images):
+        super().__init__(images)
+        self.vml_images = 0
+        self.held_item = None
+
+    def paragraph(self, text, keep_next, keep_lines, page_break):
+        styles = ('page-break-after:avoid' if keep_next else '', 'page-break-inside:avoid' if keep_lines else '', 'page-break-before:always' if page_break else '')
+        style = ';'.join(s for s in styles if s)
+        open_tag = f"<p class=MsoNormal style='{style}'>" if style else '<p class=MsoNormal>'
+        return open_tag + word_spans(text) + '<span lang=EN-US><o:p></o:p></span></p>\n\n'
+
+    def heading_html(self, level, text):
+        return f'<h{level}>' + word_spans(text) + f'<span lang=EN-US><o:p></o:p></span></h{level}>\n\n'
+
+    def aligned(self, text, jc):
+        return f"<p class=MsoNormal align={jc} style='text-align:{jc}'>" + word_spans(text) + '<span lang=EN-US><o:p></o:p></span></p>\n\n'
+
+    def list_item(self, num_id, ilvl, marker, text):
+        # An item's class depends on whether the next block is also a list
+        # paragraph, so each item is held back until the next block arrives.
+        previous = self.release_item(last=False)
+        self.held_item = (self.list_open is None, num_id, ilvl, marker, text)
+        self.list_open = num_id
+        return previous
+
+    def leave_list(self):
+        last = self.release_item(last=True)
+        super().leave_list()
+        return last
+
+    def release_item(self, last):
+        if self.held_item is None:
+            return ''
+        first, num_id, ilvl, marker, text = self.held_item
+        self.held_item = None
+        # The marker is literal text inside a supportLists conditional with
+        # mso-list:Ignore; only the CxSp classes carry mso-add-space.
+        css_class = WORD_LIST_CLASSES[first, last]
+        add_space = 'mso-add-space:auto;' if 'CxSp' in css_class else ''
+        font = {1: '"Times New Roman",serif', 2: ('Symbol', '"Courier New"', 'Wingdings')[ilvl % 3]}[num_id]
+        return (
+            f"<p class={css_class} style='margin-left:{36 * (ilvl + 1)}.0pt;{add_space}text-indent:-18.0pt;mso-list:{WORD_LIST_LEVELS[num_id]} level{ilvl + 1} lfo{num_id}'>"
+            f"<![if !supportLists]><span lang=EN-US style='font-family:{font};mso-fareast-font-family:{font};mso-bidi-font-family:{font}'><span style='mso-list:Ignore'>{marker}<span style='font:7.0pt \"Times New Roman\"'>&nbsp;&nbsp;&nbsp;&nbsp;&nbsp;&nbsp; </span></span></span><![endif]>"
+            + word_spans(text) + '<span lang=EN-US><o:p></o:p></span></p>\n\n'
+        )
+
+    def run_mix_html(self, seeds):
+        return '<p class=MsoNormal>' + ''.join(word_run_mix(seed) for seed in seeds) + '<span lang=EN-US><o:p></o:p></span></p>\n\n'
+
+    @staticmethod
+    def image_url(index, ext):
+        return f'file:///C:/Users/user/AppData/Local/Temp/msohtmlclip1/01/clip_image{index:03d}.{ext}'
+
+    def image(self, docpr_id, width, height, src):
+        # VML for Word itself, a plain <img> for everything else. Word numbers
+        # the VML copies per occurrence and keeps the payload's format.
+        self.vml_images += 1
+        vml_src = self.image_url(self.vml_images, self.images.ext)
+        return (
+            f"<p class=MsoNormal><span lang=EN-US><!--[if gte vml 1]><v:shape id=\"图片_x0020_{docpr_id}\" o:spid=\"_x0000_i{1024 + docpr_id}\" type=\"#_x0000_t75\" style='width:{width * 3 / 4:g}pt;height:{height * 3 / 4:g}pt;visibility:visible;mso-wrap-style:square'>\n"
+            f" <v:imagedata src=\"{vml_src}\" o:title=\"\"/>\n"
+            f"</v:shape><![endif]--><![if !vml]><img width={width} height={height}\nsrc=\"{src}\" v:shapes=\"图片_x0020_{docpr_id}\"><![endif]></span><span lang=EN-US><o:p></o:p></span></p>\n\n"
+        )
+
+    def table(self, rows, cols, depth):
+        return word_table(rows, cols, depth)
+
+@lru_cache(maxsize=1)
+def _word_run_mix_tail():
+    return (
+        "</span><b><span style='color:#EE0000'>红色加粗</span></b>" + WORD_LATIN_SPAN + ' / </span>'
+        "<i><span style='color:#0070C0'>蓝色斜体</span></i>" + WORD_LATIN_SPAN + ' / </span>'
+        "<u><span style='color:#00B050'>绿色下划线</span></u>" + WORD_LATIN_SPAN + ' / </span>'
+        "<span style='background:yellow;mso-highlight:yellow'>高亮</span>" + WORD_LATIN_SPAN + ' / </span>'
+        "<s><span style='mso-bidi-font-weight:bold'>删除线</span></s>" + WORD_LATIN_SPAN + ' / </span>'
+        + WORD_CJK_SPAN + '上标</span>' + WORD_LATIN_SPAN + 'x</span><sup><span lang=EN-US>2</span></sup>'
+        + WORD_LATIN_SPAN + ' </span>' + WORD_CJK_SPAN + '下标</span>' + WORD_LATIN_SPAN + 'H</span><sub><span lang=EN-US>2</span></sub>'
+        + WORD_LATIN_SPAN + 'O</span>'
+    )
+
+def word_run_mix(seed: int):
+    return WORD_CJK_SPAN + '混合样式段</span>' + WORD_LATIN_SPAN + f' {seed}: ' + _word_run_mix_tail()
+
+@lru_cache(maxsize=32)
+def word_table(rows: int, cols: int, depth: int):
+    def cell(content, first_row, first_col):
+        borders = 'border:solid windowtext 1.0pt' if first_row and first_col else ('border:solid windowtext 1.0pt;border-left:none' if first_row else ('border:solid windowtext 1.0pt;border-top:none' if first_col else 'border-top:none;border-left:none;border-bottom:solid windowtext 1.0pt;border-right:solid windowtext 1.0pt'))
+        return f"  <td width=160 valign=top style='width:120.0pt;{borders};mso-border-alt:solid windowtext .5pt;padding:0cm 5.4pt 0cm 5.4pt'>\n  {content}\n  </td>\n"
+
+    def grid(contents):
+        trs = []
+        for r in range(rows):
+            flags = f"mso-yfti-irow:{r}" + (';mso-yfti-firstrow:yes' if r == 0 else '') + (';mso-yfti-lastrow:yes' if r == rows - 1 else '')
+            trs.append(f" <tr style='{flags}'>\n" + ''.join(cell(contents[r * cols + c], r == 0, c == 0) for c in range(cols)) + ' </tr>\n')
+        return ("<table class=MsoTableGrid border=1 cellspacing=0 cellpadding=0\n style='border-collapse:collapse;border:none;mso-border-alt:solid windowtext .5pt;\n mso-yfti-tbllook:1184;mso-padding-alt:0cm 5.4pt 0cm 5.4pt'>\n"
+                + ''.join(trs) + '</table>\n')
+
+    def cell_p(text):
+        return '<p class=MsoNormal>' + word_spans(text) + '<span lang=EN-US><o:p></o:p></span></p>'
+
+    table = grid([cell_p(cell_text(r, c)) for r in range(rows) for c in range(cols)])
+    for level in range(1, depth):
+        table = grid([table + cell_p(nested_cell_text(level, 0, cols))] + [cell_p(nested_cell_text(level, i, cols)) for i in range(1, rows * cols)])
+    return table + "\n<p class=MsoNormal><span lang=EN-US><o:p>&nbsp;</o:p></span></p>\n\n"
+
+# WPS Office ----------------------------------------------------------------
+
+WPS_HEAD = '''<html xmlns:o="urn:schemas-microsoft-com:office:office"
+xmlns:w="urn:schemas-microsoft-com:office:word"
+xmlns="http://www.w3.org/TR/REC-html40"><head><meta http-equiv=Content-Type  content="text/html; charset=utf-8" ><meta name=ProgId  content=Word.Document ><meta name=Generator  content="Microsoft Word 14" ><meta name=Originator  content="Microsoft Word 14" ><link rel=File-List  href="file:///C:/Users/user/AppData/Local/Temp/ksohtml8432/clip_filelist.xml" ><!--[if gte mso 9]><xml><w:WordDocument><w:BrowserLevel>MicrosoftInternetExplorer4</w:BrowserLevel><w:DisplayHorizontalDrawingGridEvery>0</w:DisplayHorizontalDrawingGridEvery><w:DisplayVerticalDrawingGridEvery>2</w:DisplayVerticalDrawingGridEvery><w:DocumentKind>DocumentNotSpecified</w:DocumentKind><w:DrawingGridVerticalSpacing>7.8 磅</w:DrawingGridVerticalSpacing><w:View>Web</w:View><w:Compatibility><w:DontGrowAutofit/><w:BalanceSingleByteDoubleByteWidth/><w:DoNotExpandShiftReturn/><w:UseFELayout/></w:Compatibility><w:Zoom>0</w:Zoom></w:WordDocument></xml><![endif]--><!--[if gte mso 9]><xml><w:LatentStyles DefLockedState="false"  DefUnhideWhenUsed="true"  DefSemiHidden="true"  DefQFormat="false"  DefPriority="99"  LatentStyleCount="260" >
+<w:LsdException Locked="false"  Priority="0"  SemiHidden="false"  QFormat="true"  Name="Normal" ></w:LsdException>
+<w:LsdException Locked="false"  Priority="9"  SemiHidden="false"  QFormat="true"  Name="heading 1" ></w:LsdException>
+<w:LsdException Locked="false"  Priority="9"  SemiHidden="false"  UnhideWhenUsed="false"  QFormat="true"  Name="heading 2" ></w:LsdException>
+<w:LsdException Locked="false"  Priority="9"  SemiHidden="false"  UnhideWhenUsed="false"  QFormat="true"  Name="heading 3" ></w:LsdException>
+</w:LatentStyles></xml><![endif]--><style>
+@font-face{
+font-family:"Times New Roman";
+}
+
+@font-face{
+font-family:"宋体";
+}
+
+@font-face{
+font-family:"Symbol";
+}
+
+@list l0:level1{
+mso-level-number-format:decimal;
+mso-level-suffix:tab;
+mso-level-text:"%1.";
+mso-level-tab-stop:none;
+mso-level-number-position:left;
+margin-left:36.0000pt;text-indent:-18.0000pt;font-family:'Times New Roman';}
+
+@list l0:level2{
+mso-level-number-format:alpha-lower;
+mso-level-suffix:tab;
+mso-level-text:"%1.%2.";
+mso-level-tab-stop:none;
+mso-level-number-position:left;
+margin-left:72.0000pt;text-indent:-18.0000pt;font-family:'Times New Roman';}
+
+@list l0:level3{
+mso-level-number-format:roman-lower;
+mso-level-suffix:tab;
+mso-level-text:"%1.%2.%3.";
+mso-level-tab-stop:none;
+mso-level-number-position:right;
+margin-left:108.0000pt;text-indent:-18.0000pt;font-family:'Times New Roman';}
+
+@list l1:level1{
+mso-level-number-format:bullet;
+mso-level-suffix:tab;
+mso-level-text:•;
+mso-level-tab-stop:none;
+mso-level-number-position:left;
+margin-left:36.0000pt;text-indent:-18.0000pt;font-family:Symbol;}
+
+@list l1:level2{
+mso-level-number-format:bullet;
+mso-level-suffix:tab;
+mso-level-text:◦;
+mso-level-tab-stop:none;
+mso-level-number-position:left;
+margin-left:72.0000pt;text-indent:-18.0000pt;font-family:'Courier New';}
+
+@list l1:level3{
+mso-level-number-format:bullet;
+mso-level-suffix:tab;
+mso-level-text:▪;
+mso-level-tab-stop:none;
+mso-level-number-position:left;
+margin-left:108.0000pt;text-indent:-18.0000pt;font-family:Wingdings;}
+
+p.MsoNormal{
+mso-style-name:正文;
+mso-style-parent:"";
+margin:0pt;
+margin-bottom:6.0000pt;
+mso-pagination:none;
+line-height:150%;
+font-family:'Times New Roman';
+mso-fareast-font-family:宋体;
+font-size:14.0000pt;
+mso-font-kerning:1.0000pt;
+}
+
+h1{
+mso-style-name:"标题 1";
+mso-style-next:正文;
+margin-top:17.0000pt;
+margin-bottom:16.5000pt;
+page-break-after:avoid;
+mso-pagination:lines-together;
+line-height:240%;
+mso-outline-level:1;
+font-family:'Times New Roman';
+font-weight:bold;
+color:rgb(15,71,97);
+font-size:20.0000pt;
+mso-font-kerning:22.0000pt;
+}
+
+h2{
+mso-style-name:"标题 2";
+mso-style-next:正文;
+margin-top:13.0000pt;
+margin-bottom:13.0000pt;
+page-break-after:avoid;
+mso-outline-level:2;
+font-weight:bold;
+color:rgb(31,78,121);
+font-size:17.0000pt;
+}
+
+h3{
+mso-style-name:"标题 3";
+mso-style-next:正文;
+margin-top:13.0000pt;
+margin-bottom:13.0000pt;
+page-break-after:avoid;
+mso-outline-level:3;
+font-weight:bold;
+color:rgb(47,109,155);
+font-size:15.0000pt;
+}
+
+span.msoIns{
+mso-style-type:export-only;
+mso-style-name:"";
+text-decoration:underline;
+text-underline:single;
+color:blue;
+}
+
+span.msoDel{
+mso-style-type:export-only;
+mso-style-name:"";
+text-decoration:line-through;
+color:red;
+}
+
+table.MsoNormalTable{
+mso-style-name:普通表格;
+mso-style-parent:"";
+mso-style-noshow:yes;
+mso-tstyle-rowband-size:0;
+mso-tstyle-colband-size:0;
+mso-padding-alt:0.0000pt 5.4000pt 0.0000pt 5.4000pt;
+mso-para-margin:0pt;
+mso-para-margin-bottom:.0001pt;
+mso-pagination:widow-orphan;
+font-family:'Times New Roman';
+font-size:10.0000pt;
+mso-ansi-language:#0400;
+mso-fareast-language:#0400;
+mso-bidi-language:#0400;
+}
+
+table.MsoTableGrid{
+mso-style-name:网格型;
+mso-tstyle-rowband-size:0;
+mso-tstyle-colband-size:0;
+mso-padding-alt:0.0000pt 5.4000pt 0.0000pt 5.4000pt;
+mso-border-top-alt:0.5000pt solid windowtext;
+mso-border-left-alt:0.5000pt solid windowtext;
+mso-border-bottom-alt:0.5000pt solid windowtext;
+mso-border-right-alt:0.5000pt solid windowtext;
+mso-border-insideh:0.5000pt solid windowtext;
+mso-border-insidev:0.5000pt solid windowtext;
+mso-para-margin:0pt;
+mso-para-margin-bottom:.0001pt;
+mso-pagination:none;
+text-align:justify;
+text-justify:inter-ideograph;
+font-family:'Times New Roman';
+font-size:10.0000pt;
+}
+@page{mso-page-border-surround-header:no;
+	mso-page-border-surround-footer:no;}@page Section0{
+margin-top:72.0000pt;
+margin-bottom:72.0000pt;
+margin-left:90.0000pt;
+margin-right:90.0000pt;
+size:595.3000pt 841.9000pt;
+layout-grid:15.6000pt;
+mso-header-margin:42.5500pt;
+mso-footer-margin:49.6000pt;
+}
+div.Section0{page:Section0;}</style></head><body style="tab-interval:21pt;text-justify-trim:punctuation;" ><!--StartFragment-->'''
+
+WPS_TAIL = '<!--EndFragment--></body></html>'
+
+WPS_CJK_SPAN = '<span style="mso-spacerun:\'yes\';font-family:宋体;mso-ascii-font-family:\'Times New Roman\';mso-hansi-font-family:\'Times New Roman\';mso-bidi-font-family:\'Times New Roman\';font-size:14.0000pt;mso-font-kerning:1.0000pt;" >'
+WPS_LATIN_SPAN = '<span style="mso-spacerun:\'yes\';font-family:\'Times New Roman\';mso-fareast-font-family:宋体;font-size:14.0000pt;mso-font-kerning:1.0000pt;" >'
+WPS_EMPTY = '<span style="mso-spacerun:\'yes\';font-family:\'Times New Roman\';mso-fareast-font-family:宋体;font-size:14.0000pt;mso-font-kerning:1.0000pt;" ><o:p></o:p></span>'
+
+def wps_spans(text: str, style=''):
+    return ''.join((WPS_CJK_SPAN if '\u3000' <= chunk[0] else WPS_LATIN_SPAN).replace('" >', style + '" >', 1) + escape(chunk, False) + '</span>' for chunk in CJK_OR_OTHER.findall(text))
+
+class WpsFragments(ClipboardFragments):
+    name = 'wps'
+    newline = '\r\n'
+    head = WPS_HEAD
+    tail = WPS_TAIL
+
+    def paragraph(self, text, keep_next, keep_lines, page_break):
+        styles = ('page-break-after:avoid;' if keep_next else '') + ('mso-pagination:lines-together;' if keep_lines else '') + ('page-break-before:always;' if page_break else '')
+        open_tag = f'<p class=MsoNormal  style="{styles}" >' if styles else '<p class=MsoNormal >'
+        return open_tag + wps_spans(text) + WPS_EMPTY + '</p>'
+
+    def heading_html(self, level, text):
+        # WPS wraps heading text in <font face> inside its run span.
+        size = {1: '20.0000', 2: '17.0000', 3: '15.0000'}.get(level, '14.0000')
+        return (f'<h{level}><span style="mso-spacerun:\'yes\';font-family:\'Times New Roman\';font-weight:bold;font-size:{size}pt;mso-font-kerning:22.0000pt;" >'
+                f'<font face="宋体" >{escape(text, False)}</font></span><span style="mso-spacerun:\'yes\';font-weight:bold;font-size:{size}pt;" ><o:p></o:p></span></h{level}>')
+
+    def aligned(self, text, jc):
+        return f'<p class=MsoNormal  align={jc}  style="text-align:{jc};" >' + wps_spans(text) + WPS_EMPTY + '</p>'
+
+    def list_item(self, num_id, ilvl, marker, text):
+        self.list_open = num_id
+        font = {1: "'Times New Roman'", 2: ('Symbol', "'Courier New'", 'Wingdings')[ilvl % 3]}[num_id]
+        return (
+            f'<p class=MsoNormal  style="margin-left:{36 * (ilvl + 1)}.0000pt;text-indent:-18.0000pt;mso-list:{WORD_LIST_LEVELS[num_id]} level{ilvl + 1} lfo{num_id};" >'
+            f'<![if !supportLists]><span style="font-family:{font};mso-fareast-font-family:宋体;mso-bidi-font-family:\'Times New Roman\';font-size:14.0000pt;mso-font-kerning:1.0000pt;" ><span style=\'mso-list:Ignore;\' >{marker}&nbsp;</span></span><![endif]>'
+            + wps_spans(text) + WPS_EMPTY + '</p>'
+        )
+
+    def run_mix_html(self, seeds):
+        return '<p class=MsoNormal >' + ''.join(wps_run_mix(seed) for seed in seeds) + WPS_EMPTY + '</p>'
+
+    @staticmethod
+    def image_url(index, ext):
+        return f'file:///C:/Users/user/AppData/Local/Temp/ksohtml8432/wps{index}.{ext}'
+
+    def image(self, docpr_id, width, height, src):
+        return f'<p class=MsoNormal ><span style="font-family:\'Times New Roman\';mso-fareast-font-family:宋体;font-size:14.0000pt;mso-font-kerning:1.0000pt;" ><img width="{width}" height="{height}" src="{src}" ></span>' + WPS_EMPTY + '</p>'
+
+    def table(self, rows, cols, depth):
+        return wps_table(rows, cols, depth)
+
+@lru_cache(maxsize=1)
+def _wps_run_mix_tail():
+    return (
+        wps_spans('红色加粗', 'color:rgb(238,0,0);font-weight:bold;') + wps_spans(' / ')
+        + wps_spans('蓝色斜体', 'color:rgb(0,112,192);font-style:italic;') + wps_spans(' / ')
+        + wps_spans('绿色下划线', 'color:rgb(0,176,80);text-decoration:underline;text-underline:single;') + wps_spans(' / ')
+        + wps_spans('高亮', 'background:rgb(255,255,0);mso-highlight:rgb(255,255,0);') + wps_spans(' / ')
+        + wps_spans('删除线', 'text-decoration:line-through;') + wps_spans(' / 上标x')
+        + wps_spans('2', 'vertical-align:super;') + wps_spans(' 下标H')
+        + wps_spans('2', 'vertical-align:sub;') + wps_spans('O')
+    )
+
+def wps_run_mix(seed: int):
+    return wps_spans(f'混合样式段 {seed}: ') + _wps_run_mix_tail()
+
+WPS_CELL_BORDERS = 'border-left:0.5000pt solid windowtext;mso-border-left-alt:0.5000pt solid windowtext;border-right:0.5000pt solid windowtext;mso-border-right-alt:0.5000pt solid windowtext;border-top:0.5000pt solid windowtext;mso-border-top-alt:0.5000pt solid windowtext;border-bottom:0.5000pt solid windowtext;mso-border-bottom-alt:0.5000pt solid windowtext;'
+
+@lru_cache(maxsize=32)
+def wps_table(rows: int, cols: int, depth: int):
+    def grid(contents):
+        trs = []
+        for r in range(rows):
+            tds = ''.join(f'<td width=160  valign=top  style="width:120.0000pt;padding:0.0000pt 5.4000pt 0.0000pt 5.4000pt ;{WPS_CELL_BORDERS}" >{contents[r * cols + c]}</td>' for c in range(cols))
+            trs.append(f'<tr>{tds}</tr>')
+        return (f'<table class=MsoTableGrid  border=1  frame=box cellspacing=0 style="border-collapse:collapse;width:{120 * cols}.0000pt;mso-table-layout-alt:fixed;border:none;mso-border-left-alt:0.5000pt solid windowtext;mso-border-top-alt:0.5000pt solid windowtext;mso-border-right-alt:0.5000pt solid windowtext;mso-border-bottom-alt:0.5000pt solid windowtext;mso-border-insideh:0.5000pt solid windowtext;mso-border-insidev:0.5000pt solid windowtext;mso-padding-alt:0.0000pt 5.4000pt 0.0000pt 5.4000pt ;" >'
+                + ''.join(trs) + '</table>')
+
+    def cell_p(text):
+        return '<p class=MsoNormal >' + wps_spans(text) + WPS_EMPTY + '</p>'
+
+    table = grid([cell_p(cell_text(r, c)) for r in range(rows) for c in range(cols)])
+    for level in range(1, depth):
+        table = grid([table + cell_p(nested_cell_text(level, 0, cols))] + [cell_p(nested_cell_text(level, i, cols)) for i in range(1, rows * cols)])
+    return table
+
+# Google Docs ---------------------------------------------------------------
+
+GDOCS_HEAD = '<meta charset="utf-8"><b style="font-weight:normal;" id="docs-internal-guid-6f1b2c3d-7fff-4e5a-9b8c-0d1e2f3a4b5c">'
+GDOCS_TAIL = '</b><br class="Apple-interchange-newline">'
+
+GDOCS_RUN = 'font-size:11pt;font-family:Arial,sans-serif;color:#000000;background-color:transparent;font-weight:400;font-style:normal;font-variant:normal;text-decoration:none;vertical-align:baseline;white-space:pre;white-space:pre-wrap;'
+GDOCS_P = 'line-height:1.38;margin-top:0pt;margin-bottom:0pt;'
+
+def gdocs_span(text: str, run=GDOCS_RUN):
+    return f'<span style="{run}">{escape(text, False)}</span>'
+
+def gdocs_styled(**overrides):
+    # Rewrites the default run declarations; Google Docs always spells out all of them.
+    run = GDOCS_RUN
+    for key, value in overrides.items():
+        prop = key.replace('_', '-')
+        run = re.sub(rf'(?<![-\w]){prop}:[^;]*;', f'{prop}:{value};', run, count=1)
+    return run
+
+class GoogleDocsFragments(ClipboardFragments):
+    name = 'gdocs'
+    head = GDOCS_HEAD
+    tail = GDOCS_TAIL
+
+    def __init__(self, images):
+        super().__init__(images)
+        self.list_stack = []
+
+    def leave_list(self):
+        # Lists are real <ol>/<ul> trees, closed when a non-list block follows.
+        closing = ''.join(reversed(self.list_stack)) if self.list_open else ''
+        self.list_open = None
+        self.list_stack = []
+        return closing
+
+    def paragraph(self, text, keep_next, keep_lines, page_break):
+        # Google Docs drops keep flags; a page break becomes an <hr> before the paragraph.
+        prefix = '<hr style="page-break-before:always;display:none;">' if page_break else ''
+        return prefix + f'<p dir="ltr" style="{GDOCS_P}">' + gdocs_span(text) + '</p>'
+
+    def heading_html(self, level, text):
+        size = {1: 20, 2: 16, 3: 14}.get(level, 12)
+        run = gdocs_styled(font_size=f'{size}pt', font_weight='700' if level < 3 else '400', color='#434343' if level == 3 else '#000000')
+        return f'<h{level} dir="ltr" style="line-height:1.38;margin-top:{22 - level * 2}pt;margin-bottom:6pt;">' + gdocs_span(text, run) + f'</h{level}>'
+
+    def aligned(self, text, jc):
+        return f'<p dir="ltr" style="{GDOCS_P}text-align:{jc};">' + gdocs_span(text) + '</p>'
+
+    def list_item(self, num_id, ilvl, marker, text):
+        if self.list_open != num_id:
+            head = self.leave_list()
+            self.list_open = num_id
+        else:
+            head = ''
+        tag = 'ol' if num_id == 1 else 'ul'
+        # Deeper levels open a nested list as a sibling of the parent <li>.
+        while len(self.list_stack) <= ilvl:
+            head += f'<{tag} style="margin-top:0;margin-bottom:0;padding-inline-start:48px;">'
+            self.list_stack.append(f'</{tag}>')
+        while len(self.list_stack) > ilvl + 1:
+            head += self.list_stack.pop()
+        list_type = ('decimal', 'lower-alpha', 'lower-roman')[ilvl] if num_id == 1 else ('disc', 'circle', 'square')[ilvl % 3]
+        return (head + f'<li dir="ltr" style="list-style-type:{list_type};font-size:11pt;font-family:Arial,sans-serif;color:#000000;background-color:transparent;font-weight:400;font-style:normal;font-variant:normal;text-decoration:none;vertical-align:baseline;white-space:pre;" aria-level="{ilvl + 1}">'
+                f'<p dir="ltr" style="{GDOCS_P}" role="presentation">' + gdocs_span(text) + '</p></li>')
+
+    def plain_list_item(self, marker, ilvl, text):
+        return '   ' * ilvl + ('* ' if marker in BULLETS else marker.rsplit('.', 2)[-2] + '. ') + text
+
+    def run_mix_html(self, seeds):
+        return f'<p dir="ltr" style="{GDOCS_P}">' + ''.join(gdocs_run_mix(seed) for seed in seeds) + '</p>'
+
+    @staticmethod
+    def image_url(index, ext):
+        return f'https://lh7-rt.googleusercontent.com/docsz/AD_4nX{index:06d}?key=clipboard'
+
+    def image(self, docpr_id, width, height, src):
+        return (f'<p dir="ltr" style="{GDOCS_P}"><span style="{GDOCS_RUN}"><span style="border:none;display:inline-block;overflow:hidden;width:{width}px;height:{height}px;">'
+                f'<img src="{src}" width="{width}" height="{height}" style="margin-left:0px;margin-top:0px;" /></span></span></p>')
+
+    def table(self, rows, cols, depth):
+        return gdocs_table(rows, cols, depth)
+
+@lru_cache(maxsize=1)
+def _gdocs_run_mix_tail():
+    sep = gdocs_span(' / ')
+    return (
+        gdocs_span('红色加粗', gdocs_styled(color='#ee0000', font_weight='700')) + sep
+        + gdocs_span('蓝色斜体', gdocs_styled(color='#0070c0', font_style='italic')) + sep
+        + gdocs_span('绿色下划线', gdocs_styled(color='#00b050', text_decoration='underline;-webkit-text-decoration-skip:none;text-decoration-skip-ink:none')) + sep
+        + gdocs_span('高亮', gdocs_styled(background_color='#ffff00')) + sep
+        + gdocs_span('删除线', gdocs_styled(text_decoration='line-through;-webkit-text-decoration-skip:none;text-decoration-skip-ink:none'))
+        + gdocs_span(' / 上标x') + gdocs_span('2', gdocs_styled(vertical_align='super', font_size='0.6em'))
+        + gdocs_span(' 下标H') + gdocs_span('2', gdocs_styled(vertical_align='sub', font_size='0.6em')) + gdocs_span('O')
+    )
+
+def gdocs_run_mix(seed: int):
+    return gdocs_span(f'混合样式段 {seed}: ') + _gdocs_run_mix_tail()
+
+GDOCS_CELL = 'border-left:solid #000000 1pt;border-right:solid #000000 1pt;border-bottom:solid #000000 1pt;border-top:solid #000000 1pt;vertical-align:top;padding:5pt 5pt 5pt 5pt;overflow:hidden;overflow-wrap:break-word;'
+
+@lru_cache(maxsize=32)
+def gdocs_table(rows: int, cols: int, depth: int):
+    def grid(contents):
+        trs = ''.join('<tr style="height:0pt">' + ''.join(f'<td style="{GDOCS_CELL}">{contents[r * cols + c]}</td>' for c in range(cols)) + '</tr>' for r in range(rows))
+        return ('<div dir="ltr" style="margin-left:0pt;" align="left"><table style="border:none;border-collapse:collapse;"><colgroup>'
+                + '<col width="160" />' * cols + '</colgroup><tbody>' + trs + '</tbody></table></div>')
+
+    def cell_p(text):
+        return '<p dir="ltr" style="line-height:1.2;margin-top:0pt;margin-bottom:0pt;">' + gdocs_span(text) + '</p>'
+
+    table = grid([cell_p(cell_text(r, c)) for r in range(rows) for c in range(cols)])
+    for level in range(1, depth):
+        table = grid([table + cell_p(nested_cell_text(level, 0, cols))] + [cell_p(nested_cell_text(level, i, cols)) for i in range(1, rows * cols)])
+    return table + '<br />'
+
+DIALECTS = {fragments.name: fragments for fragments in (WordFragments, WpsFragments, GoogleDocsFragments)}
+
+# Documents -----------------------------------------------------------------
+
+def iter_paste_parts(fx, sections: int, target_bytes=None):
+    # `sections == 0` pastes a single paragraph. With `target_bytes`, sections
+    # are appended until the paste reaches that size (the count is returned).
+    yield fx.head
+    if sections == 0 and not target_bytes:
+        yield fx.p('单段粘贴：Performance baseline and fidelity alignment are both required.')
+    else:
+        yield from stress.iter_prologue_parts(fx)
+        section = 0
+        while (target_bytes and fx.size < target_bytes) or (not target_bytes and section < sections):
+            section += 1
+            yield from stress.iter_section_parts(section, fx)
+        yield from stress.iter_epilogue_parts(fx)
+        fx.sections = section
+    yield fx.finish()
+    yield fx.tail
+
+def write_paste(target: Path, dialect: str, sections: int, target_bytes=None, image_mode='inline', image_kind='jpeg'):
+    files_dir = target.with_suffix('.files')
+    fx = DIALECTS[dialect](ImageSource(image_mode, image_kind, files_dir))
+    text_bytes = 0
+    with open(target, 'wb') as html, open(target.with_suffix('.txt'), 'wb') as text:
+        for part in iter_paste_parts(fx, sections, target_bytes):
+            data = part.encode('utf-8')
+            html.write(data)
+            fx.size += len(data)
+            if fx.plain:
+                plain = fx.take_plain().encode('utf-8')
+                text.write(plain)
+                text_bytes += len(plain)
+    return {
+        'dialect': dialect,
+        'sections': fx.sections,
+        'html_bytes': fx.size,
+        'text_bytes': text_bytes,
+        'image_bytes': fx.images.bytes,
+        'image_files': [str(files_dir / f'image{index:03d}.{fx.images.ext}') for index in sorted(fx.images.files.values())],
+        'blocks': dict(sorted(fx.blocks.items())),
+    }
+
+def paste_name(dialect: str, sections: int, megabytes=None, image_mode='inline'):
+    size = f'{megabytes:g}mb' if megabytes else ('p1' if sections == 0 else f's{sections}')
+    return f'clipboard-{dialect}-{size}' + ('' if image_mode == 'inline' else f'-{image_mode}') + '.html'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate clipboard HTML pastes in Word, WPS and Google Docs dialects.')
+    parser.add_argument('--dialect', dest='dialects', action='append', choices=list(DIALECTS), help='dialect to emit; repeatable (default: all)')
+    parser.add_argument('--sections', type=int, default=8, help='stress-document sections per paste; 0 pastes a single paragraph (default: 8)')
+    parser.add_argument('--megabytes', type=float, help='append sections until each paste reaches this size; overrides --sections')
+    parser.add_argument('--images', dest='image_mode', choices=('inline', 'file'), default='inline', help='inline: base64 data: URIs; file: vendor temp/remote URLs with payloads written to <name>.files/')
+    parser.add_argument('--image-format', dest='image_kind', choices=('png', 'jpeg'), default='jpeg')
+    parser.add_argument('--out-dir', type=Path, default=out_dir)
+    parser.add_argument('--force', action='store_true', help='rebuild even if the inputs fingerprint matches the build cache')
+    args = parser.parse_args(argv)
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    cache = build_cache_for(args.out_dir)
+    target_bytes = int(args.megabytes * 1_000_000) if args.megabytes else None
+    sources = (BUILDER_SOURCE, Path(media.__file__), Path(stress.__file__), Path(__file__))
+    for dialect in args.dialects or list(DIALECTS):
+        target = args.out_dir / paste_name(dialect, args.sections, args.megabytes, args.image_mode)
+        params = {'dialect': dialect, 'sections': args.sections, 'target_bytes': target_bytes, 'image_mode': args.image_mode, 'image_kind': args.image_kind}
+        key = input_fingerprint('clipboard', params, sources)
+        if not args.force and cache.lookup(target, key, (target.with_suffix('.txt'),)):
+            print(str(target))
+            print('up to date', file=sys.stderr)
+            continue
+        started = time.perf_counter()
+        summary = write_paste(target, dialect, args.sections, target_bytes, args.image_mode, args.image_kind)
+        cache.store(target, key, summary)
+        print(str(target))
+        print(f"{dialect}: {summary['sections']} sections, {sum(summary['blocks'].values())} blocks, html {summary['html_bytes']} bytes, text {summary['text_bytes']} bytes, images {summary['image_bytes']} bytes, {time.perf_counter() - started:.2f}s", file=sys.stderr)
+    cache.save()
+
+if __name__ == '__main__':
+    main()
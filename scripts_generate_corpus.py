@@ -0,0 +1,169 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+from scripts_docx_builder import FragmentStats, build_cache_for
+from scripts_docx_oracle import Oracle, oracle_path
+import scripts_generate_stress_docx as stress
+import scripts_generate_test_docx as coverage
+
+out_dir = Path('assets/test-docs/corpus')
+
+# Example spec (JSON list, one object per document):
+# [
+#   {"generator": "coverage", "out": "coverage.docx"},
+#   {"generator": "stress", "out": "stress-x100.docx", "sections": 800}
+# ]
+DEFAULT_SPEC = [
+    {'generator': 'coverage', 'out': 'word-fidelity-full-coverage-test.docx'},
+    {'generator': 'stress', 'out': 'word-fidelity-stress-test.docx', 'sections': 8},
+]
+
+GENERATORS = ('coverage', 'stress')
+
+def load_spec(path):
+    if path is None:
+        return DEFAULT_SPEC
+    jobs = json.loads(Path(path).read_text(encoding='utf-8'))
+    for job in jobs:
+        if job.get('generator') not in GENERATORS:
+            raise ValueError(f"unknown generator {job.get('generator')!r} for {job.get('out')!r}")
+        if not job.get('out'):
+            raise ValueError(f'job without "out": {job!r}')
+    return jobs
+
+def job_fingerprint(job):
+    if job['generator'] == 'coverage':
+        return coverage.fingerprint()
+    # Sharded and in-process stress builds produce identical streamed archives.
+    return stress.fingerprint(job.get('sections', 8), stream=True)
+
+def write_oracle(oracle, target: Path):
+    # Builds without an oracle drop any sidecar left by an earlier build.
+    if oracle is not None:
+        oracle.write(target)
+    else:
+        oracle_path(target).unlink(missing_ok=True)
+
+def build_job(job, target_dir: Path, with_oracle=True):
+    target = target_dir / job['out']
+    target.parent.mkdir(parents=True, exist_ok=True)
+    stats = FragmentStats()
+    oracle = Oracle() if with_oracle else None
+    if job['generator'] == 'coverage':
+        for part in coverage.build_body_parts():
+            stats.add(part)
+        coverage.write_docx(target, oracle)
+    else:
+        stress.write_docx_streaming(target, job.get('sections', 8), stats, oracle=oracle)
+    write_oracle(oracle, target)
+    return summarize(job, target, stats, with_oracle)
+
+def iter_sharded_chunks(pool, sections: int, chunk_sections: int, window: int, stats, oracle):
+    # Section bodies are rendered out of process but consumed strictly in order,
+    # with at most `window` chunks in flight so memory stays bounded.
+    with_oracle = oracle is not None
+    data, counts, blocks = stress.render_prologue(with_oracle)
+    stats.merge(counts)
+    if with_oracle:
+        oracle.merge(blocks)
+    yield data
+
+    ranges = deque((start, min(start + chunk_sections, sections + 1)) for start in range(1, sections + 1, chunk_sections))
+    pending = deque()
+    while ranges or pending:
+        while ranges and len(pending) < window:
+            start, stop = ranges.popleft()
+            pending.append(pool.submit(stress.render_section_chunk, start, stop, with_oracle))
+        data, counts, blocks = pending.popleft().result()
+        stats.merge(counts)
+        if with_oracle:
+            oracle.merge(blocks)
+        yield data
+
+    data, counts, blocks = stress.render_epilogue(with_oracle)
+    stats.merge(counts)
+    if with_oracle:
+        oracle.merge(blocks)
+    yield data
+
+def build_sharded_job(job, target_dir: Path, pool, chunk_sections: int, window: int, with_oracle=True):
+    target = target_dir / job['out']
+    target.parent.mkdir(parents=True, exist_ok=True)
+    stats = FragmentStats()
+    oracle = Oracle() if with_oracle else None
+    stress.write_docx_chunks(target, iter_sharded_chunks(pool, job.get('sections', 8), chunk_sections, window, stats, oracle))
+    write_oracle(oracle, target)
+    return summarize(job, target, stats, with_oracle)
+
+def summarize(job, target: Path, stats, with_oracle=True):
+    return {
+        'file': job['out'],
+        **({'oracle': oracle_path(Path(job['out'])).as_posix()} if with_oracle else {}),
+        'generator': job['generator'],
+        **({'sections': job.get('sections', 8)} if job['generator'] == 'stress' else {}),
+        **stats.as_dict(),
+        'archive_bytes': target.stat().st_size,
+    }
+
+def build_corpus(jobs, target_dir: Path, workers: int, chunk_sections: int, force=False, with_oracle=True):
+    target_dir.mkdir(parents=True, exist_ok=True)
+    cache = build_cache_for(target_dir)
+    keys = [job_fingerprint(job) for job in jobs]
+    results = [None] * len(jobs)
+    for index, job in enumerate(jobs):
+        target = target_dir / job['out']
+        companions = (oracle_path(target),) if with_oracle else ()
+        cached = None if force else cache.lookup(target, keys[index], companions)
+        if cached:
+            results[index] = cached['summary']
+    if all(results):
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        whole = []
+        sharded = []
+        for index, job in enumerate(jobs):
+            if results[index]:
+                continue
+            if job['generator'] == 'stress' and job.get('sections', 8) > chunk_sections:
+                sharded.append(index)
+            else:
+                whole.append((index, pool.submit(build_job, job, target_dir, with_oracle)))
+        for index in sharded:
+            results[index] = build_sharded_job(jobs[index], target_dir, pool, chunk_sections, workers * 2, with_oracle)
+        for index, future in whole:
+            results[index] = future.result()
+
+    for index, job in enumerate(jobs):
+        cache.store(target_dir / job['out'], keys[index], results[index])
+    cache.save()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Build a DOCX fixture corpus across a process pool.')
+    parser.add_argument('--spec', help='JSON list of documents to build (default: the two checked-in fixtures)')
+    parser.add_argument('--out-dir', type=Path, default=out_dir)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunk-sections', type=int, default=256, help='stress documents above this many sections are split into section chunks rendered in parallel')
+    parser.add_argument('--force', action='store_true', help='rebuild documents even if their inputs fingerprint is unchanged')
+    parser.add_argument('--no-oracle', dest='oracle', action='store_false', help='skip the .oracle.json sidecars; each keeps one record per block in memory until its document is written')
+    args = parser.parse_args(argv)
+
+    jobs = load_spec(args.spec)
+    started = time.perf_counter()
+    results = build_corpus(jobs, args.out_dir, args.workers, args.chunk_sections, args.force, args.oracle)
+    elapsed = time.perf_counter() - started
+
+    manifest = args.out_dir / 'manifest.json'
+    manifest.write_text(json.dumps({'documents': results}, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    print(str(manifest))
+    print(f'{len(results)} documents, {args.workers} workers, {elapsed:.2f}s', file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
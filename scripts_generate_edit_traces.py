@@ -0,0 +1,302 @@
+from pathlib import Path
+import argparse
+import json
+import random
+import sys
+
+from scripts_docx_builder import CJK, LATIN
+from scripts_docx_oracle import HEADING, KINDS, LIST, MIXED, PARAGRAPH, TABLE, load_oracle
+
+# Deterministic edit traces for a generated fixture, one JSON object per line.
+# Blocks are addressed by their current position in the body (as indexed by
+# lib/render/blockIndexer.ts) and by a stable id: `b<n>` for the n-th block of
+# the generated document, `n<k>` for blocks inserted by the trace. The first
+# line is a `meta` record; every edit carries the EditorOperation type
+# (`timeline`) a replayer should push into lib/history/timeline.ts.
+#
+# Edits are grouped the way an editor groups undo steps: a typing burst is one
+# group, every structural edit is its own group. `undo`/`redo` name the group
+# they revert or re-apply.
+
+TEXT_KINDS = (PARAGRAPH, HEADING, LIST, MIXED)
+
+# Episode weights per profile.
+PROFILES = {
+    'mixed': {'typing': 50, 'insert_block': 10, 'delete_block': 6, 'list_level': 10, 'cell_edit': 10, 'undo_storm': 4},
+    'typing': {'typing': 90, 'undo_storm': 10},
+    'structural': {'insert_block': 45, 'delete_block': 35, 'typing': 15, 'undo_storm': 5},
+    'lists': {'list_level': 70, 'typing': 25, 'undo_storm': 5},
+    'tables': {'cell_edit': 80, 'typing': 15, 'undo_storm': 5},
+    'undo-storm': {'undo_storm': 60, 'typing': 30, 'insert_block': 10},
+}
+
+class DocumentModel:
+    # Just enough state to keep positions and text offsets valid as edits apply.
+
+    def __init__(self, columns):
+        self.ids = [f'b{i}' for i in range(len(columns['kind']))]
+        self.kinds = list(columns['kind'])
+        self.text = dict(zip(self.ids, columns['text_chars']))
+        self.list_level = {id_: ilvl for id_, kind, ilvl in zip(self.ids, self.kinds, columns['ilvl']) if kind == LIST}
+        self.num_id = {id_: num_id for id_, kind, num_id in zip(self.ids, self.kinds, columns['num_id']) if kind == LIST}
+        self.table_shape = {id_: (rows, cols) for id_, kind, rows, cols in zip(self.ids, self.kinds, columns['rows'], columns['cols']) if kind == TABLE}
+        self.inserted = 0
+
+    def insert(self, position: int, id_: str, kind: int, text_chars: int):
+        self.ids.insert(position, id_)
+        self.kinds.insert(position, kind)
+        self.text[id_] = text_chars
+
+    def remove(self, position: int):
+        id_ = self.ids.pop(position)
+        kind = self.kinds.pop(position)
+        return id_, kind
+
+    def new_id(self):
+        self.inserted += 1
+        return f'n{self.inserted}'
+
+class TraceWriter:
+    def __init__(self, rng: random.Random, model: DocumentModel, limit: int):
+        self.rng = rng
+        self.model = model
+        self.records = []
+        # Episodes stop at `limit` records, before touching the model, so the
+        # model always matches a replay of the emitted trace.
+        self.limit = limit
+        self.t = 0
+        self.group = 0
+        self.undo_stack = []  # groups: (group id, [inverse actions])
+        self.redo_stack = []
+        self.cursor = 0
+
+    def emit(self, op: str, **fields):
+        self.records.append({'seq': len(self.records), 't': self.t, 'op': op, **fields})
+
+    @property
+    def full(self):
+        return len(self.records) >= self.limit
+
+    def tick(self, low: int, high: int):
+        self.t += self.rng.randint(low, high)
+
+    def text(self, length: int):
+        alphabet = CJK if self.rng.random() < 0.7 else LATIN
+        return ''.join(self.rng.choice(alphabet) for _ in range(length))
+
+    def pick(self, kinds, near=True, attempts=2000):
+        # Prefers blocks close to the last edit, like a user working through a section.
+        count = len(self.model.ids)
+        for attempt in range(attempts):
+            if near and attempt < 20 and self.rng.random() < 0.7:
+                position = min(count - 1, max(0, self.cursor + self.rng.randint(-3, 3)))
+            else:
+                position = self.rng.randrange(count)
+            if self.model.kinds[position] in kinds:
+                self.cursor = position
+                return position
+        return None
+
+    def begin_group(self):
+        self.group += 1
+        self.redo_stack.clear()
+        return self.group
+
+    # Episodes -----------------------------------------------------------
+
+    def typing(self):
+        position = self.pick(TEXT_KINDS)
+        if position is None:
+            return
+        model = self.model
+        id_ = model.ids[position]
+        group = self.begin_group()
+        offset = self.rng.randint(0, model.text[id_])
+        inverse = []
+        for _ in range(self.rng.randint(3, 40)):
+            if self.full:
+                break
+            if offset and self.rng.random() < 0.12:
+                offset -= 1
+                model.text[id_] -= 1
+                self.emit('delete_text', timeline='replace_block', group=group, block=position, id=id_, offset=offset, length=1)
+                inverse.append(('text', id_, 1))
+            else:
+                char = self.text(1)
+                self.emit('insert_text', timeline='insert_text', group=group, block=position, id=id_, offset=offset, text=char)
+                offset += 1
+                model.text[id_] += 1
+                inverse.append(('text', id_, -1))
+            self.tick(60, 250)
+        self.undo_stack.append((group, inverse))
+
+    def insert_block(self):
+        model = self.model
+        anchor = self.pick(TEXT_KINDS)
+        if anchor is None:
+            return
+        position = anchor + 1
+        id_ = model.new_id()
+        group = self.begin_group()
+        anchor_id = model.ids[anchor]
+        text = self.text(self.rng.randint(5, 120))
+        if model.kinds[anchor] == LIST:
+            # Enter inside a list continues it at the same level.
+            model.insert(position, id_, LIST, len(text))
+            model.list_level[id_] = model.list_level[anchor_id]
+            model.num_id[id_] = model.num_id[anchor_id]
+            self.emit('insert_block', timeline='replace_block', group=group, block=position, id=id_, kind='list', num_id=model.num_id[id_], ilvl=model.list_level[id_], text=text)
+        else:
+            model.insert(position, id_, PARAGRAPH, len(text))
+            self.emit('insert_block', timeline='replace_block', group=group, block=position, id=id_, kind='paragraph', text=text)
+        self.cursor = position
+        self.undo_stack.append((group, [('remove', position)]))
+
+    def delete_block(self):
+        model = self.model
+        if len(model.ids) < 2:
+            return
+        position = self.pick(TEXT_KINDS + (TABLE,))
+        if position is None:
+            return
+        group = self.begin_group()
+        kind = model.kinds[position]
+        id_, _ = model.remove(position)
+        self.emit('delete_block', timeline='delete_block', group=group, block=position, id=id_, kind=KINDS[kind])
+        self.cursor = min(position, len(model.ids) - 1)
+        self.undo_stack.append((group, [('insert', position, id_, kind)]))
+
+    def list_level(self):
+        position = self.pick((LIST,))
+        if position is None:
+            return
+        model = self.model
+        id_ = model.ids[position]
+        before = model.list_level[id_]
+        after = before + 1 if before == 0 or (before < 2 and self.rng.random() < 0.5) else before - 1
+        group = self.begin_group()
+        model.list_level[id_] = after
+        self.emit('set_list_level', timeline='replace_block', group=group, block=position, id=id_, num_id=model.num_id[id_], before=before, after=after)
+        self.undo_stack.append((group, [('level', id_, before)]))
+
+    def cell_edit(self):
+        position = self.pick((TABLE,))
+        if position is None:
+            return
+        model = self.model
+        id_ = model.ids[position]
+        rows, cols = model.table_shape[id_]
+        group = self.begin_group()
+        for _ in range(self.rng.randint(1, 6)):
+            if self.full:
+                break
+            row = self.rng.randrange(max(1, rows))
+            col = self.rng.randrange(max(1, cols))
+            self.emit('edit_cell', timeline='replace_block', group=group, block=position, id=id_, row=row, col=col, text=self.text(self.rng.randint(1, 40)))
+            self.tick(400, 3000)
+        # Cell text is not part of the model, so undo only has to re-address the block.
+        self.undo_stack.append((group, []))
+
+    def undo_storm(self):
+        undos = self.rng.randint(5, 60)
+        undone = 0
+        for _ in range(undos):
+            if not self.undo_stack or self.full:
+                break
+            group, inverse = self.undo_stack.pop()
+            redo = self.revert(inverse)
+            self.redo_stack.append((group, redo, inverse))
+            self.emit('undo', timeline='replace_block', group=group)
+            self.tick(30, 120)
+            undone += 1
+        for _ in range(self.rng.randint(0, undone)):
+            if self.full:
+                break
+            group, redo, inverse = self.redo_stack.pop()
+            self.revert(redo)
+            self.undo_stack.append((group, inverse))
+            self.emit('redo', timeline='replace_block', group=group)
+            self.tick(30, 120)
+
+    def revert(self, actions):
+        # Applies inverse actions newest-first and returns the actions that undo them.
+        model = self.model
+        redo = []
+        for action in reversed(actions):
+            if action[0] == 'text':
+                _, id_, delta = action
+                model.text[id_] += delta
+                redo.append(('text', id_, -delta))
+            elif action[0] == 'remove':
+                position = action[1]
+                kind = model.kinds[position]
+                id_, _ = model.remove(position)
+                redo.append(('insert', position, id_, kind))
+            elif action[0] == 'insert':
+                _, position, id_, kind = action
+                model.ids.insert(position, id_)
+                model.kinds.insert(position, kind)
+                redo.append(('remove', position))
+            elif action[0] == 'level':
+                _, id_, level = action
+                redo.append(('level', id_, model.list_level[id_]))
+                model.list_level[id_] = level
+        redo.reverse()
+        return redo
+
+def generate_trace(columns, profile: str, edits: int, seed: int):
+    rng = random.Random(f'{profile}:{seed}')
+    model = DocumentModel(columns)
+    writer = TraceWriter(rng, model, edits)
+    weights = PROFILES[profile]
+    episodes = list(weights)
+    episode_weights = [weights[name] for name in episodes]
+    while not writer.full:
+        getattr(writer, rng.choices(episodes, episode_weights)[0])()
+        # Think time between episodes.
+        writer.tick(500, 15000)
+    return writer.records, model
+
+def trace_path(docx: Path, profile: str):
+    return docx.with_suffix(f'.edits-{profile}.jsonl')
+
+def write_trace(docx: Path, profile: str, edits: int, seed: int):
+    oracle = load_oracle(docx)
+    records, model = generate_trace(oracle['blocks'], profile, edits, seed)
+    target = trace_path(docx, profile)
+    ops = {}
+    for record in records:
+        ops[record['op']] = ops.get(record['op'], 0) + 1
+    meta = {
+        'op': 'meta',
+        'document': docx.name,
+        'profile': profile,
+        'seed': seed,
+        'edits': len(records),
+        'initial_blocks': len(oracle['blocks']['kind']),
+        'final_blocks': len(model.ids),
+        'duration_ms': records[-1]['t'] if records else 0,
+        'ops': ops,
+    }
+    with open(target, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(meta, ensure_ascii=False) + '\n')
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return target, meta
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate deterministic JSONL edit traces for generated DOCX fixtures.')
+    parser.add_argument('documents', nargs='+', type=Path, help='generated .docx files with a .oracle.json sidecar')
+    parser.add_argument('--profile', dest='profiles', action='append', choices=list(PROFILES), help='edit mix; repeatable (default: mixed)')
+    parser.add_argument('--edits', type=int, default=10000, help='edit records per trace (default: 10000)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for docx in args.documents:
+        for profile in args.profiles or ['mixed']:
+            target, meta = write_trace(docx, profile, args.edits, args.seed)
+            print(str(target))
+            print(f"{meta['edits']} edits over {meta['duration_ms'] / 3_600_000:.2f}h simulated, blocks {meta['initial_blocks']} -> {meta['final_blocks']}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+from pathlib import Path
+import argparse
+import sys
+import time
+
+from scripts_docx_builder import (
+    BUILDER_SOURCE,
+    DOCUMENT_HEAD,
+    DOCUMENT_TAIL,
+    STRESS_NUMBERING,
+    STRESS_STYLES,
+    FRAGMENTS,
+    build_cache_for,
+    content_types_xml,
+    doc_rels_xml,
+    extent_for,
+    input_fingerprint,
+    iter_encoded_chunks,
+    write_docx,
+)
+from scripts_docx_oracle import ORACLE_SOURCE, Oracle, fragments_for, oracle_path
+import scripts_docx_media as media
+
+out_dir = Path('assets/test-docs/media')
+
+def media_plan(images: int, mode: str, kind: str):
+    # Returns the relationship for each image reference and the distinct media parts.
+    ext = 'png' if kind == 'png' else 'jpeg'
+    if mode == 'shared':
+        parts = [('rId3', f'media/image-shared.{ext}', 0)]
+        references = ['rId3'] * images
+    else:
+        parts = [(f'rId{i + 3}', f'media/image-{i + 1}.{ext}', i) for i in range(images)]
+        references = [rid for rid, _, _ in parts]
+    return references, parts
+
+def iter_document_chunks(references, extent, fx=FRAGMENTS):
+    yield DOCUMENT_HEAD
+    yield fx.heading(1, '图片负载测试文档')
+    for index, rid in enumerate(references, start=1):
+        yield '\n'
+        yield fx.p(f'图片 {index}（{rid}）：')
+        yield '\n'
+        yield fx.image_paragraph(rid, 3000 + index, *extent)
+    yield DOCUMENT_TAIL
+
+def iter_media(parts, kind: str, width: int, height: int, seed: int, density: float):
+    # Payloads are produced one at a time so only one image is held in memory.
+    for _, target, index in parts:
+        yield 'word/' + target, media.synthetic_image(kind, width, height, seed + index, density)
+
+def build_media_docx(target: Path, images: int, mode: str, kind: str, width: int, height: int, seed=0, density=0.5):
+    references, parts = media_plan(images, mode, kind)
+    oracle = Oracle()
+    media_bytes = 0
+
+    def counted(items):
+        nonlocal media_bytes
+        for name, payload in items:
+            media_bytes += len(payload)
+            yield name, payload
+
+    write_docx(
+        target,
+        iter_encoded_chunks(iter_document_chunks(references, extent_for(width, height), fragments_for(oracle))),
+        STRESS_STYLES,
+        STRESS_NUMBERING,
+        doc_rels=doc_rels_xml((rid, name) for rid, name, _ in parts),
+        media=counted(iter_media(parts, kind, width, height, seed, density)),
+        content_types=content_types_xml(('png' if kind == 'png' else 'jpeg',)),
+    )
+    oracle.write(target)
+    return {'references': len(references), 'media_parts': len(parts), 'media_bytes': media_bytes, 'archive_bytes': target.stat().st_size}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate image-heavy DOCX documents with synthetic PNG/JPEG payloads.')
+    parser.add_argument('--images', type=int, default=20, help='number of image references in the document')
+    parser.add_argument('--mode', choices=('shared', 'unique'), default='unique', help='shared: every reference uses one media part; unique: one part per reference')
+    parser.add_argument('--format', dest='kind', choices=('png', 'jpeg'), default='jpeg')
+    parser.add_argument('--width', type=int, default=1600)
+    parser.add_argument('--height', type=int, default=1200)
+    parser.add_argument('--megabytes', type=float, help='approximate payload size per image; overrides --width/--height')
+    parser.add_argument('--density', type=float, default=0.5, help='JPEG detail: fraction of AC coefficients that are non-zero (default: 0.5)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', type=Path)
+    parser.add_argument('--force', action='store_true', help='rebuild even if the inputs fingerprint matches the build cache')
+    args = parser.parse_args(argv)
+
+    if args.megabytes:
+        args.width, args.height = media.dimensions_for_bytes(args.kind, int(args.megabytes * 1_000_000), args.density)
+    target = args.out or out_dir / f'word-media-{args.mode}-{args.kind}-{args.images}x{args.width}x{args.height}.docx'
+    target.parent.mkdir(parents=True, exist_ok=True)
+
+    params = {key: getattr(args, key) for key in ('images', 'mode', 'kind', 'width', 'height', 'density', 'seed')}
+    key = input_fingerprint('media', params, (BUILDER_SOURCE, ORACLE_SOURCE, Path(media.__file__), Path(__file__)))
+    cache = build_cache_for(target.parent)
+    if not args.force and cache.lookup(target, key, (oracle_path(target),)):
+        print(str(target))
+        print('up to date', file=sys.stderr)
+        return
+
+    started = time.perf_counter()
+    summary = build_media_docx(target, args.images, args.mode, args.kind, args.width, args.height, args.seed, args.density)
+    cache.store(target, key, summary)
+    cache.save()
+    print(str(target))
+    print(f"{summary['references']} references, {summary['media_parts']} media parts, {summary['media_bytes']} media bytes, archive {summary['archive_bytes']} bytes, {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
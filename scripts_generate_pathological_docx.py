@@ -0,0 +1,151 @@
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+
+from scripts_docx_builder import (
+    BUILDER_SOURCE,
+    DOCUMENT_HEAD,
+    DOCUMENT_TAIL,
+    STRESS_NUMBERING,
+    STRESS_STYLES,
+    FragmentStats,
+    build_cache_for,
+    content_types_xml,
+    doc_rels_xml,
+    input_fingerprint,
+    iter_encoded_chunks,
+    numbering_xml,
+    write_docx,
+)
+from scripts_docx_oracle import ORACLE_SOURCE, Oracle, fragments_for, oracle_path
+
+out_dir = Path('assets/test-docs/pathological')
+
+# Each profile pushes a single dimension to an extreme; `scale` multiplies the
+# default size of that dimension. Profiles take the fragment namespace and
+# return (body parts, numbering.xml).
+
+def long_runs(scale: int, fx):
+    # One paragraph holding run_mix's 15 runs repeated, ~15k * scale runs in total.
+    def parts():
+        yield fx.heading(1, '病态结构：单段超长 run 序列')
+        yield fx.run_mix_paragraph(range(1000 * scale))
+    return parts(), STRESS_NUMBERING
+
+def nested_tables(scale: int, fx):
+    def parts():
+        yield fx.heading(1, '病态结构：深度嵌套表格')
+        yield fx.nested_table(32 * scale)
+        yield fx.p('嵌套表格之后的段落。')
+    return parts(), STRESS_NUMBERING
+
+def numbering_flood(scale: int, fx):
+    count = 500 * scale
+    def parts():
+        yield fx.heading(1, '病态结构：大量 abstractNum 定义')
+        for num_id in range(1, count + 1):
+            yield fx.list_p(num_id, (num_id - 1) % 3, f'编号定义 {num_id}')
+    return parts(), numbering_xml(count)
+
+def cjk_unbroken(scale: int, fx):
+    # No spaces or punctuation, so the whole line has no break opportunity except between ideographs.
+    # 20k characters per scale step.
+    unit = '汉字排版无断行压力测试'
+    chars = 20000 * scale
+    line = (unit * (chars // len(unit) + 1))[:chars]
+    def parts():
+        yield fx.heading(1, '病态结构：超长无断行中文')
+        yield fx.p(line)
+        yield fx.p(line, keep_lines=True)
+    return parts(), STRESS_NUMBERING
+
+def keep_next_chain(scale: int, fx):
+    # A chain far longer than a page: every paragraph asks to stay with the next one.
+    def parts():
+        yield fx.heading(1, '病态结构：无法满足的 keepNext 链')
+        for i in range(1, 5000 * scale + 1):
+            yield fx.p(f'keepNext 链段落 {i}：本段要求与下一段同页。', keep_next=True, keep_lines=(i % 2 == 0))
+        yield fx.p('链尾段落。')
+    return parts(), STRESS_NUMBERING
+
+PROFILES = {
+    'long-runs': long_runs,
+    'nested-tables': nested_tables,
+    'numbering-flood': numbering_flood,
+    'cjk-unbroken': cjk_unbroken,
+    'keep-next-chain': keep_next_chain,
+}
+
+def iter_document_chunks(parts, stats):
+    yield DOCUMENT_HEAD
+    for index, part in enumerate(parts):
+        if index:
+            yield '\n'
+        stats.add(part)
+        yield part
+    yield DOCUMENT_TAIL
+
+def fingerprint(profile: str, scale: int):
+    return input_fingerprint('pathological', {'profile': profile, 'scale': scale}, (BUILDER_SOURCE, ORACLE_SOURCE, Path(__file__)))
+
+def build_profile(profile: str, scale: int, target: Path):
+    oracle = Oracle()
+    parts, numbering = PROFILES[profile](scale, fragments_for(oracle))
+    stats = FragmentStats()
+    # No profile draws images, so the package carries no media parts.
+    written = write_docx(
+        target,
+        iter_encoded_chunks(iter_document_chunks(parts, stats)),
+        STRESS_STYLES,
+        numbering,
+        doc_rels=doc_rels_xml(()),
+        media=(),
+        content_types=content_types_xml(()),
+    )
+    oracle.write(target)
+    return {
+        'file': target.name,
+        'oracle': oracle_path(target).name,
+        'profile': profile,
+        'scale': scale,
+        **stats.as_dict(),
+        'abstract_nums': numbering.count('<w:abstractNum '),
+        'document_xml_bytes': written,
+        'archive_bytes': target.stat().st_size,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate adversarial DOCX documents that stress one structural dimension each.')
+    parser.add_argument('--profile', dest='profiles', action='append', choices=list(PROFILES), help='profile to build; repeatable (default: all)')
+    parser.add_argument('--scale', type=int, default=1, help='multiplier for the stressed dimension (default: 1)')
+    parser.add_argument('--out-dir', type=Path, default=out_dir)
+    parser.add_argument('--force', action='store_true', help='rebuild even if the inputs fingerprint matches the build cache')
+    args = parser.parse_args(argv)
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    cache = build_cache_for(args.out_dir)
+    documents = []
+    for profile in args.profiles or PROFILES:
+        target = args.out_dir / f'{profile}-x{args.scale}.docx'
+        key = fingerprint(profile, args.scale)
+        cached = None if args.force else cache.lookup(target, key, (oracle_path(target),))
+        if cached:
+            documents.append(cached['summary'])
+            print(str(target))
+            continue
+        started = time.perf_counter()
+        summary = build_profile(profile, args.scale, target)
+        print(f'{profile}: {summary["document_xml_bytes"]} bytes, {time.perf_counter() - started:.2f}s', file=sys.stderr)
+        cache.store(target, key, summary)
+        documents.append(summary)
+        print(str(target))
+    cache.save()
+
+    manifest = args.out_dir / 'manifest.json'
+    manifest.write_text(json.dumps({'generator': 'pathological', 'documents': documents}, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    print(str(manifest))
+
+if __name__ == '__main__':
+    main()
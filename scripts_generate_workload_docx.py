@@ -0,0 +1,356 @@
+from collections import Counter
+from pathlib import Path
+import argparse
+import json
+import random
+import sys
+import time
+
+from scripts_docx_builder import (
+    BUILDER_SOURCE,
+    CJK,
+    DOCUMENT_HEAD,
+    DOCUMENT_TAIL,
+    LATIN,
+    STRESS_STYLES,
+    FRAGMENTS,
+    FragmentStats,
+    build_cache_for,
+    content_types_xml,
+    doc_rels_xml,
+    extent_for,
+    input_fingerprint,
+    iter_encoded_chunks,
+    numbering_xml,
+    write_docx,
+)
+from scripts_docx_oracle import KINDS, ORACLE_SOURCE, Oracle, fragments_for, oracle_path
+import scripts_docx_media as media
+
+# Seeded documents whose block mix is drawn from a declarative workload
+# profile instead of the stress generator's fixed section loop. Every block is
+# emitted through the FRAGMENTS helpers, so the oracle sidecar records the mix
+# that was actually produced. The random stream is seeded from the profile
+# name and seed, and each block consumes it in document order: a given
+# profile, seed and block count always yields the same bytes, and a larger
+# block count extends the same document.
+
+out_dir = Path('assets/test-docs/workload')
+
+# numbering_xml(4) maps numId 1..4 to decimal, lowerLetter, lowerRoman and
+# bullet lists; Word allows nine levels (ilvl 0..8).
+LIST_FORMATS = 4
+LIST_LEVELS = 9
+
+# `(lo, hi)` pairs are inclusive uniform ranges; dicts are weights over the
+# keys. `blocks` weighs each draw, and a `list` draw emits `list_items` items,
+# so list items outnumber their weight in the result. `list_depth` is the
+# number of levels a list may reach and `list_descend` the chance that the
+# next item goes one level deeper. `run_groups` is the number of run_mix run
+# groups (14 runs each) per mixed paragraph and `cjk` the share of text pieces
+# drawn from CJK rather than Latin words. Keep flags are per-paragraph
+# probabilities. Profiles only name the fields they change from DEFAULT_PROFILE.
+DEFAULT_PROFILE = {
+    'blocks': {'paragraph': 50, 'heading': 10, 'list': 6, 'mixed': 5, 'aligned': 1, 'table': 8, 'image': 6},
+    'heading_levels': {1: 1, 2: 3, 3: 6},
+    'paragraph_chars': (80, 400),
+    'cjk': 0.7,
+    'run_groups': (1, 2),
+    'list_items': (3, 8),
+    'list_depth': {1: 2, 2: 3, 3: 2},
+    'list_descend': 0.35,
+    'list_num_ids': {1: 3, 4: 2},
+    'table_rows': (2, 8),
+    'table_cols': (2, 5),
+    'table_depth': {1: 1},
+    'media_parts': 3,
+    'media_format': 'png',
+    'image_sizes': ((320, 240), (640, 480), (1024, 768)),
+    'keep_next': 0.05,
+    'keep_lines': 0.1,
+    'page_break': 0.01,
+}
+
+PROFILES = {
+    # Long clauses under deep multi-level numbering.
+    'contract': {
+        'blocks': {'paragraph': 55, 'heading': 8, 'list': 6, 'mixed': 3, 'aligned': 3, 'table': 2, 'image': 1},
+        'paragraph_chars': (300, 1500),
+        'cjk': 0.85,
+        'list_items': (6, 20),
+        'list_depth': {3: 2, 5: 3, 7: 3, 9: 2},
+        'list_descend': 0.55,
+        'list_num_ids': {1: 6, 2: 1, 3: 2, 4: 1},
+        'table_rows': (2, 5),
+        'table_cols': (2, 3),
+        'keep_next': 0.08,
+        'keep_lines': 0.35,
+        'page_break': 0.005,
+    },
+    # Data tables with short commentary; some tables nest a second level.
+    'report': {
+        'blocks': {'paragraph': 30, 'heading': 14, 'list': 8, 'mixed': 8, 'aligned': 1, 'table': 30, 'image': 9},
+        'paragraph_chars': (60, 360),
+        'cjk': 0.6,
+        'table_rows': (4, 40),
+        'table_cols': (3, 10),
+        'table_depth': {1: 9, 2: 1},
+        'keep_next': 0.2,
+        'keep_lines': 0.05,
+        'page_break': 0.02,
+    },
+    # Large images between short, heavily styled copy.
+    'brochure': {
+        'blocks': {'paragraph': 28, 'heading': 16, 'list': 6, 'mixed': 15, 'aligned': 2, 'table': 3, 'image': 30},
+        'heading_levels': {1: 2, 2: 4, 3: 3},
+        'paragraph_chars': (20, 180),
+        'cjk': 0.5,
+        'run_groups': (1, 4),
+        'list_items': (2, 5),
+        'list_depth': {1: 3, 2: 1},
+        'list_num_ids': {4: 1},
+        'media_parts': 12,
+        'media_format': 'jpeg',
+        'image_sizes': ((800, 600), (1280, 720), (1200, 1200), (1600, 1200), (2400, 1600)),
+        'keep_next': 0.1,
+        'page_break': 0.06,
+    },
+    # Long runs of CJK text with little structure.
+    'cjk-dense': {
+        'blocks': {'paragraph': 72, 'heading': 8, 'list': 3, 'mixed': 6, 'aligned': 1, 'table': 3},
+        'paragraph_chars': (400, 2400),
+        'cjk': 1.0,
+        'list_items': (3, 10),
+        'keep_lines': 0.15,
+    },
+}
+
+BLOCK_TYPES = ('paragraph', 'heading', 'list', 'mixed', 'aligned', 'table', 'image')
+# Distribution fields whose keys are integers (JSON profiles spell them as strings).
+INTEGER_KEYS = ('heading_levels', 'list_depth', 'list_num_ids', 'table_depth')
+RANGE_FIELDS = ('paragraph_chars', 'run_groups', 'list_items', 'table_rows', 'table_cols')
+
+def resolve_profile(overrides: dict):
+    unknown = set(overrides) - set(DEFAULT_PROFILE)
+    if unknown:
+        raise ValueError(f'unknown profile fields: {", ".join(sorted(unknown))}')
+    spec = {**DEFAULT_PROFILE, **overrides}
+    for field in INTEGER_KEYS:
+        spec[field] = {int(key): weight for key, weight in spec[field].items()}
+    unknown = set(spec['blocks']) - set(BLOCK_TYPES)
+    if unknown:
+        raise ValueError(f'unknown block types: {", ".join(sorted(unknown))}')
+    if not set(spec['heading_levels']) <= {1, 2, 3}:
+        raise ValueError('heading_levels must be 1..3 (STRESS_STYLES defines Heading1-3)')
+    if not set(spec['list_depth']) <= set(range(1, LIST_LEVELS + 1)):
+        raise ValueError(f'list_depth must be 1..{LIST_LEVELS}')
+    if not set(spec['list_num_ids']) <= set(range(1, LIST_FORMATS + 1)):
+        raise ValueError(f'list_num_ids must be 1..{LIST_FORMATS}')
+    if spec['media_format'] not in ('png', 'jpeg'):
+        raise ValueError(f"unsupported media_format {spec['media_format']!r}")
+    # Media parts are only written when the profile can draw image blocks.
+    if not spec['blocks'].get('image'):
+        spec['media_parts'] = 0
+    elif spec['media_parts'] < 1:
+        raise ValueError('profiles that draw images need media_parts >= 1')
+    # Lists, not tuples, so built-in and JSON profiles fingerprint alike.
+    for field in RANGE_FIELDS:
+        spec[field] = list(spec[field])
+    spec['image_sizes'] = [list(size) for size in spec['image_sizes']]
+    return spec
+
+def load_profiles(path):
+    profiles = dict(PROFILES)
+    if path is not None:
+        profiles.update(json.loads(Path(path).read_text(encoding='utf-8')))
+    return profiles
+
+class WorkloadWriter:
+    # Draws blocks from `spec` until `blocks` body-level blocks are emitted.
+
+    def __init__(self, rng: random.Random, spec: dict, fx=FRAGMENTS):
+        self.rng = rng
+        self.spec = spec
+        self.fx = fx
+        self.images = 0
+
+    def weighted(self, field: str):
+        weights = self.spec[field]
+        return self.rng.choices(list(weights), list(weights.values()))[0]
+
+    def between(self, field: str):
+        lo, hi = self.spec[field]
+        return self.rng.randint(lo, hi)
+
+    def text(self, chars: int):
+        rng = self.rng
+        pieces = []
+        size = 0
+        while size < chars:
+            if rng.random() < self.spec['cjk']:
+                piece = ''.join(rng.choices(CJK, k=rng.randint(4, 18))) + rng.choice('，，，。；、')
+            else:
+                piece = ''.join(rng.choices(LATIN, k=rng.randint(2, 10))) + rng.choice('     ,.')
+            pieces.append(piece)
+            size += len(piece)
+        return ''.join(pieces)[:chars]
+
+    def emit_paragraph(self, index: int, remaining: int):
+        spec = self.spec
+        yield self.fx.p(
+            self.text(self.between('paragraph_chars')),
+            keep_next=self.rng.random() < spec['keep_next'],
+            keep_lines=self.rng.random() < spec['keep_lines'],
+            page_break=self.rng.random() < spec['page_break'],
+        )
+
+    def emit_heading(self, index: int, remaining: int):
+        level = self.weighted('heading_levels')
+        yield self.fx.heading(level, f'{index} ' + self.text(self.rng.randint(6, 24)))
+
+    def emit_list(self, index: int, remaining: int):
+        # Items walk the levels like hand-edited outlines: one level deeper,
+        # back out to any shallower level (one item in four), or stay.
+        num_id = self.weighted('list_num_ids')
+        top = self.weighted('list_depth') - 1
+        level = 0
+        for _ in range(min(self.between('list_items'), remaining)):
+            yield self.fx.list_p(num_id, level, self.text(self.between('paragraph_chars') // 4 + 4))
+            roll = self.rng.random()
+            descend = self.spec['list_descend']
+            if roll < descend and level < top:
+                level += 1
+            elif roll < descend + 0.25 and level:
+                level = self.rng.randint(0, level - 1)
+
+    def emit_mixed(self, index: int, remaining: int):
+        yield self.fx.run_mix_paragraph(range(index, index + self.between('run_groups')))
+
+    def emit_aligned(self, index: int, remaining: int):
+        yield self.fx.p_aligned(self.text(self.rng.randint(8, 30)), self.rng.choice(('right', 'center')))
+
+    def emit_table(self, index: int, remaining: int):
+        rows = self.between('table_rows')
+        cols = self.between('table_cols')
+        depth = self.weighted('table_depth')
+        yield self.fx.table_block(rows, cols) if depth == 1 else self.fx.nested_table(depth, rows, cols)
+
+    def emit_image(self, index: int, remaining: int):
+        part = self.rng.randrange(self.spec['media_parts'])
+        width, height = self.spec['image_sizes'][part % len(self.spec['image_sizes'])]
+        self.images += 1
+        yield self.fx.image_paragraph(f'rId{part + 3}', 4000 + self.images, *extent_for(width, height))
+
+    def iter_blocks(self, title: str, blocks: int):
+        yield self.fx.heading(1, title)
+        emitted = 1
+        kinds = self.spec['blocks']
+        names = list(kinds)
+        weights = list(kinds.values())
+        while emitted < blocks:
+            kind = self.rng.choices(names, weights)[0]
+            for part in getattr(self, 'emit_' + kind)(emitted, blocks - emitted):
+                emitted += 1
+                yield part
+
+def iter_document_chunks(writer: WorkloadWriter, title: str, blocks: int, stats=None):
+    yield DOCUMENT_HEAD
+    for index, part in enumerate(writer.iter_blocks(title, blocks)):
+        if index:
+            yield '\n'
+        if stats is not None:
+            stats.add(part)
+        yield part
+    yield DOCUMENT_TAIL
+
+def media_parts(spec: dict):
+    ext = spec['media_format']
+    return [(f'rId{i + 3}', f'media/image-{i + 1}.{ext}') for i in range(spec['media_parts'])]
+
+def iter_media(spec: dict, seed: int):
+    # Part i always has the i-th size, so extents in document.xml match the payloads.
+    for index, (_, target) in enumerate(media_parts(spec)):
+        width, height = spec['image_sizes'][index % len(spec['image_sizes'])]
+        yield 'word/' + target, media.synthetic_image(spec['media_format'], width, height, seed + index)
+
+def build_workload_docx(target: Path, name: str, spec: dict, blocks: int, seed=0):
+    stats = FragmentStats()
+    oracle = Oracle()
+    writer = WorkloadWriter(random.Random(f'{name}:{seed}'), spec, fragments_for(oracle))
+    media_bytes = 0
+
+    def counted(items):
+        nonlocal media_bytes
+        for part, payload in items:
+            media_bytes += len(payload)
+            yield part, payload
+
+    written = write_docx(
+        target,
+        iter_encoded_chunks(iter_document_chunks(writer, f'{name} 工作负载文档（种子 {seed}）', blocks, stats)),
+        STRESS_STYLES,
+        numbering_xml(LIST_FORMATS, LIST_LEVELS),
+        doc_rels=doc_rels_xml(media_parts(spec)),
+        media=counted(iter_media(spec, seed)),
+        content_types=content_types_xml((spec['media_format'],) if spec['media_parts'] else ()),
+    )
+    oracle.write(target)
+    kinds = Counter(oracle.column('kind'))
+    return {
+        'file': target.name,
+        'oracle': oracle_path(target).name,
+        'profile': name,
+        'seed': seed,
+        'mix': {kind: kinds[index] for index, kind in enumerate(KINDS)},
+        **stats.as_dict(),
+        'document_xml_bytes': written,
+        'media_bytes': media_bytes,
+        'archive_bytes': target.stat().st_size,
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate seeded DOCX documents whose block mix follows a workload profile.')
+    parser.add_argument('--profile', dest='profiles', action='append', help=f'workload profile; repeatable (default: all of {", ".join(PROFILES)})')
+    parser.add_argument('--profile-file', type=Path, help='JSON object of extra or replacement profiles; each names only the fields it changes from the defaults')
+    parser.add_argument('--blocks', type=int, default=2000, help='body-level blocks per document (default: 2000)')
+    parser.add_argument('--seed', dest='seeds', action='append', type=int, help='repeatable (default: 0)')
+    parser.add_argument('--out-dir', type=Path, default=out_dir)
+    parser.add_argument('--force', action='store_true', help='rebuild even if the inputs fingerprint matches the build cache')
+    args = parser.parse_args(argv)
+
+    profiles = load_profiles(args.profile_file)
+    names = args.profiles or list(profiles)
+    for name in names:
+        if name not in profiles:
+            parser.error(f'unknown profile {name!r} (known: {", ".join(profiles)})')
+    specs = {name: resolve_profile(profiles[name]) for name in names}
+
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+    cache = build_cache_for(args.out_dir)
+    documents = []
+    for name in names:
+        for seed in args.seeds or [0]:
+            target = args.out_dir / f'word-workload-{name}-{args.blocks}-s{seed}.docx'
+            params = {'profile': name, 'spec': specs[name], 'blocks': args.blocks, 'seed': seed}
+            key = input_fingerprint('workload', params, (BUILDER_SOURCE, ORACLE_SOURCE, Path(media.__file__), Path(__file__)))
+            cached = None if args.force else cache.lookup(target, key, (oracle_path(target),))
+            if cached:
+                documents.append(cached['summary'])
+                print(str(target))
+                print('up to date', file=sys.stderr)
+                continue
+            started = time.perf_counter()
+            summary = build_workload_docx(target, name, specs[name], args.blocks, seed)
+            summary['build_seconds'] = round(time.perf_counter() - started, 3)
+            cache.store(target, key, summary)
+            documents.append(summary)
+            print(str(target))
+            mix = ', '.join(f'{kind} {count}' for kind, count in summary['mix'].items() if count)
+            print(f"{mix}; document.xml {summary['document_xml_bytes']} bytes, archive {summary['archive_bytes']} bytes, {summary['build_seconds']:.2f}s", file=sys.stderr)
+    cache.save()
+    manifest = args.out_dir / 'manifest.json'
+    manifest.write_text(json.dumps({'generator': 'workload', 'documents': documents}, ensure_ascii=False, indent=2) + '\n', encoding='utf-8')
+    print(str(manifest))
+
+if __name__ == '__main__':
+    main()
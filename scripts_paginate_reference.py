@@ -0,0 +1,296 @@
+from bisect import bisect_right
+from pathlib import Path
+from zipfile import ZipFile
+import argparse
+import json
+import re
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the local environment
+    raise SystemExit('numpy is required for the reference paginator: pip install numpy')
+
+from scripts_docx_oracle import HEADING, IMAGE, KEEP_LINES, KEEP_NEXT, LIST, PAGE_BREAK_BEFORE, TABLE, load_oracle
+
+# Reference paginator for generated documents. Block metadata comes from the
+# `<name>.oracle.json` sidecar; page geometry (pgSz/pgMar/docGrid) and line
+# metrics (docDefaults sz/spacing, heading sizes, list indents) are read from
+# the archive itself. Heights are computed for all blocks at once with NumPy and
+# the page walk does one searchsorted per page, not one step per block.
+#
+# The text model is deliberately simple and documented so the TS engine can be
+# fed the same heights (`block_height_px`) for differential tests:
+# - a line is font size * LINE_HEIGHT_EM, scaled by spacing line/240 for
+#   lineRule="auto" and rounded up to the docGrid linePitch;
+# - every character is `char_width_em` wide (1.0 = full-width CJK);
+# - table rows hold their cells' share of text in one paragraph each;
+# - inline images are their extent, scaled down to the content width.
+
+LINE_HEIGHT_EM = 1.2
+TWIPS_PER_PX = 15  # 96 dpi
+EMU_PER_TWIP = 635
+DEFAULT_CELL_MARGIN = 108  # Word's default left/right cell margin, in twips
+
+def _attr(xml: str, element: str, name: str, default=None):
+    match = re.search(rf'<w:{element}\b[^>]*\bw:{name}="([^"]*)"', xml)
+    return match.group(1) if match else default
+
+def read_tail(archive: ZipFile, name: str, size=1 << 16):
+    # The body-level sectPr sits at the end of document.xml; inflate in chunks
+    # and keep only the tail.
+    tail = b''
+    with archive.open(name) as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            tail = (tail + chunk)[-size:]
+    return tail.decode('utf-8', 'ignore')
+
+def read_layout(docx: Path):
+    with ZipFile(docx) as z:
+        sect = read_tail(z, 'word/document.xml')
+        sect = sect[sect.rfind('<w:sectPr'):]
+        styles = z.read('word/styles.xml').decode('utf-8')
+        names = set(z.namelist())
+        numbering = z.read('word/numbering.xml').decode('utf-8') if 'word/numbering.xml' in names else ''
+
+    defaults = styles.split('</w:docDefaults>')[0]
+    body_sz = int(_attr(defaults, 'sz', 'val', 22))
+    heading_sz = {}
+    for level, body in re.findall(r'<w:style\b[^>]*w:styleId="Heading(\d)"[^>]*>(.*?)</w:style>', styles, re.S):
+        heading_sz[int(level)] = int(_attr(body, 'sz', 'val', body_sz))
+
+    # numId -> abstractNumId -> per-level left indent.
+    abstract_ind = {}
+    for abstract_id, body in re.findall(r'<w:abstractNum\b[^>]*w:abstractNumId="(\d+)"[^>]*>(.*?)</w:abstractNum>', numbering, re.S):
+        abstract_ind[int(abstract_id)] = {int(ilvl): int(_attr(lvl, 'ind', 'left', 0)) for ilvl, lvl in re.findall(r'<w:lvl\b[^>]*w:ilvl="(\d+)"[^>]*>(.*?)</w:lvl>', body, re.S)}
+    list_ind = {int(num_id): abstract_ind.get(int(abstract_id), {}) for num_id, abstract_id in re.findall(r'<w:num\b[^>]*w:numId="(\d+)"[^>]*>\s*<w:abstractNumId w:val="(\d+)"', numbering)}
+
+    return {
+        'page_width': int(_attr(sect, 'pgSz', 'w', 11906)),
+        'page_height': int(_attr(sect, 'pgSz', 'h', 16838)),
+        'margin_top': int(_attr(sect, 'pgMar', 'top', 1440)),
+        'margin_bottom': int(_attr(sect, 'pgMar', 'bottom', 1440)),
+        'margin_left': int(_attr(sect, 'pgMar', 'left', 1800)),
+        'margin_right': int(_attr(sect, 'pgMar', 'right', 1800)),
+        'grid_type': _attr(sect, 'docGrid', 'type', None),
+        'line_pitch': int(_attr(sect, 'docGrid', 'linePitch', 0)),
+        'body_sz': body_sz,
+        'heading_sz': heading_sz,
+        'line': int(_attr(defaults, 'spacing', 'line', 240)),
+        'line_rule': _attr(defaults, 'spacing', 'lineRule', 'auto'),
+        'after': int(_attr(defaults, 'spacing', 'after', 0)),
+        'list_ind': list_ind,
+    }
+
+def line_height(layout, sz):
+    # `sz` is in half-points; returns twips (vectorized over arrays).
+    natural = np.asarray(sz, dtype=np.int64) * 10 * LINE_HEIGHT_EM
+    if layout['line_rule'] == 'auto':
+        height = natural * layout['line'] / 240
+    elif layout['line_rule'] == 'exact':
+        height = np.full_like(natural, layout['line'])
+    else:  # atLeast
+        height = np.maximum(natural, layout['line'])
+    height = np.ceil(height).astype(np.int64)
+    pitch = layout['line_pitch']
+    if pitch and layout['grid_type'] in ('lines', 'linesAndChars'):
+        height = -(-height // pitch) * pitch
+    return height
+
+def block_heights(columns, layout, char_width_em=1.0):
+    # Returns (height, unit, splittable) in twips. `unit` is the step a block
+    # can be split at (a line, or a table row).
+    kind = np.asarray(columns['kind'], dtype=np.int64)
+    level = np.asarray(columns['level'], dtype=np.int64)
+    text = np.asarray(columns['text_chars'], dtype=np.int64)
+    content_width = layout['page_width'] - layout['margin_left'] - layout['margin_right']
+    after = layout['after']
+
+    sz = np.full(kind.shape, layout['body_sz'], dtype=np.int64)
+    for heading_level, heading_size in layout['heading_sz'].items():
+        sz[(kind == HEADING) & (level == heading_level)] = heading_size
+    line = line_height(layout, sz)
+    char_twips = np.maximum(1, np.round(sz * 10 * char_width_em)).astype(np.int64)
+
+    width = np.full(kind.shape, content_width, dtype=np.int64)
+    is_list = kind == LIST
+    if is_list.any():
+        num_id = np.asarray(columns['num_id'], dtype=np.int64)[is_list]
+        ilvl = np.asarray(columns['ilvl'], dtype=np.int64)[is_list]
+        # Indents are looked up once per distinct (numId, ilvl) pair.
+        pairs, inverse = np.unique(num_id * 16 + ilvl, return_inverse=True)
+        indents = np.array([layout['list_ind'].get(int(pair) // 16, {}).get(int(pair) % 16, 720 * (int(pair) % 16 + 1)) for pair in pairs], dtype=np.int64)
+        width[is_list] -= indents[inverse.reshape(-1)]
+    per_line = np.maximum(1, width // char_twips)
+    lines = np.maximum(1, -(-text // per_line))
+    height = lines * line + after
+    unit = line.copy()
+
+    is_table = kind == TABLE
+    if is_table.any():
+        cols = np.maximum(1, np.asarray(columns['cols'], dtype=np.int64)[is_table])
+        cells = np.maximum(1, np.asarray(columns['cells'], dtype=np.int64)[is_table])
+        rows = -(-cells // cols)
+        cell_chars = text[is_table] // cells
+        cell_width = np.maximum(1, content_width // cols - 2 * DEFAULT_CELL_MARGIN)
+        cell_lines = np.maximum(1, -(-cell_chars // np.maximum(1, cell_width // char_twips[is_table])))
+        row = cell_lines * line[is_table] + after
+        unit[is_table] = row
+        height[is_table] = rows * row
+
+    is_image = kind == IMAGE
+    if is_image.any():
+        cx = np.maximum(1, np.asarray(columns['cx'], dtype=np.int64)[is_image]) // EMU_PER_TWIP
+        cy = np.asarray(columns['cy'], dtype=np.int64)[is_image] // EMU_PER_TWIP
+        image = np.where(cx > content_width, cy * content_width // np.maximum(1, cx), cy)
+        image = np.maximum(image, line[is_image])
+        pitch = layout['line_pitch']
+        if pitch and layout['grid_type'] in ('lines', 'linesAndChars'):
+            image = -(-image // pitch) * pitch
+        unit[is_image] = image
+        height[is_image] = image + after
+
+    flags = np.asarray(columns['flags'], dtype=np.int64)
+    splittable = (height > unit + after) & ((flags & KEEP_LINES) == 0) & ~is_image
+    splittable[is_table] = height[is_table] > unit[is_table]
+    return height, unit, splittable
+
+def paginate(height, unit, splittable, flags, capacity: int, word_rules=True):
+    # Walks pages over cumulative block extents in "flow" coordinates, where
+    # pages are consecutive intervals. Returns (page start offsets, first block
+    # per page). With word_rules=False blocks are never split and flags are
+    # ignored, which is the placement rule of paginateBlocks in
+    # lib/render/paginationEngine.ts. Only that rule is mirrored:
+    # - heights come from block_heights, not the measured `block.height`;
+    # - capacity comes from the archive's pgSz/pgMar, not A4_PAGE_METRICS
+    #   (whose 36px header/footer offsets shrink the page further);
+    # - a block taller than a page belongs to the page it starts on here, and
+    #   to the page it ends on in paginateBlocks.
+    n = len(height)
+    if n == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(1, dtype=np.int64)
+    bottom_array = np.cumsum(height)
+    index = np.arange(n)
+    keep_next = (flags & KEEP_NEXT) != 0
+    # For every block, the first block of the keepNext run that ends at it.
+    chain_start = np.maximum.accumulate(np.where(keep_next, -1, index)) + 1
+    # A break before the first block is a no-op.
+    breaks = index[1:][(flags[1:] & PAGE_BREAK_BEFORE) != 0].tolist() if word_rules else []
+    if not word_rules:
+        splittable = np.zeros(n, dtype=bool)
+
+    # The walk does a few bisections per page over a plain list, which keeps the
+    # per-page cost in C calls; other arrays are only indexed at page ends.
+    bottom = bottom_array.tolist()
+    splittable = splittable.tolist()
+    keep_next = keep_next.tolist()
+    total = bottom[-1]
+
+    # The top of block i is bottom[i - 1]; block 0 always starts the first page.
+    starts = [0]
+    pos = 0
+    next_break = 0
+    while pos + capacity < total:
+        limit = pos + capacity
+        j = bisect_right(bottom, limit)  # the block straddling the page end
+        end = bottom[j - 1] if j else 0
+        forced = False
+        # Page ends only move forward, so the forced-break cursor does too.
+        while next_break < len(breaks) and bottom[breaks[next_break] - 1] <= pos:
+            next_break += 1
+        if next_break < len(breaks) and bottom[breaks[next_break] - 1] < limit:
+            j = breaks[next_break]
+            end = bottom[j - 1]
+            forced = True
+        elif splittable[j]:
+            step = int(unit[j])
+            end += (limit - end) // step * step
+        if not forced and j and keep_next[j - 1] and word_rules and end == bottom[j - 1]:
+            c = int(chain_start[j - 1])
+            if c and bottom[c - 1] > pos:
+                end = bottom[c - 1]
+        if end <= pos:
+            # A single block taller than the page: it fills the whole page.
+            end = limit
+        starts.append(end)
+        pos = end
+    starts = np.asarray(starts, dtype=np.int64)
+    first_blocks = np.searchsorted(bottom_array, starts, side='right')
+    return starts, first_blocks
+
+def paginate_document(docx: Path, char_width_em=1.0, word_rules=True, repeat=1):
+    oracle = load_oracle(docx)
+    layout = read_layout(docx)
+    columns = oracle['blocks']
+    capacity = layout['page_height'] - layout['margin_top'] - layout['margin_bottom']
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        height, unit, splittable = block_heights(columns, layout, char_width_em)
+        flags = np.asarray(columns['flags'], dtype=np.int64)
+        starts, first_blocks = paginate(height, unit, splittable, flags, capacity, word_rules)
+    seconds = (time.perf_counter() - started) / repeat
+
+    top = np.cumsum(height) - height
+    block_page = np.searchsorted(starts, top, side='right') - 1
+    return {
+        'document': docx.name,
+        'rules': 'word' if word_rules else 'engine',
+        'char_width_em': char_width_em,
+        'geometry_twips': {key: layout[key] for key in ('page_width', 'page_height', 'margin_top', 'margin_bottom', 'margin_left', 'margin_right', 'line_pitch')},
+        'capacity_twips': capacity,
+        'blocks': len(height),
+        'pages': len(starts),
+        'paginate_seconds': round(seconds, 6),
+        'page_first_block': first_blocks.tolist(),
+        # Twips of the first block already placed on earlier pages (0 = starts clean).
+        'page_first_offset_twips': (starts - top[np.minimum(first_blocks, len(top) - 1)]).tolist() if len(top) else [0],
+        'block_page': block_page.tolist(),
+        'block_height_px': np.round(height / TWIPS_PER_PX, 2).tolist(),
+    }
+
+def pages_path(docx: Path, word_rules=True):
+    return docx.with_suffix('.pages.json' if word_rules else '.pages-engine.json')
+
+def bench(docx: Path, blocks: int, char_width_em=1.0, word_rules=True, repeat=3):
+    # Tiles the document's blocks up to `blocks` and times heights + page walk.
+    oracle = load_oracle(docx)
+    layout = read_layout(docx)
+    count = len(oracle['blocks']['kind'])
+    reps = -(-blocks // count)
+    columns = {name: np.tile(np.asarray(values, dtype=np.int64), reps)[:blocks] for name, values in oracle['blocks'].items()}
+    capacity = layout['page_height'] - layout['margin_top'] - layout['margin_bottom']
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        height, unit, splittable = block_heights(columns, layout, char_width_em)
+        starts, _ = paginate(height, unit, splittable, columns['flags'], capacity, word_rules)
+        best = min(best, time.perf_counter() - started)
+    return {'blocks': blocks, 'pages': len(starts), 'seconds': round(best, 4)}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compute expected page boundaries for generated DOCX files from their structural oracle.')
+    parser.add_argument('documents', nargs='+', type=Path, help='generated .docx files with a .oracle.json sidecar')
+    parser.add_argument('--char-width-em', type=float, default=1.0, help='average character width in em (default: 1.0, full-width CJK)')
+    parser.add_argument('--engine-rules', action='store_true', help="never split blocks and ignore keep/page-break flags (paginateBlocks' placement rule; heights and page size still come from this script's model)")
+    parser.add_argument('--bench-blocks', type=int, help='instead of writing page files, tile each document to this many blocks and time pagination')
+    args = parser.parse_args(argv)
+
+    word_rules = not args.engine_rules
+    for docx in args.documents:
+        if args.bench_blocks:
+            result = bench(docx, args.bench_blocks, args.char_width_em, word_rules)
+            print(f"{docx.name}: {result['blocks']} blocks -> {result['pages']} pages in {result['seconds']:.3f}s")
+            continue
+        result = paginate_document(docx, args.char_width_em, word_rules)
+        target = pages_path(docx, word_rules)
+        target.write_text(json.dumps(result, ensure_ascii=False) + '\n', encoding='utf-8')
+        print(str(target))
+        print(f"{result['blocks']} blocks, {result['pages']} pages, {result['paginate_seconds'] * 1000:.1f}ms", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
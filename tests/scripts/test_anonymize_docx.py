@@ -0,0 +1,121 @@
+from io import BytesIO
+from pathlib import Path
+from zipfile import ZipFile
+import re
+import sys
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import scripts_anonymize_docx as anonymize
+import scripts_docx_media as media
+
+SECRETS = ('Confidential', 'Name', 'Acme', '张三丰', 'secret', 'Client', 'Matter', 'Ledger', 'Reviewer', 'Project', 'Codename')
+
+DOCUMENT = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>
+<w:p><w:r><w:t>Confidential Name</w:t></w:r></w:p>
+<w:p><w:r><w:t xml:space="preserve">Acme &amp; 张三丰 </w:t></w:r><w:r><w:t>Confidential</w:t></w:r></w:p>
+<w:p><w:r><w:instrText xml:space="preserve"> HYPERLINK "http://secret.exa</w:instrText></w:r><w:r><w:instrText>mple/Client" \\h </w:instrText></w:r></w:p>
+<w:p><w:fldSimple w:instr=" HYPERLINK &quot;http://secret.example/Matter&quot; "><w:r><w:t>Ledger</w:t></w:r></w:fldSimple></w:p>
+<w:p><w:bookmarkStart w:id="0" w:name="ClientMatter"/><w:hyperlink w:anchor="ClientMatter"><w:r><w:t>Name</w:t></w:r></w:hyperlink><w:bookmarkEnd w:id="0"/></w:p>
+<w:sdt><w:sdtPr><w:alias w:val="Reviewer"/><w:tag w:val="Project Codename"/></w:sdtPr><w:sdtContent><w:p><w:r><w:t>Reviewer</w:t></w:r></w:p></w:sdtContent></w:sdt>
+<w:p><w:r><w:t></w:t></w:r><w:r><w:t>  </w:t></w:r></w:p>
+<w:p><w:bookmarkStart w:id="1" w:name="_Toc123456"/><w:r><w:t>Matter</w:t></w:r><w:bookmarkEnd w:id="1"/></w:p>
+<w:p><w:hyperlink w:anchor="_Toc123456"><w:r><w:fldChar w:fldCharType="begin"/></w:r><w:r><w:instrText xml:space="preserve"> PAGEREF _Toc123456 \\h </w:instrText></w:r><w:r><w:fldChar w:fldCharType="end"/></w:r></w:hyperlink></w:p>
+<w:p><w:r><w:fldChar w:fldCharType="begin"/></w:r><w:r><w:instrText xml:space="preserve"> REF </w:instrText></w:r><w:r><w:instrText>_Toc123456 \\h </w:instrText></w:r><w:r><w:fldChar w:fldCharType="end"/></w:r></w:p>
+<w:p><w:fldSimple w:instr=" HYPERLINK \\l &quot;_Toc123456&quot; "><w:r><w:t>Ledger</w:t></w:r></w:fldSimple></w:p>
+<w:p><w:fldSimple w:instr=" DOCVARIABLE ClientMatter "><w:r><w:t>Acme</w:t></w:r></w:fldSimple></w:p>
+<w:p><w:r><w:fldChar w:fldCharType="begin"><w:ffData><w:name w:val="ClientMatter"/><w:enabled/><w:textInput><w:default w:val="Acme Ledger"/></w:textInput><w:helpText w:type="text" w:val="Reviewer"/></w:ffData></w:fldChar></w:r><w:r><w:instrText xml:space="preserve"> FORMTEXT </w:instrText></w:r><w:r><w:fldChar w:fldCharType="end"/></w:r></w:p>
+<w:p><w:r><w:fldChar w:fldCharType="begin"><w:ffData><w:name w:val="Check1"/><w:checkBox><w:sizeAuto/><w:default w:val="1"/></w:checkBox></w:ffData></w:fldChar></w:r><w:r><w:fldChar w:fldCharType="end"/></w:r></w:p>
+<w:p><w:r><w:fldChar w:fldCharType="begin"><w:ffData><w:name w:val="Dropdown1"/><w:ddList><w:listEntry w:val="Client"/><w:listEntry w:val="Matter"/></w:ddList><w:statusText w:type="text" w:val="Codename"/></w:ffData></w:fldChar></w:r><w:r><w:fldChar w:fldCharType="end"/></w:r></w:p>
+<w:sdt><w:sdtPr><w:dropDownList><w:listItem w:displayText="Acme" w:value="Ledger"/></w:dropDownList></w:sdtPr><w:sdtContent><w:p/></w:sdtContent></w:sdt>
+</w:body></w:document>
+'''.encode('utf-8')
+
+SETTINGS = b'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:settings xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:docVars><w:docVar w:name="ClientMatter" w:val="Acme Ledger"/></w:docVars></w:settings>
+'''
+
+STYLES = b'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/></w:style></w:styles>
+'''
+
+CUSTOM = b'''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/custom-properties" xmlns:vt="http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes"><property fmtid="{D5CDD505-2E9C-101B-9397-08002B2CF9AE}" pid="2" name="Client Codename"><vt:lpwstr>Acme</vt:lpwstr></property></Properties>
+'''
+
+@pytest.fixture(scope='module')
+def filler():
+    return anonymize.Filler(0)
+
+def write_source(path: Path):
+    with ZipFile(path, 'w') as z:
+        z.writestr('word/document.xml', DOCUMENT)
+        z.writestr('word/settings.xml', SETTINGS)
+        z.writestr('word/styles.xml', STYLES)
+        z.writestr('docProps/custom.xml', CUSTOM)
+        z.writestr('word/media/image1.png', media.png_image(40, 30, 1))
+        z.writestr('word/media/image2.jpeg', media.jpeg_image(64, 48, 2))
+        z.writestr('word/embeddings/oleObject1.bin', b'Acme Ledger' * 1000)
+    return path
+
+@pytest.mark.parametrize('name, xml', [('word/document.xml', DOCUMENT), ('word/settings.xml', SETTINGS), ('docProps/custom.xml', CUSTOM)])
+def test_every_chunk_size_replaces_all_text(filler, name, xml):
+    expected = anonymize.strip_values(name, xml)
+    for chunk in range(1, len(xml) + 1):
+        rewriter = anonymize.PartRewriter(name, filler)
+        out = b''.join(rewriter.rewrite(piece) for piece in anonymize.iter_tag_aligned(BytesIO(xml), chunk))
+        for secret in SECRETS:
+            assert secret.encode('utf-8') not in out, (chunk, secret)
+        assert anonymize.strip_values(name, out) == expected, chunk
+
+def test_verify_accepts_output_and_binary_parts_keep_shape(tmp_path):
+    source = write_source(tmp_path / 'source.docx')
+    target = tmp_path / 'target.docx'
+    summary = anonymize.anonymize_docx(source, target, seed=3, chunk=64)
+    assert summary['images'] == 2
+    assert summary['blanked'] == ['word/embeddings/oleObject1.bin']
+    assert anonymize.verify(source, target) is None
+    with ZipFile(target) as z:
+        assert z.read('word/embeddings/oleObject1.bin') == bytes(11000)
+        assert media.image_dimensions(z.read('word/media/image1.png')) == ('png', 40, 30)
+        assert media.image_dimensions(z.read('word/media/image2.jpeg')) == ('jpeg', 64, 48)
+
+def test_verify_reports_values_left_unchanged(tmp_path):
+    source = write_source(tmp_path / 'source.docx')
+    problem = anonymize.verify(source, source)
+    assert problem is not None and 'unchanged' in problem
+
+def test_references_still_match_their_bookmarks(tmp_path):
+    source = write_source(tmp_path / 'source.docx')
+    target = tmp_path / 'target.docx'
+    anonymize.anonymize_docx(source, target, seed=5, chunk=64)
+    with ZipFile(target) as z:
+        document = z.read('word/document.xml').decode('utf-8')
+        settings = z.read('word/settings.xml').decode('utf-8')
+    bookmarks = set(re.findall(r'<w:bookmarkStart [^>]*w:name="([^"]*)"', document))
+    assert len(bookmarks) == 2 and not bookmarks & {'ClientMatter', '_Toc123456'}
+    instructions = ''.join(re.findall(r'<w:instrText[^>]*>([^<]*)<', document))
+    references = [
+        *re.findall(r'w:anchor="([^"]*)"', document),
+        *re.findall(r'\b(?:PAGEREF|REF) +(\S+)', instructions),
+        *re.findall(r'\\l &quot;([^&]*)&quot;', document),
+    ]
+    assert len(references) == 5 and set(references) == bookmarks
+    variable, = re.findall(r'DOCVARIABLE (\S+)', document)
+    assert re.findall(r'<w:docVar w:name="([^"]*)"', settings) == [variable]
+    assert variable in bookmarks
+
+def test_form_fields_keep_names_in_step_and_states(tmp_path):
+    source = write_source(tmp_path / 'source.docx')
+    target = tmp_path / 'target.docx'
+    anonymize.anonymize_docx(source, target, seed=5, chunk=64)
+    with ZipFile(target) as z:
+        document = z.read('word/document.xml').decode('utf-8')
+        assert z.read('word/styles.xml') == STYLES
+    names = re.findall(r'<w:ffData><w:name w:val="([^"]*)"', document)
+    bookmark = re.search(r'<w:bookmarkStart w:id="0" w:name="([^"]*)"', document).group(1)
+    assert names[0] == bookmark and 'Check1' not in names
+    assert '<w:default w:val="1"/>' in document
@@ -0,0 +1,23 @@
+import { defineConfig } from "vitest/config";
+import path from "node:path";
+
+// Used by scripts_bench_docx_pipeline.py; not part of `npm run test`.
+export default defineConfig({
+  test: {
+    environment: "jsdom",
+    include: ["bench/**/*.run.ts"],
+    testTimeout: 24 * 60 * 60 * 1000,
+    pool: "forks",
+    poolOptions: {
+      forks: {
+        singleFork: true,
+        execArgv: ["--expose-gc"]
+      }
+    }
+  },
+  resolve: {
+    alias: {
+      "@": path.resolve(__dirname, ".")
+    }
+  }
+});